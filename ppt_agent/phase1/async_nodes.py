@@ -0,0 +1,232 @@
+"""
+Async variants of the LLM-calling nodes in ``nodes.py``.
+
+They build the same prompts and state updates as their sync counterparts
+(the shared helpers live in ``nodes.py``) but await ``model.astream``, so a
+graph built with ``build_graph(use_async=True)`` and driven through
+``ainvoke``/``astream`` keeps every in-flight LLM call on the event loop
+instead of parking a worker thread per call. Nodes that do not call an LLM
+(``user_input_node``, ``pptx_coder_node``) are reused as-is; LangGraph runs
+them in its executor.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Literal
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+from langgraph.types import Command
+
+from phase1.config.agents import AGENT_LLM_MAP
+from phase1.config.configuration import Configuration
+from phase1.llm import get_llm_by_type
+from phase1.metrics import metrics
+from phase1.nodes import (
+    _attach_slide_content,
+    _evict_cached,
+    _fast_route,
+    _finish_response,
+    _foldable_requirements,
+    _initiator_command,
+    _initiator_handoff,
+    _initiator_messages,
+    _plan_update,
+    _planner_messages,
+    _record_prompt_tokens,
+    _record_routing_decision,
+    _refiner_command,
+    _refiner_messages,
+    _repair_messages,
+    _repaired,
+    _requirement_contents,
+    _routing_command,
+    _routing_messages,
+    _slide_builder_command,
+    _slide_builder_messages,
+    _slide_built,
+    _stale_slides,
+    _summarizer_messages,
+    _summary_update,
+    _validated,
+)
+from phase1.projection import slide_input_hash
+from phase1.state import PPTState, create_slide_from_dict
+from phase1.streaming_json import StreamingArrayParser
+from phase1.structured import JSON_OUTPUT_KWARGS, StructuredOutputError
+
+logger = logging.getLogger(__name__)
+
+
+async def _ainvoke_llm(agent_name, model, messages, on_chunk=None, **kwargs):
+    """Async counterpart of ``nodes._invoke_llm``."""
+    _record_prompt_tokens(agent_name, messages)
+    start = time.perf_counter()
+    response = None
+    async for chunk in model.astream(messages, **kwargs):
+        if response is None:
+            metrics.observe(f"time_to_first_token_seconds.{agent_name}", time.perf_counter() - start)
+            response = chunk
+        else:
+            response = response + chunk
+        if on_chunk is not None and isinstance(chunk.content, str):
+            on_chunk(chunk.content)
+    return _finish_response(agent_name, response, start)
+
+
+async def _ainvoke_structured(agent_name, model, messages, on_chunk=None):
+    """Async counterpart of ``nodes._invoke_structured``."""
+    response = await _ainvoke_llm(agent_name, model, messages, on_chunk=on_chunk, **JSON_OUTPUT_KWARGS)
+    try:
+        return _validated(agent_name, response.content)
+    except StructuredOutputError as e:
+        _evict_cached(model, messages)
+        repair_model = get_llm_by_type(AGENT_LLM_MAP["json_repair"], agent_name="json_repair")
+        repair_messages = _repair_messages(agent_name, response.content, e)
+        repaired = await _ainvoke_llm("json_repair", repair_model, repair_messages, **JSON_OUTPUT_KWARGS)
+        return _repaired(agent_name, repaired.content, repair_model, repair_messages)
+
+
+async def appt_initiator_node(
+    state: PPTState,
+) -> Command[Literal["ppt_planner_node"]]:
+    logger.info("Gathering Requirment ...")
+    model = get_llm_by_type(AGENT_LLM_MAP["ppt_initiator"], agent_name="ppt_initiator")
+    parsed_response = await _ainvoke_structured("ppt_initiator", model, _initiator_messages(state))
+    return _initiator_command(parsed_response)
+
+
+async def _acompact_requirements(state: PPTState, requirement_contents: list, window: int) -> dict:
+    foldable = _foldable_requirements(state, requirement_contents, window)
+    if not foldable:
+        return {}
+    model = get_llm_by_type(
+        AGENT_LLM_MAP["requirement_summarizer"], agent_name="requirement_summarizer"
+    )
+    summary_response = await _ainvoke_llm(
+        "requirement_summarizer", model, _summarizer_messages(state, foldable)
+    )
+    return _summary_update(state, foldable, summary_response)
+
+
+async def auser_task_manager_node(
+    state: PPTState, config: RunnableConfig
+) -> Command[Literal["user_input_node", "__end__"]]:
+    logger.info("Routing task ...")
+    requirement_contents = _requirement_contents(state)
+    if len(state.get("file_name", "")) == 0:
+        return _initiator_handoff(requirement_contents)
+
+    configurable = Configuration.from_runnable_config(config)
+    compaction = {}
+    user_task_manage_response_parsed = _fast_route(state, configurable, requirement_contents)
+    if user_task_manage_response_parsed is None:
+        model = get_llm_by_type(AGENT_LLM_MAP["user_task_manager"], agent_name="user_task_manager")
+        window = max(1, configurable.requirement_history_window)
+        compaction = await _acompact_requirements(state, requirement_contents, window)
+        user_task_manage_response_parsed = await _ainvoke_structured(
+            "user_task_manager",
+            model,
+            _routing_messages(state, requirement_contents, compaction, window),
+        )
+        _record_routing_decision(
+            state, configurable, requirement_contents, user_task_manage_response_parsed
+        )
+    return _routing_command(user_task_manage_response_parsed, requirement_contents, compaction)
+
+
+async def _abuild_slide_content(model, slide):
+    return await _ainvoke_structured("slide_builder", model, _slide_builder_messages(slide))
+
+
+async def appt_planner_node(
+    state: PPTState, config: RunnableConfig
+) -> Command[Literal["user_input_node"]]:
+    logger.info("PPT Planner working...")
+    model = get_llm_by_type(AGENT_LLM_MAP["ppt_planner"], agent_name="ppt_planner")
+    configurable = Configuration.from_runnable_config(config)
+
+    on_chunk = None
+    pipelined = []  # (input hash, task) per streamed slide, in plan order
+    if configurable.pipeline_slide_building:
+        builder_model = get_llm_by_type(AGENT_LLM_MAP["slide_builder"], agent_name="slide_builder")
+        semaphore = asyncio.Semaphore(max(1, configurable.slide_builder_concurrency))
+        parser = StreamingArrayParser(("slides",))
+        writer = get_stream_writer()
+
+        async def build(slide):
+            async with semaphore:
+                return await _abuild_slide_content(builder_model, slide)
+
+        def on_chunk(text):
+            for _, slide_data in parser.feed(text):
+                slide = create_slide_from_dict(slide_data)
+                pipelined.append((slide_input_hash(slide), asyncio.ensure_future(build(slide))))
+                writer({"event": "slide_planned", "slide_number": len(pipelined), "slide": slide})
+
+    try:
+        parsed_response = await _ainvoke_structured(
+            "ppt_planner", model, _planner_messages(state), on_chunk=on_chunk
+        )
+        update = _plan_update(state, parsed_response)
+
+        # the final parse is authoritative: a pipelined build is only kept when
+        # it was made from exactly the same slide
+        for slide, (input_hash, task) in zip(update["slides"], pipelined):
+            if slide_input_hash(slide) != input_hash:
+                continue
+            try:
+                _attach_slide_content(slide, await task, input_hash)
+            except Exception:
+                logger.exception("Pipelined build failed for slide %r", slide.get("title"))
+        metrics.incr("planner.pipelined_slides", len(pipelined))
+    finally:
+        for _, task in pipelined:
+            task.cancel()
+
+    return Command(update=update, goto="user_input_node")
+
+
+async def appt_refiner_node(
+    state: PPTState,
+) -> Command[Literal["user_input_node"]]:
+    logger.info("PPT refiner working...")
+    model = get_llm_by_type(AGENT_LLM_MAP["ppt_refiner"], agent_name="ppt_refiner")
+    parsed_response = await _ainvoke_structured("ppt_refiner", model, _refiner_messages(state))
+    return _refiner_command(state, parsed_response)
+
+
+async def aslide_builder_node(
+    state: PPTState, config: RunnableConfig
+) -> Command[Literal["user_input_node"]]:
+    logger.info("Building slides ...")
+    model = get_llm_by_type(AGENT_LLM_MAP["slide_builder"], agent_name="slide_builder")
+    configurable = Configuration.from_runnable_config(config)
+    slides = [dict(slide) for slide in state["slides"]]
+    if not slides:
+        return Command(goto="user_input_node")
+
+    input_hashes, stale = _stale_slides(slides)
+    if stale:
+        writer = get_stream_writer()
+        start = time.perf_counter()
+        # the semaphore plays the role of the sync node's thread pool size
+        semaphore = asyncio.Semaphore(max(1, configurable.slide_builder_concurrency))
+
+        async def build(index):
+            # a failing slide must not take the rest of the deck down with it
+            async with semaphore:
+                try:
+                    return index, await _abuild_slide_content(model, slides[index]), None
+                except Exception as e:
+                    logger.exception("Failed to build slide %r", slides[index].get("title"))
+                    return index, None, f"{type(e).__name__}: {e}"
+
+        for completed, next_result in enumerate(asyncio.as_completed([build(index) for index in stale])):
+            index, slide_content, error = await next_result
+            if completed == 0:
+                metrics.observe("time_to_first_slide_seconds", time.perf_counter() - start)
+            _slide_built(writer, slides, index, input_hashes[index], slide_content, error)
+
+    return _slide_builder_command(slides, stale)
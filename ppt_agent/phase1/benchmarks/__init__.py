@@ -0,0 +1 @@
+"""Offline benchmarks for the phase1 graph. Run each module with ``python -m``."""
@@ -0,0 +1,191 @@
+"""
+Concurrent sessions served by the sync graph (one thread per session) vs the
+async graph (one event loop).
+
+Every session runs the same scripted conversation (requirement → plan,
+"build the slides", "download the ppt") against a fake chat model that
+sleeps ``--latency`` seconds per call, so the numbers measure the
+orchestration overhead rather than Gemini. ``sessions_per_cpu_second`` is
+the number of sessions one fully busy core could serve.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.async_sessions --sessions 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from phase1 import llm
+from phase1.builder import build_graph
+
+SCRIPT = [
+    "Make a presentation about water scarcity in Rajasthan for school students",
+    "build the slides",
+    "download the ppt",
+]
+
+
+class ScriptedLatencyChatModel(BaseChatModel):
+    """Fake chat model that answers each agent's prompt with canned JSON after ``latency`` seconds."""
+
+    latency: float = 0.2
+    number_of_slides: int = 6
+    output_dir: str = "."
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-latency"
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        system, human = messages[0].content, messages[-1].content
+        if "`ppt_initiator` agent" in system:
+            digest = hashlib.sha256(human.encode("utf-8")).hexdigest()[:12]
+            return json.dumps({
+                "file_name": os.path.join(self.output_dir, f"{digest}.pptx"),
+                "title_of_ppt": "Water scarcity",
+                "requirement_cleaned": human,
+            })
+        if "Role: PPT Planner Agent" in system and "ppt refiner" not in system:
+            return json.dumps({
+                "ppt_title": "Water scarcity",
+                "number_of_slides": self.number_of_slides,
+                "key_messages": [{"message": "Water is scarce", "milestone_slide_number": 1}],
+                "slides": [
+                    {"title": f"Slide {number}", "content": "Point one\nPoint two", "key_message_part": "1"}
+                    for number in range(1, self.number_of_slides + 1)
+                ],
+            })
+        if "Slide Builder Agent" in system:
+            title = json.loads(human).get("title", "")
+            return json.dumps({
+                "layout_type": "title-and-bullets",
+                "title": title,
+                "content_blocks": [{"type": "text", "text": ["Point one", "Point two"]}],
+            })
+        return json.dumps({"status": "call_agent", "agent": "slide_builder", "context": "scripted"})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+
+def _install_fake_model(model: BaseChatModel) -> None:
+    # pre-seed the client registry so get_llm_by_type never builds a real client
+    for llm_type in ("basic", "reasoning", "vision"):
+        llm._llm_cache[llm_type] = model
+
+
+def _session_config(session: int) -> dict:
+    return {"configurable": {"thread_id": f"bench-{session}"}}
+
+
+def run_session(workflow, session: int) -> None:
+    config = _session_config(session)
+    workflow.invoke({"input": "hi"}, config=config)
+    for turn in SCRIPT:
+        workflow.invoke(Command(resume=f"{turn} #{session}" if turn == SCRIPT[0] else turn), config=config)
+
+
+async def arun_session(workflow, session: int) -> None:
+    config = _session_config(session)
+    await workflow.ainvoke({"input": "hi"}, config=config)
+    for turn in SCRIPT:
+        await workflow.ainvoke(Command(resume=f"{turn} #{session}" if turn == SCRIPT[0] else turn), config=config)
+
+
+class _ThreadSampler:
+    """Track the peak number of live threads while a benchmark runs."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _result(sessions: int, wall: float, cpu: float, peak_threads: int) -> dict:
+    return {
+        "sessions": sessions,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu, 3),
+        "sessions_per_s": round(sessions / wall, 2),
+        "sessions_per_cpu_second": round(sessions / cpu, 2) if cpu else None,
+        "peak_threads": peak_threads,
+    }
+
+
+def bench_sync(sessions: int) -> dict:
+    workflow = build_graph(graph_checkpointer=MemorySaver())
+    with _ThreadSampler() as sampler:
+        wall, cpu = time.perf_counter(), time.process_time()
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            list(executor.map(lambda session: run_session(workflow, session), range(sessions)))
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return _result(sessions, wall, cpu, sampler.peak)
+
+
+def bench_async(sessions: int) -> dict:
+    workflow = build_graph(use_async=True, graph_checkpointer=MemorySaver())
+
+    async def main() -> None:
+        await asyncio.gather(*(arun_session(workflow, session) for session in range(sessions)))
+
+    with _ThreadSampler() as sampler:
+        wall, cpu = time.perf_counter(), time.process_time()
+        asyncio.run(main())
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return _result(sessions, wall, cpu, sampler.peak)
+
+
+def run(sessions: int, latency: float, number_of_slides: int, output_dir: Optional[str] = None) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        _install_fake_model(
+            ScriptedLatencyChatModel(
+                latency=latency, number_of_slides=number_of_slides, output_dir=output_dir or tmp
+            )
+        )
+        return {
+            "latency_s": latency,
+            "slides_per_deck": number_of_slides,
+            "sync": bench_sync(sessions),
+            "async": bench_async(sessions),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds per call")
+    parser.add_argument("--slides", type=int, default=6)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sessions, args.latency, args.slides), indent=2))
@@ -0,0 +1,383 @@
+"""
+End-to-end benchmark of the PPT graph against the replay LLM backend.
+
+Each session drives ``build_graph()`` through a scripted conversation on
+one of the built-in questions of ``phase1.config.questions`` (English,
+Chinese or both):
+
+    question -> initiator + planner, "shorten the title of slide 2" ->
+    refiner, "build the slides" -> slide builder, "download the ppt" ->
+    native render
+
+Answers come from a ``ReplayChatModel``: recorded answers when
+``--recordings`` has them, otherwise canned JSON per agent, delivered with
+the ``LatencyModel`` given on the command line. Node prints go to stderr.
+The persistent caches of conf.yaml (LLM responses, decks, checkpoints) are
+pointed at the run's temporary directory, so every run starts cold.
+
+Reported as JSON (``--output`` or stdout), with the git commit so runs of
+different commits can be compared:
+
+* per-node latency percentiles (wall time inside each graph node)
+* LLM calls, latency and input/output tokens per agent
+* serialized state size per checkpoint, overall and by graph step
+* peak RSS and decks per minute
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.end_to_end --sessions 20 --concurrency 4 --output bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Command
+
+from phase1 import deck_cache, llm
+from phase1.builder import build_graph
+from phase1.config import BUILT_IN_QUESTIONS, BUILT_IN_QUESTIONS_ZH_CN, load_yaml_config
+from phase1.llm_replay import JITTER_DISTRIBUTIONS, LatencyModel, RecordingStore, ReplayChatModel
+from phase1.metrics import metrics, percentile
+from phase1.prompts.template import get_prompt_template
+from phase1.router import classify_intent
+
+# agents the scripted session reaches
+SCRIPTED_AGENTS = (
+    "ppt_initiator",
+    "ppt_planner",
+    "ppt_refiner",
+    "slide_builder",
+    "user_task_manager",
+    "requirement_summarizer",
+)
+
+FOLLOW_UPS = [
+    "shorten the title of slide 2",
+    "build the slides",
+    "download the ppt",
+]
+
+# conf.yaml sections stored on disk, and the file or directory each uses in a run
+PERSISTENT_CACHES = {
+    "LLM_CACHE": "llm_responses.sqlite3",
+    "DECK_CACHE": "decks",
+    "CHECKPOINTER": "checkpoints.sqlite3",
+}
+
+
+def _scripted_responder(number_of_slides: int, output_dir: str) -> Callable[[List[BaseMessage]], str]:
+    """Canned answer per agent, recognised by its (memoized) system prompt."""
+    agents = {get_prompt_template(agent_name): agent_name for agent_name in SCRIPTED_AGENTS}
+
+    def answer(messages: List[BaseMessage]) -> str:
+        agent_name = agents.get(messages[0].content)
+        human = str(messages[-1].content)
+        if agent_name == "ppt_initiator":
+            digest = hashlib.sha256(human.encode("utf-8")).hexdigest()[:12]
+            return json.dumps({
+                "file_name": os.path.join(output_dir, f"{digest}.pptx"),
+                "title_of_ppt": human[:60],
+                "requirement_cleaned": human,
+            }, ensure_ascii=False)
+        if agent_name == "ppt_planner":
+            return json.dumps({
+                "ppt_title": "Benchmark deck",
+                "number_of_slides": number_of_slides,
+                "key_messages": [{"message": "The main finding", "milestone_slide_number": 1}],
+                "slides": [
+                    {
+                        "title": f"Slide {number}",
+                        "content": "First point of the slide\nSecond point of the slide\nThird point",
+                        "key_message_part": "1",
+                    }
+                    for number in range(1, number_of_slides + 1)
+                ],
+            })
+        if agent_name == "ppt_refiner":
+            return json.dumps({"operations": [{"op": "replace", "slide": 2, "field": "title", "value": "Short"}]})
+        if agent_name == "slide_builder":
+            return json.dumps({
+                "layout_type": "title-and-bullets",
+                "title": json.loads(human).get("title", ""),
+                "content_blocks": [{"type": "text", "text": ["First point", "Second point", "Third point"]}],
+                "speaker_notes": "Walk through the three points.",
+            })
+        if agent_name == "user_task_manager":
+            requirements = json.loads(human).get("user_requirment") or [""]
+            agent = classify_intent(requirements[-1], True).agent or "ppt_planner"
+            return json.dumps({
+                "status": "call_agent",
+                "agent": agent,
+                "cleaned_requirement": requirements[-1],
+                "context": "scripted",
+            }, ensure_ascii=False)
+        if agent_name == "requirement_summarizer":
+            return "The user wants a short presentation on the topic."
+        raise ValueError(f"No scripted answer for system prompt {messages[0].content[:80]!r}")
+
+    return answer
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Records the wall time of every graph node run as ``node_seconds.<node>``."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._starts: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # nested runnables inside a node carry the same metadata, only the node's own run has its name
+        if node and kwargs.get("name") == node:
+            with self._lock:
+                self._starts[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id) -> None:
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+        if started is not None:
+            node, start = started
+            metrics.observe(f"node_seconds.{node}", time.perf_counter() - start)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any) -> None:
+        # user_input_node ends with the interrupt that waits for the next turn
+        self._finish(run_id)
+
+
+@contextlib.contextmanager
+def _isolated_caches(directory: str):
+    """Point the PERSISTENT_CACHES of conf.yaml at ``directory`` while the run lasts."""
+    conf = load_yaml_config(llm._conf_path())
+    saved = {section: conf.get(section) for section in PERSISTENT_CACHES}
+    for section, name in PERSISTENT_CACHES.items():
+        conf[section] = {**(saved[section] or {}), "path": os.path.join(directory, name)}
+    # shared caches built from the configured paths are rebuilt from the new ones
+    llm._response_cache, deck_cache._deck_cache = None, None
+    try:
+        yield
+    finally:
+        for section, value in saved.items():
+            if value is None:
+                conf.pop(section, None)
+            else:
+                conf[section] = value
+        llm._response_cache, deck_cache._deck_cache = None, None
+
+
+def _questions(language: str) -> List[str]:
+    return {
+        "en": BUILT_IN_QUESTIONS,
+        "zh": BUILT_IN_QUESTIONS_ZH_CN,
+        "both": [q for pair in zip(BUILT_IN_QUESTIONS, BUILT_IN_QUESTIONS_ZH_CN) for q in pair],
+    }[language]
+
+
+def _session_config(session: int, timer: NodeTimer, llm_routing: bool) -> dict:
+    configurable = {"thread_id": f"e2e-{session}"}
+    if llm_routing:
+        # no rule is ever confident enough, every turn goes through the routing prompt
+        configurable["fast_route_threshold"] = 2.0
+    return {"configurable": configurable, "callbacks": [timer]}
+
+
+def run_session(workflow, question: str, config: dict) -> None:
+    workflow.invoke({"input": "hi"}, config=config)
+    for turn in [question] + FOLLOW_UPS:
+        workflow.invoke(Command(resume=turn), config=config)
+
+
+async def arun_session(workflow, question: str, config: dict) -> None:
+    await workflow.ainvoke({"input": "hi"}, config=config)
+    for turn in [question] + FOLLOW_UPS:
+        await workflow.ainvoke(Command(resume=turn), config=config)
+
+
+def _state_sizes(workflow, configs: List[dict]) -> dict:
+    serde = JsonPlusSerializer()
+    sizes, by_step = [], defaultdict(list)
+    for config in configs:
+        for snapshot in workflow.get_state_history({"configurable": config["configurable"]}):
+            size = len(serde.dumps_typed(snapshot.values)[1])
+            sizes.append(size)
+            by_step[snapshot.metadata.get("step", -1)].append(size)
+    return {
+        "checkpoints": len(sizes),
+        "bytes_p50": percentile(sizes, 50),
+        "bytes_p95": percentile(sizes, 95),
+        "bytes_max": max(sizes, default=0),
+        "mean_bytes_by_step": {
+            str(step): round(sum(values) / len(values)) for step, values in sorted(by_step.items())
+        },
+    }
+
+
+def _series(snapshot: dict, prefix: str) -> Dict[str, dict]:
+    return {
+        name[len(prefix):]: summary
+        for name, summary in snapshot["series"].items()
+        if name.startswith(prefix)
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    sessions: int,
+    concurrency: int,
+    use_async: bool,
+    language: str,
+    number_of_slides: int,
+    latency: LatencyModel,
+    llm_routing: bool = False,
+    recordings: Optional[str] = None,
+) -> dict:
+    questions = _questions(language)
+    timer = NodeTimer()
+    with tempfile.TemporaryDirectory() as tmp, _isolated_caches(tmp):
+        model = ReplayChatModel(
+            store=RecordingStore(recordings or os.path.join(tmp, "recordings.jsonl")),
+            latency=latency,
+            fallback=_scripted_responder(number_of_slides, tmp),
+        )
+        # pre-seed the client registry so get_llm_by_type never builds a real client
+        for llm_type in ("basic", "reasoning", "vision"):
+            llm._llm_cache[llm_type] = model
+        metrics.reset()
+        workflow = build_graph(use_async=use_async, graph_checkpointer=MemorySaver())
+        configs = [_session_config(session, timer, llm_routing) for session in range(sessions)]
+        session_questions = [questions[session % len(questions)] for session in range(sessions)]
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        if use_async:
+            async def main() -> None:
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def one(session: int) -> None:
+                    async with semaphore:
+                        await arun_session(workflow, session_questions[session], configs[session])
+
+                await asyncio.gather(*(one(session) for session in range(sessions)))
+
+            asyncio.run(main())
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(
+                    lambda session: run_session(workflow, session_questions[session], configs[session]),
+                    range(sessions),
+                ))
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        decks = sum(1 for name in os.listdir(tmp) if name.endswith(".pptx"))
+        snapshot = metrics.snapshot()
+        return {
+            "meta": {
+                "git_commit": _git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "params": {
+                "sessions": sessions,
+                "concurrency": concurrency,
+                "async": use_async,
+                "language": language,
+                "slides_per_deck": number_of_slides,
+                "llm_routing": llm_routing,
+                "latency": {
+                    "first_token_seconds": latency.first_token_seconds,
+                    "per_token_seconds": latency.per_token_seconds,
+                    "jitter": latency.jitter,
+                    "jitter_scale": latency.jitter_scale,
+                },
+            },
+            "totals": {
+                "wall_s": round(wall, 3),
+                "cpu_s": round(cpu, 3),
+                "decks": decks,
+                "decks_per_minute": round(decks / wall * 60, 2),
+                "peak_rss_mb": _peak_rss_mb(),
+            },
+            "node_seconds": _series(snapshot, "node_seconds."),
+            "llm_seconds": _series(snapshot, "llm_seconds."),
+            "input_tokens": {
+                agent: summary["sum"] for agent, summary in _series(snapshot, "input_tokens.").items()
+            },
+            "output_tokens": {
+                agent: summary["sum"] for agent, summary in _series(snapshot, "output_tokens.").items()
+            },
+            "state_size": _state_sizes(workflow, configs),
+            "counters": snapshot["counters"],
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="sessions in flight at once")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use the async graph")
+    parser.add_argument("--language", choices=("en", "zh", "both"), default="both")
+    parser.add_argument("--slides", type=int, default=8)
+    parser.add_argument("--llm-routing", action="store_true", help="route every turn through the LLM router")
+    parser.add_argument("--first-token", type=float, default=0.4, help="seconds to the first token")
+    parser.add_argument("--per-token", type=float, default=0.004, help="seconds per output token")
+    parser.add_argument("--jitter", choices=JITTER_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter-scale", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recordings", help="JSONL recording to replay before falling back to canned answers")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    # the nodes print their LLM answers, keep stdout for the results
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run(
+            args.sessions,
+            args.concurrency,
+            args.use_async,
+            args.language,
+            args.slides,
+            LatencyModel(args.first_token, args.per_token, args.jitter, args.jitter_scale, args.seed),
+            llm_routing=args.llm_routing,
+            recordings=args.recordings,
+        )
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,76 @@
+"""
+Cold vs warm import time of ``phase1.builder`` and first vs cached client lookup.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.import_time --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import phase1.builder
+print(time.perf_counter() - start)
+"""
+
+_CLIENT_SNIPPET = """
+import time
+from phase1.llm import get_llm_by_type
+start = time.perf_counter()
+get_llm_by_type("basic")
+cold = time.perf_counter() - start
+start = time.perf_counter()
+get_llm_by_type("basic")
+print(cold, time.perf_counter() - start)
+"""
+
+
+def _run(snippet: str) -> list[float]:
+    output = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def measure_import(runs: int) -> dict:
+    """Time ``import phase1.builder`` in fresh interpreters.
+
+    The first run is treated as cold (bytecode may need compiling, OS file
+    cache is empty), the remaining runs as warm.
+    """
+    timings = [_run(_IMPORT_SNIPPET)[0] for _ in range(runs)]
+    warm = timings[1:] or timings
+    return {
+        "cold_import_s": timings[0],
+        "warm_import_median_s": statistics.median(warm),
+        "warm_import_min_s": min(warm),
+    }
+
+
+def measure_client() -> dict:
+    """Time the first (constructing) and second (cached) ``get_llm_by_type`` calls."""
+    try:
+        cold, warm = _run(_CLIENT_SNIPPET)
+    except subprocess.CalledProcessError as e:
+        return {"client_error": e.stderr.strip().splitlines()[-1]}
+    return {"client_first_call_s": cold, "client_cached_call_s": warm}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps({**measure_import(args.runs), **measure_client()}, indent=2))
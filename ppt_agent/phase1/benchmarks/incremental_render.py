@@ -0,0 +1,101 @@
+"""
+Render time after small edits, full vs incremental, as decks grow.
+
+For each deck size a deck is saved with ``render_presentation_incremental``,
+then one edit at a time is applied and the deck re-rendered both ways:
+
+* ``edit``: the title of the middle slide changes
+* ``insert``: a new slide is inserted at the front
+* ``delete``: the last slide is removed
+* ``reorder``: the first and last slides are swapped
+
+``full_seconds`` is ``render_presentation`` of the whole deck,
+``incremental_seconds`` the incremental render over the previous deck. Each
+incremental deck is checked to have the same slide, notes and media parts as
+the full render.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.incremental_render --sizes 10 100 500
+"""
+
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+from PIL import Image
+
+from phase1.benchmarks.parallel_render import make_slides
+from phase1.incremental_render import render_presentation_incremental
+from phase1.projection import slide_input_hash
+from phase1.renderer import render_presentation
+
+
+def _retitle(slide: dict, title: str) -> None:
+    # as the refiner and slide builder would: new input fields, rebuilt layout
+    slide["title"] = slide["slide_content"]["title"] = title
+    slide["slide_content_hash"] = slide_input_hash(slide)
+
+
+def _edits(slides: list) -> list:
+    edited = copy.deepcopy(slides)
+    middle = len(edited) // 2
+    _retitle(edited[middle], edited[middle]["title"] + " (edited)")
+    inserted = [copy.deepcopy(edited[middle])] + edited
+    _retitle(inserted[0], "Inserted slide")
+    deleted = inserted[:-1]
+    reordered = [deleted[-1]] + deleted[1:-1] + [deleted[0]]
+    return [("edit", edited), ("insert", inserted), ("delete", deleted), ("reorder", reordered)]
+
+
+def _slide_parts(path: str) -> dict:
+    with zipfile.ZipFile(path) as package:
+        return {
+            name: package.read(name)
+            for name in package.namelist()
+            if name.startswith(("ppt/slides/", "ppt/notesSlides/", "ppt/media/"))
+        }
+
+
+def run(sizes: list) -> dict:
+    directory = tempfile.mkdtemp(prefix="incremental_render_")
+    images = []
+    for color in ("red", "blue"):
+        path = os.path.join(directory, f"{color}.png")
+        Image.new("RGB", (400, 300), color).save(path)
+        images.append(path)
+
+    results = {}
+    for size in sizes:
+        deck = os.path.join(directory, f"deck_{size}.pptx")
+        reference = os.path.join(directory, f"full_{size}.pptx")
+        slides = make_slides(size, images)
+        start = time.perf_counter()
+        render_presentation_incremental(slides, deck, image_dirs=[directory])
+        entry = {"first_render_seconds": round(time.perf_counter() - start, 3)}
+        for name, edited in _edits(slides):
+            start = time.perf_counter()
+            render_presentation(edited, reference, image_dirs=[directory])
+            full_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            result = render_presentation_incremental(edited, deck, image_dirs=[directory])
+            incremental_seconds = time.perf_counter() - start
+            entry[name] = {
+                "full_seconds": round(full_seconds, 3),
+                "incremental_seconds": round(incremental_seconds, 3),
+                "rendered_slides": len(result.slide_timings),
+                "reused_slides": result.reused_slides,
+                "same_as_full_render": _slide_parts(deck) == _slide_parts(reference),
+            }
+        results[size] = entry
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes), indent=2))
@@ -0,0 +1,131 @@
+"""
+Serial vs parallel native rendering of 10/100/500-slide decks.
+
+For each deck size the serial ``render_presentation`` is timed against
+``render_presentation_parallel`` with pools of each ``--workers`` size
+(pools are started and warmed up before timing). Slides mix the layouts of
+``LAYOUT_HANDLERS``, two repeated pictures and speaker notes, so the merge
+has to renumber notes and store duplicate media once. Every parallel deck is
+checked to be byte-identical to the others of its size and to contain the
+same slide parts as the serial one.
+
+Speedups need as many cores as workers; ``cpu_count`` is reported.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.parallel_render --sizes 10 100 500 --workers 1 2 4
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from PIL import Image
+
+from phase1.metrics import metrics
+from phase1.parallel_render import render_presentation_parallel, split_ranges
+from phase1.projection import slide_input_hash
+from phase1.renderer import render_presentation
+
+LAYOUTS = ("title", "title-and-bullets", "two-column", "quote", "comparison")
+
+
+def make_slides(count: int, images: list) -> list:
+    slides = []
+    for index in range(count):
+        content = {
+            "layout_type": LAYOUTS[index % len(LAYOUTS)],
+            "title": f"Slide {index + 1}",
+            "content_blocks": [
+                {"type": "text", "text": [f"Point {point} of slide {index + 1}" for point in range(4)],
+                 "style": {"bullet_points": True}},
+                {"type": "image", "path": images[index % len(images)], "position": "right"},
+            ],
+            "speaker_notes": [f"Notes for slide {index + 1}"],
+        }
+        slide = {"title": content["title"], "slide_content": content}
+        slide["slide_content_hash"] = slide_input_hash(slide)
+        slides.append(slide)
+    return slides
+
+
+def _slide_digests(path: str) -> dict:
+    with zipfile.ZipFile(path) as package:
+        return {
+            name: hashlib.sha1(package.read(name)).hexdigest()
+            for name in package.namelist()
+            if name.startswith(("ppt/slides/", "ppt/notesSlides/", "ppt/media/"))
+        }
+
+
+def run(sizes: list, worker_counts: list, repeats: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="parallel_render_")
+    images = []
+    for color in ("red", "blue"):
+        path = os.path.join(directory, f"{color}.png")
+        Image.new("RGB", (400, 300), color).save(path)
+        images.append(path)
+
+    pools = {}
+    for workers in worker_counts:
+        pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        # start the processes and import the renderer before timing
+        wait([pools[workers].submit(render_presentation, [], os.path.join(directory, "warmup.pptx"))
+              for _ in range(workers)])
+
+    results = {"cpu_count": os.cpu_count(), "sizes": {}}
+    for size in sizes:
+        slides = make_slides(size, images)
+        serial_path = os.path.join(directory, f"serial_{size}.pptx")
+        start = time.perf_counter()
+        for _ in range(repeats):
+            render_presentation(slides, serial_path, image_dirs=[directory])
+        serial_seconds = (time.perf_counter() - start) / repeats
+        entry = {"serial_seconds": round(serial_seconds, 3), "parallel": {}}
+
+        digests = set()
+        for workers, pool in pools.items():
+            path = os.path.join(directory, f"parallel_{size}_{workers}.pptx")
+            metrics.reset()
+            start = time.perf_counter()
+            for _ in range(repeats):
+                render_presentation_parallel(
+                    slides, path, pool=pool,
+                    slides_per_task=len(split_ranges(size, workers)[0]), min_slides=0, image_dirs=[directory],
+                )
+            seconds = (time.perf_counter() - start) / repeats
+            with open(path, "rb") as f:
+                digests.add(hashlib.sha256(f.read()).hexdigest())
+            merges = metrics.samples("parallel_render.merge_seconds")
+            entry["parallel"][workers] = {
+                "seconds": round(seconds, 3),
+                "merge_seconds": round(sum(merges) / len(merges), 3),
+                "speedup": round(serial_seconds / seconds, 2),
+            }
+            entry["same_slides_as_serial"] = _slide_digests(path) == _slide_digests(serial_path)
+        entry["identical_across_worker_counts"] = len(digests) == 1
+        results["sizes"][size] = entry
+
+    for pool in pools.values():
+        pool.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="pool sizes (default: 1, 2, 4, ... up to the cores)")
+    parser.add_argument("--repeats", type=int, default=1)
+    args = parser.parse_args()
+    worker_counts = args.workers
+    if worker_counts is None:
+        cores = os.cpu_count() or 1
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cores:
+            worker_counts.append(worker_counts[-1] * 2)
+    print(json.dumps(run(args.sizes, worker_counts, args.repeats), indent=2))
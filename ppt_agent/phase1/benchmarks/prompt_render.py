@@ -0,0 +1,53 @@
+"""
+Per-call cost of producing a node's system prompt.
+
+Compares the previous path (``env.get_template(...).render()`` on every call)
+with the precompiled, memoized ``get_prompt_template``, and checks that the
+system prompt from ``apply_prompt_template`` stays byte-identical across calls
+now that ``CURRENT_TIME`` is a separate message.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.prompt_render --calls 10000
+"""
+
+import argparse
+import hashlib
+import json
+import time
+
+from phase1.prompts.template import apply_prompt_template, env, get_prompt_template, precompile_templates
+
+PROMPTS = ("ppt_initiator", "ppt_planner", "ppt_refiner", "user_task_manager", "slide_builder")
+
+
+def _per_call_us(render, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        render()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls: int) -> dict:
+    start = time.perf_counter()
+    precompile_templates()
+    results = {"precompile_ms": round((time.perf_counter() - start) * 1e3, 3), "per_call_us": {}}
+    for name in PROMPTS:
+        results["per_call_us"][name] = {
+            "get_template_render": round(_per_call_us(lambda: env.get_template(f"{name}.md").render(), calls), 3),
+            "memoized": round(_per_call_us(lambda: get_prompt_template(name), calls), 3),
+        }
+
+    digests = set()
+    for _ in range(3):
+        system_prompt = apply_prompt_template("ppt_planner", {"messages": []})[0]["content"]
+        digests.add(hashlib.sha256(system_prompt.encode("utf-8")).hexdigest())
+        time.sleep(1.1)
+    results["apply_prompt_template_system_prompt_stable"] = len(digests) == 1
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.calls), indent=2))
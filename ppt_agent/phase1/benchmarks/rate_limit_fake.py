@@ -0,0 +1,193 @@
+"""
+Rate limiter against a local fake LLM endpoint that answers 429.
+
+The endpoint (a stdlib HTTP server on localhost) serves at most
+``--server-concurrency`` requests at once, throttles randomly with
+``--throttle-rate``, and answers everything else after ``--latency``
+seconds. ``--calls`` requests are fired from ``--workers`` threads, once
+straight at the endpoint and once through ``RateLimitedChatModel``, and the
+429 count, failures, wall time, retries, queue depth and final AIMD window
+are reported.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.rate_limit_fake --calls 200 --workers 32
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from phase1.metrics import metrics, percentile
+from phase1.rate_limit import ModelRateLimiter, RateLimitedChatModel
+
+
+class FakeEndpointError(Exception):
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(f"HTTP {status_code} {message}".strip())
+        self.status_code = status_code
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """Localhost endpoint that throttles above ``max_concurrency`` in-flight requests."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, max_concurrency: int, throttle_rate: float, latency: float):
+        super().__init__(("127.0.0.1", 0), _FakeLLMHandler)
+        self.max_concurrency = max_concurrency
+        self.throttle_rate = throttle_rate
+        self.latency = latency
+        self.in_flight = 0
+        self.served = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/generate"
+
+
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        server: FakeLLMServer = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            throttle = server.in_flight >= server.max_concurrency or random.random() < server.throttle_rate
+            if throttle:
+                server.throttled += 1
+            else:
+                server.in_flight += 1
+        if throttle:
+            self._reply(429, {"error": "RESOURCE_EXHAUSTED"})
+            return
+        try:
+            time.sleep(server.latency)
+            self._reply(200, {"content": "ok", "total_tokens": 50})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+                server.served += 1
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class HttpChatModel(BaseChatModel):
+    """Chat model that POSTs to the fake endpoint and raises FakeEndpointError on HTTP errors."""
+
+    url: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-http"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"messages": [str(m.content) for m in messages]}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise FakeEndpointError(e.code, e.reason) from e
+        message = AIMessage(
+            content=body["content"],
+            usage_metadata={"input_tokens": 0, "output_tokens": 0, "total_tokens": body["total_tokens"]},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _drive(model, calls: int, workers: int) -> dict:
+    failures = 0
+
+    def call(index: int) -> None:
+        nonlocal failures
+        try:
+            model.invoke([HumanMessage(content=f"request {index}")])
+        except Exception:
+            failures += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(call, range(calls)))
+    return {"wall_s": round(time.perf_counter() - start, 3), "failures": failures}
+
+
+def run(
+    calls: int,
+    workers: int,
+    server_concurrency: int,
+    throttle_rate: float,
+    latency: float,
+    requests_per_minute: float,
+) -> dict:
+    results = {}
+    for mode in ("unlimited", "rate_limited"):
+        server = FakeLLMServer(server_concurrency, throttle_rate, latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        metrics.reset()
+        model = HttpChatModel(url=server.url)
+        limiter = None
+        if mode == "rate_limited":
+            limiter = ModelRateLimiter(
+                "fake",
+                requests_per_minute=requests_per_minute,
+                initial_concurrency=server_concurrency * 2,
+                max_concurrency=workers,
+                base_backoff_seconds=0.05,
+                max_backoff_seconds=1.0,
+            )
+            model = RateLimitedChatModel(model, limiter)
+        try:
+            result = _drive(model, calls, workers)
+        finally:
+            server.shutdown()
+            server.server_close()
+        result.update(served=server.served, throttled_429=server.throttled)
+        if limiter is not None:
+            snapshot = metrics.snapshot()
+            queue_depth = metrics.samples("rate_limit.queue_depth.fake")
+            result.update(
+                retries=snapshot["counters"].get("rate_limit.retries.fake", 0),
+                queue_depth_p95=percentile(queue_depth, 95) if queue_depth else 0,
+                final_concurrency_limit=round(limiter.window.limit, 2),
+            )
+        results[mode] = result
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--server-concurrency", type=int, default=4)
+    parser.add_argument("--throttle-rate", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rpm", type=float, default=6000, help="client requests per minute")
+    args = parser.parse_args()
+    print(json.dumps(
+        run(args.calls, args.workers, args.server_concurrency, args.throttle_rate, args.latency, args.rpm),
+        indent=2,
+    ))
@@ -0,0 +1,74 @@
+"""
+Hit rate and agreement of the rule-based router against logged LLM decisions.
+
+The replay set is a JSONL file with one ``{"requirement", "has_slides", "agent"}``
+object per line, as written by ``user_task_manager_node`` when
+``routing_log_path`` (env ``ROUTING_LOG_PATH``) is set. Without a file a small
+built-in set taken from the routing prompt's examples is used.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.routing_replay [--replay routing_log.jsonl] [--threshold 0.9]
+"""
+
+import argparse
+import json
+from collections import Counter
+
+from phase1.router import classify_intent
+
+BUILT_IN_REPLAY_SET = [
+    {"requirement": "Create presentation about AI", "has_slides": False, "agent": "ppt_planner"},
+    {"requirement": "Add slides about distribution", "has_slides": True, "agent": "ppt_planner"},
+    {"requirement": "Build the slides", "has_slides": True, "agent": "slide_builder"},
+    {"requirement": "generate slides", "has_slides": True, "agent": "slide_builder"},
+    {"requirement": "turn this into slides", "has_slides": True, "agent": "slide_builder"},
+    {"requirement": "Change the title", "has_slides": True, "agent": "ppt_refiner"},
+    {"requirement": "remove the image from slide 2", "has_slides": True, "agent": "ppt_refiner"},
+    {"requirement": "slide 3 is too long, shorten it", "has_slides": True, "agent": "ppt_refiner"},
+    {"requirement": "Download the PPT", "has_slides": True, "agent": "pptx_coder"},
+    {"requirement": "give me the file", "has_slides": True, "agent": "pptx_coder"},
+    {"requirement": "export it", "has_slides": True, "agent": "pptx_coder"},
+    {
+        "requirement": "can you add few more slide about it distribution of where which flowers are found across india",
+        "has_slides": True,
+        "agent": "ppt_planner",
+    },
+    {"requirement": "reorganize the presentation and save it", "has_slides": True, "agent": "ppt_planner"},
+]
+
+
+def load_replay_set(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(records: list[dict], threshold: float) -> dict:
+    """Replay ``records`` through the rule-based router at ``threshold``."""
+    fast_routed = agreed = 0
+    disagreements = Counter()
+    for record in records:
+        decision = classify_intent(record["requirement"], record.get("has_slides", True))
+        if decision.agent is None or decision.confidence < threshold:
+            continue
+        fast_routed += 1
+        if decision.agent == record.get("agent"):
+            agreed += 1
+        else:
+            disagreements[f"{decision.agent} (llm: {record.get('agent')})"] += 1
+    return {
+        "threshold": threshold,
+        "records": len(records),
+        "fast_path_hit_rate": fast_routed / len(records) if records else 0.0,
+        "agreement_with_llm": agreed / fast_routed if fast_routed else None,
+        "disagreements": dict(disagreements),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--replay", help="JSONL replay set (defaults to the built-in set)")
+    parser.add_argument("--threshold", type=float, action="append")
+    args = parser.parse_args()
+    records = load_replay_set(args.replay) if args.replay else BUILT_IN_REPLAY_SET
+    for threshold in args.threshold or [0.5, 0.7, 0.9]:
+        print(json.dumps(evaluate(records, threshold)))
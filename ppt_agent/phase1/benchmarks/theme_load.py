@@ -0,0 +1,134 @@
+"""
+Cost of starting a deck from a theme master, cold vs cached.
+
+* ``cold``: ``Presentation(path)`` for every deck (unzip + XML parse)
+* ``cached``: ``ThemeRegistry.new_presentation``, a clone of the master
+  parsed once (the one-off parse is reported as ``first_parse_ms``)
+
+Both are measured for the bare master and for a full native render of
+``--slides`` slides. Without ``--master`` a synthetic corporate-sized master
+is built: the default template with ``--shapes`` decorative copies of every
+layout's shapes and a ``--image-px`` noise image (incompressible) on the
+slide master.
+
+Usage (from the ``ppt_agent`` directory):
+    python -m phase1.benchmarks.theme_load --decks 30 --slides 20
+    python -m phase1.benchmarks.theme_load --master path/to/corporate.potx
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from PIL import Image
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.util import Inches
+
+from phase1.metrics import percentile
+from phase1.renderer import render_presentation, slide_content_from_plan
+from phase1.themes import ThemeRegistry
+
+
+def build_master(path: str, shapes: int, image_px: int) -> None:
+    prs = Presentation()
+    for layout in prs.slide_layouts:
+        tree = layout.shapes._spTree
+        originals = list(tree.iterchildren())[2:]
+        for _ in range(shapes):
+            for shape in originals:
+                decoration = copy.deepcopy(shape)
+                # not placeholders: they would be copied onto every slide
+                for placeholder in decoration.xpath(".//p:nvPr/p:ph"):
+                    placeholder.getparent().remove(placeholder)
+                tree.append(decoration)
+
+    # python-pptx cannot add pictures to a master: add one to a slide, then
+    # move the picture element and relate the master to its image part
+    image = io.BytesIO()
+    Image.frombytes("RGB", (image_px, image_px), os.urandom(image_px * image_px * 3)).save(image, "PNG")
+    image.seek(0)
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    picture = slide.shapes.add_picture(image, 0, 0, width=Inches(1))
+    image_part = slide.part.related_part(picture._element.blipFill.blip.rEmbed)
+    master = prs.slide_master
+    picture._element.blipFill.blip.rEmbed = master.part.relate_to(image_part, RT.IMAGE)
+    master.shapes._spTree.append(picture._element)
+
+    slide_ids = prs.slides._sldIdLst
+    slide_id = slide_ids[0]
+    slide_ids.remove(slide_id)
+    prs.part.drop_rel(slide_id.rId)
+    prs.save(path)
+
+
+def _timed_ms(function, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return samples
+
+
+def _summary(samples: list) -> dict:
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+    }
+
+
+def run(master: str, decks: int, slides: int) -> dict:
+    plan = [
+        {"title": f"Slide {i + 1}", "content": "First point\nSecond point\nThird point", "image": ""}
+        for i in range(slides)
+    ]
+    for slide in plan:
+        slide["slide_content"] = slide_content_from_plan(slide)
+    output = os.path.join(tempfile.mkdtemp(prefix="theme_load_"), "deck.pptx")
+
+    registry = ThemeRegistry({"corporate": master})
+    start = time.perf_counter()
+    theme = registry.get("corporate")
+    first_parse_ms = (time.perf_counter() - start) * 1e3
+
+    cold_open = _timed_ms(lambda: Presentation(master), decks)
+    cached_open = _timed_ms(lambda: registry.new_presentation("corporate"), decks)
+    cold_render = _timed_ms(lambda: render_presentation(plan, output, prs=Presentation(master)), decks)
+    cached_render = _timed_ms(
+        lambda: render_presentation(plan, output, prs=registry.new_presentation("corporate")), decks
+    )
+    return {
+        "master": {
+            "path": master,
+            "bytes": os.path.getsize(master),
+            "layouts": len(theme.layouts),
+            "placeholders": sum(len(items) for items in theme.placeholders.values()),
+        },
+        "params": {"decks": decks, "slides": slides},
+        "first_parse_ms": round(first_parse_ms, 3),
+        "open": {"cold": _summary(cold_open), "cached": _summary(cached_open)},
+        "render": {"cold": _summary(cold_render), "cached": _summary(cached_render)},
+        "open_speedup": round(statistics.mean(cold_open) / statistics.mean(cached_open), 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--master", help=".potx/.pptx master (default: build a synthetic one)")
+    parser.add_argument("--decks", type=int, default=30)
+    parser.add_argument("--slides", type=int, default=20)
+    parser.add_argument("--shapes", type=int, default=40, help="copies of each layout's shapes in the synthetic master")
+    parser.add_argument("--image-px", type=int, default=1500, help="side of the synthetic master's image")
+    args = parser.parse_args()
+    master = args.master
+    if master is None:
+        master = os.path.join(tempfile.mkdtemp(prefix="theme_master_"), "master.pptx")
+        build_master(master, args.shapes, args.image_px)
+    print(json.dumps(run(master, args.decks, args.slides), indent=2))
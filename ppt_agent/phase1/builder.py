@@ -1,32 +1,87 @@
 from langgraph.graph import END, START, StateGraph
 from dotenv import load_dotenv
 import logging
+import threading
+from pathlib import Path
+from phase1.config import load_yaml_config
+from phase1.prompts.template import precompile_templates
 from phase1.state import PPTState
 from phase1.nodes import user_task_manager_node, user_input_node, ppt_planner_node, ppt_initiator_node, ppt_refiner_node, pptx_coder_node, slide_builder_node
+from phase1.async_nodes import auser_task_manager_node, appt_planner_node, appt_initiator_node, appt_refiner_node, aslide_builder_node
+from phase1.checkpoint import SQLiteCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 
-checkpointer = MemorySaver()
-
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
-def build_graph():
-    """Build and return the ppt workflow graph."""
+
+def create_checkpointer():
+    """Create the checkpointer described by the CHECKPOINTER section of conf.yaml."""
+    conf = load_yaml_config(str(Path(__file__).parent / "conf.yaml")).get("CHECKPOINTER") or {}
+    if conf.get("backend", "sqlite") == "memory":
+        return MemorySaver()
+    path = conf.get("path", ".cache/checkpoints.sqlite3")
+    if not Path(path).is_absolute():
+        path = str(Path(__file__).parent / path)
+    return SQLiteCheckpointSaver(
+        path,
+        max_checkpoints_per_thread=conf.get("max_checkpoints_per_thread", 20),
+        max_threads=conf.get("max_threads", 100),
+    )
+
+
+# shared checkpointer, created by the first graph that needs it so that
+# importing this module does not open the checkpoint database
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """Return the shared checkpointer, creating it on first use."""
+    global _checkpointer
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                _checkpointer = create_checkpointer()
+    return _checkpointer
+
+SYNC_NODES = {
+    "user_input_node": user_input_node,
+    "user_task_manager_node": user_task_manager_node,
+    "ppt_planner_node": ppt_planner_node,
+    "ppt_initiator_node": ppt_initiator_node,
+    "ppt_refiner_node": ppt_refiner_node,
+    "pptx_coder_node": pptx_coder_node,
+    "slide_builder_node": slide_builder_node,
+}
+
+# same graph, LLM-calling nodes swapped for their async variants
+ASYNC_NODES = {
+    **SYNC_NODES,
+    "user_task_manager_node": auser_task_manager_node,
+    "ppt_planner_node": appt_planner_node,
+    "ppt_initiator_node": appt_initiator_node,
+    "ppt_refiner_node": appt_refiner_node,
+    "slide_builder_node": aslide_builder_node,
+}
+
+def build_graph(use_async: bool = False, graph_checkpointer=None):
+    """Build and return the ppt workflow graph.
+
+    With ``use_async`` the LLM-calling nodes are coroutines and the graph must be
+    driven with ``ainvoke``/``astream`` from an event loop. ``graph_checkpointer``
+    overrides the checkpointer configured in conf.yaml.
+    """
     # build state graph
-    print("Building graph Agsin")
-    print(PPTState)
+    logger.info("Building %s graph", "async" if use_async else "sync")
+    precompile_templates()
     builder = StateGraph(PPTState)
     builder.add_edge(START, "user_input_node")
-    builder.add_node("user_input_node", user_input_node)
-    builder.add_node("user_task_manager_node", user_task_manager_node)
-    builder.add_node("ppt_planner_node", ppt_planner_node)
-    builder.add_node("ppt_initiator_node",  ppt_initiator_node)
-    builder.add_node("ppt_refiner_node",  ppt_refiner_node)
-    builder.add_node("pptx_coder_node", pptx_coder_node)
-    builder.add_node("slide_builder_node", slide_builder_node)
+    for name, node in (ASYNC_NODES if use_async else SYNC_NODES).items():
+        builder.add_node(name, node)
     builder.add_edge("user_task_manager_node", END)
-    return builder.compile(checkpointer=checkpointer)
+    return builder.compile(checkpointer=graph_checkpointer or get_checkpointer())
 
 
 # def build_graph():
@@ -15,6 +15,8 @@ AGENT_LLM_MAP: dict[str, LLMType] = {
     "user_task_manager": "basic",
     "ppt_refiner": "basic",
     "slide_builder": "basic",
+    "requirement_summarizer": "basic",
+    "json_repair": "basic",
     "reporter": "basic",
     "podcast_script_writer": "basic",
     "ppt_composer": "basic",
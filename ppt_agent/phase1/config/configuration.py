@@ -15,6 +15,13 @@ class Configuration:
     max_plan_iterations: int = 1  # Maximum number of plan iterations
     max_step_num: int = 3  # Maximum number of steps in a plan
     mcp_settings: dict = None  # MCP settings, including dynamic loaded tools
+    slide_builder_concurrency: int = 4  # Maximum number of slides built in parallel
+    pipeline_slide_building: bool = False  # Build each slide while the planner is still streaming the plan
+    requirement_history_window: int = 4  # Latest requirements sent verbatim to the router, older ones are summarized
+    fast_route_threshold: float = 0.9  # Rule-based routing confidence needed to skip the LLM router
+    routing_log_path: str = None  # JSONL file that LLM routing decisions are appended to (replay set)
+    pptx_renderer: str = "native"  # "native" renders slide_content directly, "parallel" does so in a process pool, "incremental" re-renders only changed slides, "llm" asks the model for code
+    pptx_theme: str = None  # THEMES name (conf.yaml) or path of the .potx/.pptx master; None is the python-pptx default
 
     @classmethod
     def from_runnable_config(
@@ -24,9 +31,20 @@ class Configuration:
         configurable = (
             config["configurable"] if config and "configurable" in config else {}
         )
-        values: dict[str, Any] = {
-            f.name: os.environ.get(f.name.upper(), configurable.get(f.name))
-            for f in fields(cls)
-            if f.init
-        }
-        return cls(**{k: v for k, v in values.items() if v})
+        values: dict[str, Any] = {}
+        for f in fields(cls):
+            if not f.init:
+                continue
+            value = os.environ.get(f.name.upper(), configurable.get(f.name))
+            if value is not None:
+                values[f.name] = _convert(value, f.type)
+        return cls(**values)
+
+
+def _convert(value: Any, field_type: Any) -> Any:
+    """Cast a value, e.g. a string from the environment, to the field's type."""
+    if field_type is bool and isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    if field_type in (int, float) and not isinstance(value, bool):
+        return field_type(value)
+    return value
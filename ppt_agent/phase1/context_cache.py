@@ -0,0 +1,357 @@
+"""
+Provider-side context caching of the static system prompts.
+
+The system prompts in ``phase1/prompts`` are byte-stable (see
+``prompts.template``) and several KB each, yet they are sent with every call.
+``ContextCacheRegistry`` registers each one once per model with a backend
+and hands out the handle of the cached content; ``ContextCachedChatModel``
+then sends the handle instead of the prompt. Handles are re-registered
+``refresh_margin_seconds`` before their TTL runs out, and a handle the
+provider no longer knows is dropped and the call retried once.
+
+Backends:
+
+* ``GeminiContextCacheBackend`` creates Gemini cached contents and passes
+  them as ``cached_content`` to ``ChatGoogleGenerativeAI``.
+* ``LocalContextCacheBackend`` is an in-process stand-in with the same
+  contract (handles, TTL, lookups that fail once expired) for tests and the
+  benchmarks; it resolves the handle back into the system message.
+
+Cached and uncached input tokens, registrations, refreshes and the latency
+of calls with and without a handle are recorded in ``phase1.metrics`` under
+``context_cache.*.<model>``.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+
+from phase1.metrics import estimate_tokens, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ContextCacheMiss(LookupError):
+    """A handle that the backend no longer knows (expired or deleted)."""
+
+
+def is_missing_cache_error(error: BaseException) -> bool:
+    """True when a request was rejected because its cached content is gone."""
+    while error is not None:
+        if isinstance(error, ContextCacheMiss):
+            return True
+        message = str(error).lower()
+        if "cachedcontent" in message and (
+            "not found" in message or getattr(error, "code", None) in (403, 404)
+        ):
+            return True
+        error = error.__cause__
+    return False
+
+
+class LocalContextCacheBackend:
+    """In-process stand-in for a provider context cache."""
+
+    def __init__(self):
+        self._contents: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, model: str, system_prompt: str, ttl_seconds: float) -> str:
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._contents[name] = (system_prompt, time.time() + ttl_seconds)
+        return name
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            self._contents.pop(name, None)
+
+    def prepare(
+        self, name: str, messages: List[BaseMessage], kwargs: Dict[str, Any]
+    ) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+        """Resolve ``name`` back into the system message, as the provider would."""
+        with self._lock:
+            system_prompt, expires_at = self._contents.get(name, (None, 0.0))
+            if system_prompt is not None and time.time() >= expires_at:
+                del self._contents[name]
+                system_prompt = None
+        if system_prompt is None:
+            raise ContextCacheMiss(f"CachedContent not found: {name}")
+        return [SystemMessage(content=system_prompt)] + messages[1:], kwargs
+
+
+class GeminiContextCacheBackend:
+    """Gemini cached contents, referenced through ``cached_content``."""
+
+    def __init__(self, api_key: Optional[str] = None):
+        # imported here so that importing the graph does not pay for the Gemini SDK
+        from google import genai
+
+        self._client = genai.Client(api_key=api_key) if api_key else genai.Client()
+
+    def create(self, model: str, system_prompt: str, ttl_seconds: float) -> str:
+        from google.genai import types
+
+        cache = self._client.caches.create(
+            model=model if model.startswith("models/") else f"models/{model}",
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_prompt,
+                ttl=f"{int(ttl_seconds)}s",
+            ),
+        )
+        return cache.name
+
+    def delete(self, name: str) -> None:
+        self._client.caches.delete(name=name)
+
+    def prepare(
+        self, name: str, messages: List[BaseMessage], kwargs: Dict[str, Any]
+    ) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+        # the cached content carries the system instruction, the request must not
+        return messages[1:], {**kwargs, "cached_content": name}
+
+
+class _Entry:
+    __slots__ = ("name", "expires_at", "lock")
+
+    def __init__(self):
+        self.name: Optional[str] = None
+        self.expires_at = 0.0
+        self.lock = threading.Lock()
+
+
+class ContextCacheRegistry:
+    """Handles of registered system prompts, per model and prompt hash.
+
+    Prompts estimated below ``min_tokens`` are not registered (providers
+    refuse small caches). A failed registration is not retried for
+    ``retry_failed_after_seconds``; those calls send the prompt inline.
+    """
+
+    def __init__(
+        self,
+        backend,
+        ttl_seconds: float = 3600,
+        refresh_margin_seconds: float = 60,
+        min_tokens: int = 1024,
+        retry_failed_after_seconds: float = 300,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.min_tokens = min_tokens
+        self.retry_failed_after_seconds = retry_failed_after_seconds
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, model: str, system_prompt: str) -> _Entry:
+        key = (model, hashlib.sha256(system_prompt.encode("utf-8")).hexdigest())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return entry
+
+    def handle(self, model: str, system_prompt: str) -> Optional[str]:
+        """Return a live handle for ``system_prompt``, registering it when needed."""
+        if estimate_tokens(system_prompt) < self.min_tokens:
+            return None
+        entry = self._entry(model, system_prompt)
+        if time.time() < entry.expires_at - self.refresh_margin_seconds:
+            return entry.name
+        # one registration per prompt at a time, other prompts are not held up
+        with entry.lock:
+            now = time.time()
+            if now < entry.expires_at - self.refresh_margin_seconds:
+                return entry.name
+            refresh = entry.name is not None
+            try:
+                # the previous handle stays valid until it expires, calls in
+                # flight keep using it, so it is not deleted here
+                name = self.backend.create(model, system_prompt, self.ttl_seconds)
+            except Exception as e:
+                logger.warning("Could not register a context cache for %s: %s", model, e)
+                metrics.incr(f"context_cache.registration_failures.{model}")
+                entry.name = None
+                entry.expires_at = now + self.retry_failed_after_seconds + self.refresh_margin_seconds
+                return None
+            entry.name = name
+            entry.expires_at = now + self.ttl_seconds
+        metrics.incr(f"context_cache.{'refreshes' if refresh else 'registrations'}.{model}")
+        return name
+
+    def invalidate(self, model: str, system_prompt: str, name: str) -> None:
+        """Forget ``name`` after the provider reported it missing."""
+        entry = self._entry(model, system_prompt)
+        with entry.lock:
+            if entry.name == name:
+                entry.name = None
+                entry.expires_at = 0.0
+        metrics.incr(f"context_cache.expired_handles.{model}")
+
+    def stats(self) -> Dict[str, int]:
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "prompts": len(entries),
+            "live_handles": sum(1 for entry in entries if entry.name and now < entry.expires_at),
+        }
+
+
+def _input_tokens(response, messages: List[BaseMessage], cached_prompt: Optional[str]) -> Tuple[int, int]:
+    """(cached, uncached) input tokens, from the usage metadata when the provider reports it."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    estimated_cached = estimate_tokens(cached_prompt) if cached_prompt else 0
+    if usage.get("input_tokens"):
+        cached = (usage.get("input_token_details") or {}).get("cache_read")
+        if cached is None:
+            cached = estimated_cached
+        return cached, max(0, usage["input_tokens"] - cached)
+    total = sum(estimate_tokens(str(message.content)) for message in messages)
+    return estimated_cached, max(0, total - estimated_cached)
+
+
+class ContextCachedChatModel:
+    """Wraps a chat model so a leading static system prompt is sent as a cache handle.
+
+    Only requests whose first message is the sole ``SystemMessage`` use the
+    cache, everything else goes to the wrapped model unchanged.
+    """
+
+    def __init__(self, llm, registry: ContextCacheRegistry, model_name: str):
+        self.llm = llm
+        self.registry = registry
+        self.model_name = model_name
+
+    def _system_prompt(self, input: Any, kwargs: Dict[str, Any]) -> Optional[str]:
+        if not isinstance(input, list) or not input or "cached_content" in kwargs:
+            return None
+        first = input[0]
+        if not isinstance(first, SystemMessage) or not isinstance(first.content, str):
+            return None
+        if any(isinstance(message, SystemMessage) for message in input[1:]):
+            return None
+        return first.content
+
+    def _handle(self, input: Any, kwargs: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """(system prompt, handle) of a request, the handle is None when it is sent inline."""
+        system_prompt = self._system_prompt(input, kwargs)
+        return system_prompt, self.registry.handle(self.model_name, system_prompt) if system_prompt else None
+
+    def _prepare(self, name: Optional[str], input: Any, kwargs: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        if name is None:
+            return input, kwargs
+        return self.registry.backend.prepare(name, input, kwargs)
+
+    def _record(self, input: Any, response, name: Optional[str], system_prompt: Optional[str], seconds: float) -> None:
+        cached, uncached = _input_tokens(response, input, system_prompt if name else None)
+        metrics.incr(f"context_cache.cached_tokens.{self.model_name}", cached)
+        metrics.incr(f"context_cache.uncached_tokens.{self.model_name}", uncached)
+        metrics.observe(f"context_cache.latency_seconds.{'cached' if name else 'uncached'}.{self.model_name}", seconds)
+
+    def invoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        for retry in (False, True):
+            system_prompt, name = self._handle(input, kwargs)
+            start = time.perf_counter()
+            try:
+                messages, call_kwargs = self._prepare(name, input, kwargs)
+                response = self.llm.invoke(messages, config, **call_kwargs)
+            except Exception as e:
+                if name is None or retry or not is_missing_cache_error(e):
+                    raise
+                self.registry.invalidate(self.model_name, system_prompt, name)
+                continue
+            self._record(input, response, name, system_prompt, time.perf_counter() - start)
+            return response
+
+    async def ainvoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        for retry in (False, True):
+            system_prompt, name = self._handle(input, kwargs)
+            start = time.perf_counter()
+            try:
+                messages, call_kwargs = self._prepare(name, input, kwargs)
+                response = await self.llm.ainvoke(messages, config, **call_kwargs)
+            except Exception as e:
+                if name is None or retry or not is_missing_cache_error(e):
+                    raise
+                self.registry.invalidate(self.model_name, system_prompt, name)
+                continue
+            self._record(input, response, name, system_prompt, time.perf_counter() - start)
+            return response
+
+    def stream(self, input: List[BaseMessage], config=None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        for retry in (False, True):
+            system_prompt, name = self._handle(input, kwargs)
+            start = time.perf_counter()
+            response = None
+            try:
+                messages, call_kwargs = self._prepare(name, input, kwargs)
+                for chunk in self.llm.stream(messages, config, **call_kwargs):
+                    if response is None:
+                        metrics.observe(
+                            f"context_cache.first_token_seconds.{'cached' if name else 'uncached'}.{self.model_name}",
+                            time.perf_counter() - start,
+                        )
+                    response = chunk if response is None else response + chunk
+                    yield chunk
+            except Exception as e:
+                # nothing was yielded yet when the handle is rejected
+                if name is None or retry or response is not None or not is_missing_cache_error(e):
+                    raise
+                self.registry.invalidate(self.model_name, system_prompt, name)
+                continue
+            self._record(input, response, name, system_prompt, time.perf_counter() - start)
+            return
+
+    async def astream(
+        self, input: List[BaseMessage], config=None, **kwargs: Any
+    ) -> AsyncIterator[AIMessageChunk]:
+        for retry in (False, True):
+            system_prompt, name = self._handle(input, kwargs)
+            start = time.perf_counter()
+            response = None
+            try:
+                messages, call_kwargs = self._prepare(name, input, kwargs)
+                async for chunk in self.llm.astream(messages, config, **call_kwargs):
+                    if response is None:
+                        metrics.observe(
+                            f"context_cache.first_token_seconds.{'cached' if name else 'uncached'}.{self.model_name}",
+                            time.perf_counter() - start,
+                        )
+                    response = chunk if response is None else response + chunk
+                    yield chunk
+            except Exception as e:
+                if name is None or retry or response is not None or not is_missing_cache_error(e):
+                    raise
+                self.registry.invalidate(self.model_name, system_prompt, name)
+                continue
+            self._record(input, response, name, system_prompt, time.perf_counter() - start)
+            return
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+
+def context_cache_stats(counters: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """Per-model cached/uncached input tokens from ``metrics.snapshot()["counters"]``."""
+    prefix = "context_cache.cached_tokens."
+    stats = {}
+    for counter, cached in counters.items():
+        if not counter.startswith(prefix):
+            continue
+        model = counter[len(prefix):]
+        uncached = counters.get(f"context_cache.uncached_tokens.{model}", 0)
+        stats[model] = {
+            "cached_tokens": cached,
+            "uncached_tokens": uncached,
+            "cached_ratio": cached / (cached + uncached) if cached + uncached else 0.0,
+            "registrations": counters.get(f"context_cache.registrations.{model}", 0),
+            "refreshes": counters.get(f"context_cache.refreshes.{model}", 0),
+        }
+    return stats
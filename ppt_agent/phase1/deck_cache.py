@@ -0,0 +1,173 @@
+"""
+Cache of rendered decks keyed by the state they were rendered from.
+
+Asking to download an unchanged deck again used to re-run the renderer, and
+with ``pptx_renderer="llm"`` to ask the LLM for the same program and execute
+it again. ``deck_key`` hashes the part of the state the deck is made from
+(``ppt_title``, ``key_messages`` and the slides' input fields, plus the
+layout each slide is rendered from and the theme for the native renderers);
+``DeckCache`` keeps the .pptx bytes, and the generated code when there is
+one, under that key.
+
+Entries live as files in one directory (modification time = creation,
+access time = last hit). Entries older than ``max_age_seconds`` are
+dropped, and the least recently used ones go once the cache exceeds
+``max_bytes``. Hits, misses and evictions are counted in
+``phase1.metrics`` under ``deck_cache.*``.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from phase1.config import load_yaml_config
+from phase1.metrics import metrics
+from phase1.projection import project_fields
+from phase1.renderer import renderable_content
+
+DECK_FIELDS = ("ppt_title", "key_messages", "slides")
+
+# shared cache, built from the DECK_CACHE section of conf.yaml
+_deck_cache = None
+_deck_cache_lock = threading.Lock()
+
+
+def deck_key(state: Mapping[str, Any], renderer: str, theme: Optional[str] = None) -> str:
+    """Hash of what ``renderer`` builds the deck from.
+
+    ``theme`` is the fingerprint of the master the deck is cloned from
+    (``phase1.themes.Theme.fingerprint``), if any.
+    """
+    payload = {"renderer": renderer, **project_fields(state, DECK_FIELDS)}
+    if theme:
+        payload["theme"] = theme
+    if renderer != "llm":
+        # the native renderers draw the built layouts (or the plan of slides
+        # whose layout is stale), not the plan alone
+        payload["slide_content"] = [renderable_content(slide) for slide in state.get("slides") or []]
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedDeck:
+    pptx: bytes
+    code: Optional[str] = None
+
+
+class DeckCache:
+    """Directory of ``<key>.pptx`` (and ``<key>.py``) files with age and size limits."""
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, max_age_seconds: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _files(self, key: str) -> tuple:
+        return os.path.join(self.path, f"{key}.pptx"), os.path.join(self.path, f"{key}.py")
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+
+    def _remove(self, key: str) -> None:
+        for file_path in self._files(key):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[CachedDeck]:
+        """Return the deck cached under ``key``, or None on a miss."""
+        pptx_path, code_path = self._files(key)
+        with self._lock:
+            try:
+                stat = os.stat(pptx_path)
+                if self._expired(stat.st_mtime, time.time()):
+                    self._remove(key)
+                    metrics.incr("deck_cache.evictions.age")
+                    raise FileNotFoundError(pptx_path)
+                with open(pptx_path, "rb") as f:
+                    pptx = f.read()
+                code = None
+                if os.path.exists(code_path):
+                    with open(code_path, encoding="utf-8") as f:
+                        code = f.read()
+                # the access time drives the size eviction order, the
+                # modification time stays the creation time
+                os.utime(pptx_path, (time.time(), stat.st_mtime))
+            except FileNotFoundError:
+                metrics.incr("deck_cache.misses")
+                return None
+        metrics.incr("deck_cache.hits")
+        return CachedDeck(pptx=pptx, code=code)
+
+    def put(self, key: str, pptx: bytes, code: Optional[str] = None) -> None:
+        pptx_path, code_path = self._files(key)
+        with self._lock:
+            if code is not None:
+                self._write(code_path, code.encode("utf-8"))
+            # written last, a reader never sees a deck without its code
+            self._write(pptx_path, pptx)
+            self._evict()
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        # other processes may share the directory: never expose a half-written file under its final name
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self) -> None:
+        # caller holds the lock
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".pptx"):
+                continue
+            key = name[: -len(".pptx")]
+            pptx_path, code_path = self._files(key)
+            try:
+                stat = os.stat(pptx_path)
+                size = stat.st_size + (os.path.getsize(code_path) if os.path.exists(code_path) else 0)
+            except FileNotFoundError:
+                continue
+            if self._expired(stat.st_mtime, now):
+                self._remove(key)
+                metrics.incr("deck_cache.evictions.age")
+                continue
+            entries.append((stat.st_atime, size, key))
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            metrics.incr("deck_cache.evictions.size")
+
+
+def get_deck_cache() -> Optional[DeckCache]:
+    """Return the shared cache, or None when DECK_CACHE is disabled in conf.yaml."""
+    global _deck_cache
+    conf = load_yaml_config(str(Path(__file__).parent / "conf.yaml")).get("DECK_CACHE") or {}
+    if not conf.get("enabled", False):
+        return None
+    if _deck_cache is None:
+        with _deck_cache_lock:
+            if _deck_cache is None:
+                path = conf.get("path", ".cache/decks")
+                if not Path(path).is_absolute():
+                    path = str(Path(__file__).parent / path)
+                _deck_cache = DeckCache(
+                    path,
+                    max_bytes=conf.get("max_bytes", 256 * 1024 * 1024),
+                    max_age_seconds=conf.get("max_age_seconds"),
+                )
+    return _deck_cache
@@ -0,0 +1,289 @@
+"""
+Hedged LLM requests.
+
+A few slow Gemini answers dominate the p99 of the nodes. For idempotent
+calls ``HedgedChatModel`` starts the request, and when nothing has come back
+by the ``percentile`` latency of recent calls it fires one duplicate and
+keeps whichever answers first. Streams race on the first chunk, so the
+deadline of a stream is a time-to-first-token deadline.
+
+Duplicates are capped by ``HedgePolicy.max_hedge_ratio`` (hedges / calls).
+Counters ``hedge.calls``, ``hedge.issued``, ``hedge.wins`` (the duplicate
+answered first) and ``hedge.budget_exhausted`` are recorded per policy
+name in ``phase1.metrics``.
+"""
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from phase1.metrics import metrics, percentile
+
+# attempts run here so the caller can time out on them; sized for the slide
+# builder fan-out with one duplicate per call
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+
+
+class HedgePolicy:
+    """Latency history, hedge deadline and duplicate budget of one agent."""
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95,
+        min_samples: int = 20,
+        default_deadline_seconds: float = 10.0,
+        max_hedge_ratio: float = 0.1,
+        history: int = 200,
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_deadline_seconds = default_deadline_seconds
+        self.max_hedge_ratio = max_hedge_ratio
+        self._latencies: Dict[str, deque] = {
+            "invoke": deque(maxlen=history),
+            "stream": deque(maxlen=history),
+        }
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def start_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+        metrics.incr(f"hedge.calls.{self.name}")
+
+    def deadline(self, kind: str) -> float:
+        """Seconds to wait for the first attempt before hedging."""
+        with self._lock:
+            samples = list(self._latencies[kind])
+        if len(samples) < self.min_samples:
+            return self.default_deadline_seconds
+        return percentile(samples, self.percentile)
+
+    def record(self, kind: str, seconds: float, hedge_won: bool) -> None:
+        """Record the latency of the winning attempt, measured from its own start.
+
+        Timing the whole hedged call instead would feed ``deadline + latency``
+        back into the percentile and push the deadline up over time.
+        """
+        with self._lock:
+            self._latencies[kind].append(seconds)
+        if hedge_won:
+            metrics.incr(f"hedge.wins.{self.name}")
+
+    def try_hedge(self) -> bool:
+        """Claim budget for one duplicate request."""
+        with self._lock:
+            if self.hedges + 1 > self.max_hedge_ratio * self.calls:
+                allowed = False
+            else:
+                self.hedges += 1
+                allowed = True
+        metrics.incr(f"hedge.issued.{self.name}" if allowed else f"hedge.budget_exhausted.{self.name}")
+        return allowed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "stream_samples": len(self._latencies["stream"]),
+                "invoke_samples": len(self._latencies["invoke"]),
+            }
+
+
+class HedgedChatModel:
+    """Wraps a chat model so slow calls are raced against one duplicate.
+
+    Only use it for idempotent prompts: both attempts may complete. Errors are
+    not hedged, an attempt that fails only loses the race.
+    """
+
+    def __init__(self, llm, policy: HedgePolicy):
+        self.llm = llm
+        self.policy = policy
+
+    def invoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        self.policy.start_call()
+        start = time.perf_counter()
+
+        def submit():
+            # copy the context so callbacks of the calling node still apply
+            return _executor.submit(contextvars.copy_context().run, self.llm.invoke, input, config, **kwargs)
+
+        attempts, started = [submit()], [start]
+        done, _ = wait(attempts, timeout=self.policy.deadline("invoke"))
+        if not done and self.policy.try_hedge():
+            attempts.append(submit())
+            started.append(time.perf_counter())
+
+        pending, error = set(attempts), None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    index = attempts.index(future)
+                    self.policy.record("invoke", time.perf_counter() - started[index], index != 0)
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def ainvoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        self.policy.start_call()
+        start = time.perf_counter()
+        attempts, started = [asyncio.ensure_future(self.llm.ainvoke(input, config, **kwargs))], [start]
+        done, _ = await asyncio.wait(attempts, timeout=self.policy.deadline("invoke"))
+        if not done and self.policy.try_hedge():
+            attempts.append(asyncio.ensure_future(self.llm.ainvoke(input, config, **kwargs)))
+            started.append(time.perf_counter())
+
+        pending, error = set(attempts), None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        index = attempts.index(task)
+                        self.policy.record("invoke", time.perf_counter() - started[index], index != 0)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stream(self, input: List[BaseMessage], config=None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        self.policy.start_call()
+        start = time.perf_counter()
+        events: "queue.Queue[tuple]" = queue.Queue()
+        stops: List[threading.Event] = []
+
+        def pump(attempt: int, stop: threading.Event) -> None:
+            try:
+                for chunk in self.llm.stream(input, config, **kwargs):
+                    if stop.is_set():
+                        return
+                    events.put((attempt, "chunk", chunk))
+                events.put((attempt, "done", None))
+            except Exception as e:
+                events.put((attempt, "error", e))
+
+        started: List[float] = []
+
+        def launch() -> None:
+            started.append(time.perf_counter())
+            stops.append(threading.Event())
+            _executor.submit(contextvars.copy_context().run, pump, len(stops) - 1, stops[-1])
+
+        launch()
+        deadline = start + self.policy.deadline("stream")
+        winner, failed = None, 0
+        try:
+            while True:
+                timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+                try:
+                    attempt, kind, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    deadline = None
+                    if self.policy.try_hedge():
+                        launch()
+                    continue
+                if winner is None:
+                    if kind == "error":
+                        failed += 1
+                        # every attempt launched so far failed
+                        if failed == len(stops):
+                            raise payload
+                        continue
+                    winner = attempt
+                    self.policy.record("stream", time.perf_counter() - started[attempt], attempt != 0)
+                    for index, stop in enumerate(stops):
+                        if index != winner:
+                            stop.set()
+                    # no hedging once an attempt has answered
+                    deadline = None
+                if attempt != winner:
+                    continue
+                if kind == "chunk":
+                    yield payload
+                elif kind == "done":
+                    return
+                else:
+                    raise payload
+        finally:
+            for stop in stops:
+                stop.set()
+
+    async def astream(
+        self, input: List[BaseMessage], config=None, **kwargs: Any
+    ) -> AsyncIterator[AIMessageChunk]:
+        self.policy.start_call()
+        start = time.perf_counter()
+        events: "asyncio.Queue[tuple]" = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+
+        async def pump(attempt: int) -> None:
+            try:
+                async for chunk in self.llm.astream(input, config, **kwargs):
+                    await events.put((attempt, "chunk", chunk))
+                await events.put((attempt, "done", None))
+            except Exception as e:
+                await events.put((attempt, "error", e))
+
+        started: List[float] = []
+
+        def launch() -> None:
+            started.append(time.perf_counter())
+            tasks.append(asyncio.ensure_future(pump(len(tasks))))
+
+        launch()
+        deadline = start + self.policy.deadline("stream")
+        winner, failed = None, 0
+        try:
+            while True:
+                timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+                try:
+                    attempt, kind, payload = await asyncio.wait_for(events.get(), timeout)
+                except asyncio.TimeoutError:
+                    deadline = None
+                    if self.policy.try_hedge():
+                        launch()
+                    continue
+                if winner is None:
+                    if kind == "error":
+                        failed += 1
+                        # every attempt launched so far failed
+                        if failed == len(tasks):
+                            raise payload
+                        continue
+                    winner = attempt
+                    self.policy.record("stream", time.perf_counter() - started[attempt], attempt != 0)
+                    for index, task in enumerate(tasks):
+                        if index != winner:
+                            task.cancel()
+                    deadline = None
+                if attempt != winner:
+                    continue
+                if kind == "chunk":
+                    yield payload
+                elif kind == "done":
+                    return
+                else:
+                    raise payload
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
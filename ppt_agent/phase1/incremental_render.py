@@ -0,0 +1,145 @@
+"""
+Re-render only the slides that changed since a deck was last saved.
+
+Next to ``deck.pptx`` ``render_presentation_incremental`` keeps
+``deck.pptx.manifest.json``: for each slide, the hash of what it was rendered
+from (the layout ``renderable_content`` picks for it, the theme and the local
+images it shows) and the part that holds it, plus the digest of the saved
+file. On the next
+render slides whose hash is in the manifest are taken from the saved deck
+as they are (slide XML, notes and media bytes); only new or changed slides
+are rendered, into one small package, and ``phase1.pptx_merge.assemble_deck``
+writes the deck in the new order, so inserts, deletes and reorders only move
+parts around.
+
+Without a manifest, when the deck was modified since it was written (digest
+mismatch) or when the theme changed, every slide is rendered. Rendered and
+reused slides are counted in ``phase1.metrics`` under
+``incremental_render.*``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from phase1.metrics import metrics
+from phase1.parallel_render import render_range
+from phase1.pptx_merge import PackageReader, assemble_deck
+from phase1.renderer import RenderResult, allowed_image_dirs, local_image, renderable_content
+from phase1.state import Slide
+from phase1.themes import get_theme_registry
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(file_path: str) -> str:
+    return f"{file_path}.manifest.json"
+
+
+def slide_hash(slide: Slide, theme_fingerprint: str, image_dirs: Sequence[str] = ()) -> str:
+    """Hash of everything the rendered slide depends on."""
+    content = renderable_content(slide)
+    images = []
+    for block in content.get("content_blocks") or []:
+        path = local_image(block.get("url") or block.get("path"), image_dirs)
+        if block.get("type") == "image" and path is not None:
+            stat = os.stat(path)
+            images.append([path, stat.st_mtime_ns, stat.st_size])
+    payload = {"content": content, "theme": theme_fingerprint, "images": images}
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _load_manifest(file_path: str, deck: bytes, theme_fingerprint: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(manifest_path(file_path), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if (
+        manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("theme") != theme_fingerprint
+        or manifest.get("deck_sha256") != hashlib.sha256(deck).hexdigest()
+    ):
+        return None
+    return manifest
+
+
+def _write_manifest(file_path: str, theme_fingerprint: str, hashes: List[str], partnames: List[str]) -> None:
+    with open(file_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "theme": theme_fingerprint,
+        "deck_sha256": digest,
+        "slides": [{"hash": slide, "part": partname} for slide, partname in zip(hashes, partnames)],
+    }
+    tmp_path = f"{manifest_path(file_path)}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path(file_path))
+
+
+def render_presentation_incremental(
+    slides: List[Slide], file_path: str, theme: Optional[str] = None, image_dirs: Optional[Sequence[str]] = None
+) -> RenderResult:
+    """Render ``slides`` to ``file_path``, reusing the unchanged slides of the deck saved there."""
+    start = time.perf_counter()
+    fingerprint = get_theme_registry().get(theme).fingerprint
+    image_dirs = allowed_image_dirs() if image_dirs is None else tuple(image_dirs)
+    hashes = [slide_hash(slide, fingerprint, image_dirs) for slide in slides]
+
+    previous, manifest = None, None
+    if os.path.exists(file_path):
+        with open(file_path, "rb") as f:
+            deck = f.read()
+        manifest = _load_manifest(file_path, deck, fingerprint)
+        if manifest is not None:
+            previous = PackageReader(deck)
+
+    # saved parts by hash; a slide repeated in the deck is repeated in the list
+    saved: Dict[str, List[str]] = defaultdict(list)
+    for entry in (manifest or {}).get("slides", []):
+        saved[entry["hash"]].append(entry["part"])
+    sources: List[Optional[tuple]] = []
+    changed: List[Slide] = []
+    for slide, digest in zip(slides, hashes):
+        if saved.get(digest):
+            sources.append((previous, saved[digest].pop(0)))
+        else:
+            sources.append(None)
+            changed.append(slide)
+
+    rendered, timings = None, []
+    if changed or previous is None:
+        data, timings = render_range(changed, theme, image_dirs)
+        rendered = PackageReader(data)
+        rendered_slides = iter(rendered.slides())
+        sources = [source or (rendered, next(rendered_slides)) for source in sources]
+
+    tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+    partnames = assemble_deck(previous or rendered, sources, tmp_path)
+    for reader in (previous, rendered):
+        if reader is not None:
+            reader.close()
+    os.replace(tmp_path, file_path)
+    _write_manifest(file_path, fingerprint, hashes, partnames)
+
+    reused = len(slides) - len(changed)
+    metrics.incr("incremental_render.rendered_slides", len(changed))
+    metrics.incr("incremental_render.reused_slides", reused)
+    if manifest is None:
+        metrics.incr("incremental_render.full_renders")
+    result = RenderResult(file_path=file_path, slide_timings=timings, reused_slides=reused)
+    result.total_seconds = time.perf_counter() - start
+    logger.info(
+        "Rendered %d and reused %d slides to %s in %.3fs", len(changed), reused, file_path, result.total_seconds
+    )
+    return result
@@ -1,15 +1,45 @@
+import os
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from phase1.config import load_yaml_config
 from phase1.config.agents import LLMType
+from phase1.context_cache import (
+    ContextCachedChatModel,
+    ContextCacheRegistry,
+    GeminiContextCacheBackend,
+    LocalContextCacheBackend,
+)
+from phase1.hedging import HedgedChatModel, HedgePolicy
+from phase1.llm_cache import CachedChatModel, LLMResponseCache
+from phase1.llm_replay import LatencyModel, RecordingChatModel, RecordingStore, ReplayChatModel
+from phase1.rate_limit import ModelRateLimiter, RateLimitedChatModel
 
-# Cache for LLM instances
-_llm_cache = {}
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+# Cache for LLM instances, clients are only built on first use
+_llm_cache: Dict[str, Any] = {}
+_llm_lock = threading.Lock()
+# Shared response cache, built from the LLM_CACHE section of conf.yaml
+_response_cache = None
+# One limiter per model name, shared by every LLM type that uses the model
+_rate_limiters: Dict[str, ModelRateLimiter] = {}
+# Registered system prompt handles, built from the CONTEXT_CACHE section of conf.yaml
+_context_cache = None
+# Recording read and written by the "record" and "replay" backends
+_recording_store = None
+# Hedge deadline/budget state per agent
+_hedge_policies: Dict[str, HedgePolicy] = {}
+
+def _conf_path() -> str:
+    return str(Path(__file__).parent / "conf.yaml")
+
+def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> "ChatGoogleGenerativeAI":
+    # imported here so that importing the graph does not pay for the Gemini SDK
+    from langchain_google_genai import ChatGoogleGenerativeAI
 
-def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatGoogleGenerativeAI:
-    
     llm_type_map = {
         "reasoning": conf.get("REASONING_MODEL"),
         "basic": conf.get("BASIC_MODEL"),
@@ -30,25 +60,176 @@ def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatGoogleG
     # IMPORTANT: Pass the API key!
     if "google_api_key" in llm_conf:
         gemini_conf["google_api_key"] = llm_conf["google_api_key"]
+    if "max_retries" in llm_conf:
+        gemini_conf["max_retries"] = llm_conf["max_retries"]
+    elif (conf.get("RATE_LIMITS") or {}).get("enabled", False):
+        # the rate limiter owns retries, stacked retry loops would multiply the load
+        gemini_conf["max_retries"] = 1
     
     return ChatGoogleGenerativeAI(**gemini_conf)
 
-def get_llm_by_type(llm_type: LLMType) -> ChatGoogleGenerativeAI:
-    
-    if llm_type in _llm_cache:
-        return _llm_cache[llm_type]
-    print(str((Path(__file__).parent.parent.parent / "conf.yaml").resolve()))
-    conf = load_yaml_config(
-        str("Documents\cursor\\agents_learning\ppt_agent\phase1\conf.yaml")
+def _backend_type(conf: Dict[str, Any]) -> str:
+    return os.environ.get("PPT_LLM_BACKEND") or (conf.get("LLM_BACKEND") or {}).get("type", "gemini")
+
+def _get_recording_store(conf: Dict[str, Any]) -> RecordingStore:
+    # caller holds _llm_lock
+    global _recording_store
+    if _recording_store is None:
+        path = (conf.get("LLM_BACKEND") or {}).get("recordings_path", ".cache/llm_recordings.jsonl")
+        if not Path(path).is_absolute():
+            path = str(Path(__file__).parent / path)
+        _recording_store = RecordingStore(path)
+    return _recording_store
+
+def _create_replay_llm(conf: Dict[str, Any]) -> ReplayChatModel:
+    latency_conf = (conf.get("LLM_BACKEND") or {}).get("latency") or {}
+    return ReplayChatModel(store=_get_recording_store(conf), latency=LatencyModel(**latency_conf))
+
+def _get_response_cache(conf: Dict[str, Any]) -> LLMResponseCache | None:
+    # caller holds _llm_lock
+    global _response_cache
+    cache_conf = conf.get("LLM_CACHE") or {}
+    if not cache_conf.get("enabled", False):
+        return None
+    if _response_cache is None:
+        path = cache_conf.get("path")
+        if path and not Path(path).is_absolute():
+            path = str(Path(__file__).parent / path)
+        _response_cache = LLMResponseCache(
+            max_memory_entries=cache_conf.get("max_memory_entries", 256),
+            max_disk_entries=cache_conf.get("max_disk_entries", 5000),
+            ttl_seconds=cache_conf.get("ttl_seconds"),
+            path=path,
+        )
+    return _response_cache
+
+def _wrap_with_cache(llm_type: LLMType, llm, conf: Dict[str, Any]):
+    response_cache = _get_response_cache(conf)
+    if response_cache is None:
+        return llm
+    llm_conf = conf.get(f"{llm_type.upper()}_MODEL", {})
+    return CachedChatModel(
+        llm,
+        response_cache,
+        model_name=llm_conf.get("model", llm_type),
+        temperature=llm_conf.get("temperature"),
     )
-    print(conf)
-    llm = _create_llm_use_conf(llm_type, conf)
-    print(llm)
-    _llm_cache[llm_type] = llm
+
+def _wrap_with_rate_limit(llm_type: LLMType, llm, conf: Dict[str, Any]):
+    # caller holds _llm_lock
+    limits_conf = conf.get("RATE_LIMITS") or {}
+    if not limits_conf.get("enabled", False):
+        return llm
+    model_name = conf.get(f"{llm_type.upper()}_MODEL", {}).get("model", llm_type)
+    limiter = _rate_limiters.get(model_name)
+    if limiter is None:
+        limiter = ModelRateLimiter(
+            model_name,
+            **{
+                **(limits_conf.get("default") or {}),
+                **((limits_conf.get("models") or {}).get(model_name) or {}),
+            },
+        )
+        _rate_limiters[model_name] = limiter
+    return RateLimitedChatModel(llm, limiter)
+
+def _get_context_cache(conf: Dict[str, Any]) -> ContextCacheRegistry | None:
+    # caller holds _llm_lock
+    global _context_cache
+    context_conf = conf.get("CONTEXT_CACHE") or {}
+    if not context_conf.get("enabled", False):
+        return None
+    if _context_cache is None:
+        if context_conf.get("backend", "gemini") == "local":
+            backend = LocalContextCacheBackend()
+        else:
+            backend = GeminiContextCacheBackend(api_key=(conf.get("BASIC_MODEL") or {}).get("google_api_key"))
+        _context_cache = ContextCacheRegistry(
+            backend,
+            ttl_seconds=context_conf.get("ttl_seconds", 3600),
+            refresh_margin_seconds=context_conf.get("refresh_margin_seconds", 60),
+            min_tokens=context_conf.get("min_tokens", 1024),
+            retry_failed_after_seconds=context_conf.get("retry_failed_after_seconds", 300),
+        )
+    return _context_cache
+
+def _wrap_with_context_cache(llm_type: LLMType, llm, conf: Dict[str, Any]):
+    # caller holds _llm_lock
+    registry = _get_context_cache(conf)
+    if registry is None:
+        return llm
+    model_name = conf.get(f"{llm_type.upper()}_MODEL", {}).get("model", llm_type)
+    return ContextCachedChatModel(llm, registry, model_name)
+
+def get_rate_limiter(model_name: str) -> ModelRateLimiter | None:
+    """Return the shared limiter of ``model_name`` once a client for it has been built."""
+    return _rate_limiters.get(model_name)
+
+def get_llm_cache_stats() -> Dict[str, int]:
+    """Return the response cache counters, or an empty dict when caching is disabled."""
+    return _response_cache.stats() if _response_cache is not None else {}
+
+def get_context_cache_stats() -> Dict[str, int]:
+    """Return the registered prompt/handle counts, or an empty dict when context caching is disabled."""
+    return _context_cache.stats() if _context_cache is not None else {}
+
+def get_hedge_stats() -> Dict[str, Dict[str, Any]]:
+    """Return call/hedge counts of every agent that hedging is enabled for."""
+    return {agent_name: policy.stats() for agent_name, policy in _hedge_policies.items()}
+
+def _hedge_for_agent(llm, agent_name: str, hedging_conf: Dict[str, Any]):
+    with _llm_lock:
+        policy = _hedge_policies.get(agent_name)
+        if policy is None:
+            policy = HedgePolicy(
+                agent_name, **{k: v for k, v in hedging_conf.items() if k not in ("enabled", "agents")}
+            )
+            _hedge_policies[agent_name] = policy
+    if isinstance(llm, CachedChatModel):
+        # hedge underneath the response cache, a hit needs no race
+        return CachedChatModel(
+            HedgedChatModel(llm.llm, policy), llm.cache, llm.model_name, llm.temperature
+        )
+    return HedgedChatModel(llm, policy)
+
+def _for_agent(llm, agent_name: str | None):
+    if agent_name is None:
+        return llm
+    conf = load_yaml_config(_conf_path())
+    hedging_conf = conf.get("HEDGING") or {}
+    if hedging_conf.get("enabled", False) and agent_name in hedging_conf.get("agents", []):
+        llm = _hedge_for_agent(llm, agent_name, hedging_conf)
+    if isinstance(llm, CachedChatModel) and agent_name in (conf.get("LLM_CACHE") or {}).get("bypass_agents", []):
+        return llm.without_cache()
     return llm
 
-# Pre-initialize common LLMs
-try:
-    basic_llm = get_llm_by_type("basic")
-except Exception as e:
-    print(f"Warning: Failed to initialize basic LLM: {e}")
\ No newline at end of file
+def get_llm_by_type(llm_type: LLMType, agent_name: str | None = None) -> "ChatGoogleGenerativeAI":
+    """Return the (cached) client for ``llm_type``, building it on first use.
+
+    When ``agent_name`` is listed under ``LLM_CACHE.bypass_agents`` in conf.yaml the
+    returned client skips the response cache; when it is listed under
+    ``HEDGING.agents`` slow calls are hedged with a duplicate request.
+    ``LLM_BACKEND`` (or ``PPT_LLM_BACKEND``) switches to recording or replaying answers.
+    """
+    llm = _llm_cache.get(llm_type)
+    if llm is None:
+        with _llm_lock:
+            # another thread may have built it while we were waiting for the lock
+            llm = _llm_cache.get(llm_type)
+            if llm is None:
+                conf = load_yaml_config(_conf_path())
+                # cache hits are answered before the limiter, so they cost no quota;
+                # the limiter sees the request as sent, with the system prompt as a handle
+                backend = _backend_type(conf)
+                if backend == "replay":
+                    # no provider behind it, so no quota to limit and no prompt to cache
+                    llm = _create_replay_llm(conf)
+                else:
+                    llm = _create_llm_use_conf(llm_type, conf)
+                    llm = _wrap_with_context_cache(llm_type, _wrap_with_rate_limit(llm_type, llm, conf), conf)
+                    if backend == "record":
+                        # above the context cache, so requests are recorded as the nodes built them
+                        llm = RecordingChatModel(llm, _get_recording_store(conf))
+                llm = _wrap_with_cache(llm_type, llm, conf)
+                _llm_cache[llm_type] = llm
+    return _for_agent(llm, agent_name)
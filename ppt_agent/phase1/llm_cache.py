@@ -0,0 +1,309 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    model: str, temperature: Any, messages: List[BaseMessage], **kwargs: Any
+) -> str:
+    """Build a content-addressed key from the model settings and the rendered messages."""
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            [message.type, getattr(message, "name", None), message.content]
+            for message in messages
+        ],
+        "kwargs": kwargs,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two tier (in-memory LRU + SQLite) cache of LLM responses.
+
+    Entries older than ``ttl_seconds`` are treated as misses and dropped, the
+    memory tier keeps at most ``max_memory_entries`` and the disk tier at most
+    ``max_disk_entries`` (least recently used entries are evicted first).
+    """
+
+    def __init__(
+        self,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 5000,
+        ttl_seconds: Optional[float] = None,
+        path: Optional[str] = None,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._memory: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+            "invalidations": 0,
+        }
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for ``key`` or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._counters["expired"] += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = json.loads(row[0]), row[1]
+                    if not self._is_expired(created_at, now):
+                        self._conn.execute(
+                            "UPDATE llm_responses SET last_access = ? WHERE key = ?",
+                            (now, key),
+                        )
+                        self._conn.commit()
+                        self._remember(key, created_at, value)
+                        self._counters["disk_hits"] += 1
+                        return value
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._counters["expired"] += 1
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``key`` in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False, default=str), now, now),
+            )
+            if self.ttl_seconds is not None:
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                )
+            deleted = self._conn.execute(
+                "DELETE FROM llm_responses WHERE key NOT IN ("
+                "SELECT key FROM llm_responses ORDER BY last_access DESC LIMIT ?)",
+                (self.max_disk_entries,),
+            ).rowcount
+            self._counters["disk_evictions"] += max(deleted, 0)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Drop ``key`` from both tiers, e.g. when the cached response turned out to be unusable."""
+        with self._lock:
+            removed = self._memory.pop(key, None) is not None
+            if self._conn is not None:
+                deleted = self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,)).rowcount
+                self._conn.commit()
+                removed = removed or deleted > 0
+            if removed:
+                self._counters["invalidations"] += 1
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]) -> None:
+        # caller holds the lock
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["memory_evictions"] += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._counters["bypasses"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_responses")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current tier sizes."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["memory_entries"] = len(self._memory)
+            if self._conn is not None:
+                stats["disk_entries"] = self._conn.execute(
+                    "SELECT COUNT(*) FROM llm_responses"
+                ).fetchone()[0]
+            return stats
+
+
+class CachedChatModel:
+    """Wraps a chat model so ``invoke``/``stream`` (and their async variants) are served
+    from an LLMResponseCache when possible.
+
+    Everything else is delegated to the wrapped model.
+    """
+
+    def __init__(
+        self,
+        llm,
+        cache: LLMResponseCache,
+        model_name: str,
+        temperature: Any = None,
+        bypass_cache: bool = False,
+    ):
+        self.llm = llm
+        self.cache = cache
+        self.model_name = model_name
+        self.temperature = temperature
+        self.bypass_cache = bypass_cache
+
+    def without_cache(self) -> "CachedChatModel":
+        """Return a view of this model that always calls the provider."""
+        return CachedChatModel(
+            self.llm, self.cache, self.model_name, self.temperature, bypass_cache=True
+        )
+
+    def evict(self, input: List[BaseMessage], **kwargs: Any) -> None:
+        """Forget the response cached for ``input``, so the next call asks the provider again."""
+        self.cache.delete(make_cache_key(self.model_name, self.temperature, input, **kwargs))
+
+    def invoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        if self.bypass_cache:
+            self.cache.record_bypass()
+            return self.llm.invoke(input, config, **kwargs)
+
+        key = make_cache_key(self.model_name, self.temperature, input, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return AIMessage(
+                content=cached["content"],
+                response_metadata={**cached.get("response_metadata", {}), "llm_cache_hit": True},
+            )
+
+        response = self.llm.invoke(input, config, **kwargs)
+        self._store(key, response)
+        return response
+
+    def stream(
+        self, input: List[BaseMessage], config=None, **kwargs: Any
+    ) -> Iterator[AIMessageChunk]:
+        """Stream from the provider, or replay a cache hit as a single chunk."""
+        if self.bypass_cache:
+            self.cache.record_bypass()
+            yield from self.llm.stream(input, config, **kwargs)
+            return
+
+        key = make_cache_key(self.model_name, self.temperature, input, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield AIMessageChunk(
+                content=cached["content"],
+                response_metadata={**cached.get("response_metadata", {}), "llm_cache_hit": True},
+            )
+            return
+
+        response = None
+        for chunk in self.llm.stream(input, config, **kwargs):
+            response = chunk if response is None else response + chunk
+            yield chunk
+        if response is not None:
+            self._store(key, response)
+
+    async def ainvoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        if self.bypass_cache:
+            self.cache.record_bypass()
+            return await self.llm.ainvoke(input, config, **kwargs)
+
+        key = make_cache_key(self.model_name, self.temperature, input, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return AIMessage(
+                content=cached["content"],
+                response_metadata={**cached.get("response_metadata", {}), "llm_cache_hit": True},
+            )
+
+        response = await self.llm.ainvoke(input, config, **kwargs)
+        self._store(key, response)
+        return response
+
+    async def astream(
+        self, input: List[BaseMessage], config=None, **kwargs: Any
+    ) -> AsyncIterator[AIMessageChunk]:
+        """Async counterpart of ``stream``."""
+        if self.bypass_cache:
+            self.cache.record_bypass()
+            async for chunk in self.llm.astream(input, config, **kwargs):
+                yield chunk
+            return
+
+        key = make_cache_key(self.model_name, self.temperature, input, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield AIMessageChunk(
+                content=cached["content"],
+                response_metadata={**cached.get("response_metadata", {}), "llm_cache_hit": True},
+            )
+            return
+
+        response = None
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            response = chunk if response is None else response + chunk
+            yield chunk
+        if response is not None:
+            self._store(key, response)
+
+    def _store(self, key: str, response) -> None:
+        self.cache.set(
+            key,
+            {
+                "content": response.content,
+                "response_metadata": getattr(response, "response_metadata", {}),
+            },
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
@@ -0,0 +1,246 @@
+"""
+Record/replay LLM backend for running the graph offline.
+
+With ``LLM_BACKEND.type: "record"`` in conf.yaml every answer of the real
+model is appended to a JSONL recording, keyed by ``message_hash`` of the
+request messages. With ``"replay"`` ``get_llm_by_type`` returns a
+``ReplayChatModel`` instead of Gemini: it answers from the recording and
+waits as long as ``LatencyModel`` says a provider would (time to first
+token plus a per-token delay, both scaled by a random jitter factor), so the
+whole graph (routing, parsing, state updates, rendering) can be
+benchmarked without a network.
+
+The type can also be set with the ``PPT_LLM_BACKEND`` environment variable.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, Field
+
+from phase1.llm_cache import make_cache_key
+from phase1.metrics import estimate_tokens
+
+JITTER_DISTRIBUTIONS = ("none", "uniform", "lognormal", "exponential")
+
+
+def message_hash(messages: List[BaseMessage]) -> str:
+    """Key of a request in a recording: the hash of its messages, whatever the model or kwargs."""
+    return make_cache_key("", None, messages)
+
+
+class ReplayMissError(KeyError):
+    """The recording has no answer for a request."""
+
+
+class LatencyModel:
+    """Synthetic provider latency: ``first_token_seconds + tokens * per_token_seconds``.
+
+    Every delay is multiplied by a jitter factor drawn from ``jitter``:
+
+    * ``"none"``: 1
+    * ``"uniform"``: uniform in ``[1 - jitter_scale, 1 + jitter_scale]``
+    * ``"lognormal"``: lognormal with sigma ``jitter_scale`` and median 1,
+      a long right tail like real LLM latencies
+    * ``"exponential"``: ``1 - jitter_scale + Exp(1) * jitter_scale``
+    """
+
+    def __init__(
+        self,
+        first_token_seconds: float = 0.4,
+        per_token_seconds: float = 0.004,
+        jitter: str = "lognormal",
+        jitter_scale: float = 0.3,
+        seed: Optional[int] = None,
+    ):
+        if jitter not in JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution: {jitter}")
+        self.first_token_seconds = first_token_seconds
+        self.per_token_seconds = per_token_seconds
+        self.jitter = jitter
+        self.jitter_scale = jitter_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _factor(self) -> float:
+        with self._lock:
+            if self.jitter == "uniform":
+                return max(0.0, self._random.uniform(1 - self.jitter_scale, 1 + self.jitter_scale))
+            if self.jitter == "lognormal":
+                return self._random.lognormvariate(0.0, self.jitter_scale)
+            if self.jitter == "exponential":
+                return max(0.0, 1 - self.jitter_scale + self._random.expovariate(1.0) * self.jitter_scale)
+            return 1.0
+
+    def first_token_delay(self) -> float:
+        return self.first_token_seconds * self._factor()
+
+    def tokens_delay(self, tokens: int) -> float:
+        return tokens * self.per_token_seconds * self._factor()
+
+    def total_delay(self, tokens: int) -> float:
+        return self.first_token_delay() + self.tokens_delay(tokens)
+
+
+class RecordingStore:
+    """Append-only JSONL file of ``{"key", "content", "usage_metadata"}`` records.
+
+    The file is read once on creation; later records for a key win.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._records[record["key"]] = record
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(key)
+
+    def put(self, key: str, content: str, usage_metadata: Optional[Dict[str, Any]] = None) -> None:
+        record = {"key": key, "content": content, "usage_metadata": usage_metadata or {}}
+        with self._lock:
+            self._records[key] = record
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class RecordingChatModel:
+    """Wraps a chat model and records every complete answer into a RecordingStore."""
+
+    def __init__(self, llm, store: RecordingStore):
+        self.llm = llm
+        self.store = store
+
+    def _record(self, input: List[BaseMessage], response) -> None:
+        if response is not None and isinstance(response.content, str):
+            self.store.put(message_hash(input), response.content, getattr(response, "usage_metadata", None))
+
+    def invoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        response = self.llm.invoke(input, config, **kwargs)
+        self._record(input, response)
+        return response
+
+    async def ainvoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        response = await self.llm.ainvoke(input, config, **kwargs)
+        self._record(input, response)
+        return response
+
+    def stream(self, input: List[BaseMessage], config=None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        response = None
+        for chunk in self.llm.stream(input, config, **kwargs):
+            response = chunk if response is None else response + chunk
+            yield chunk
+        self._record(input, response)
+
+    async def astream(
+        self, input: List[BaseMessage], config=None, **kwargs: Any
+    ) -> AsyncIterator[AIMessageChunk]:
+        response = None
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            response = chunk if response is None else response + chunk
+            yield chunk
+        self._record(input, response)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that answers from a RecordingStore with synthetic latency.
+
+    Requests missing from the recording raise ReplayMissError, unless a
+    ``fallback`` (messages -> answer text) is given to script them.
+    Streams are cut into chunks of ``chunk_tokens`` estimated tokens.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    store: RecordingStore
+    latency: LatencyModel = Field(default_factory=LatencyModel)
+    fallback: Optional[Callable[[List[BaseMessage]], str]] = None
+    chunk_tokens: int = 8
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _answer(self, messages: List[BaseMessage]) -> Dict[str, Any]:
+        key = message_hash(messages)
+        record = self.store.get(key)
+        if record is not None:
+            return record
+        if self.fallback is None:
+            raise ReplayMissError(f"No recorded answer for request {key}")
+        return {"key": key, "content": self.fallback(messages), "usage_metadata": {}}
+
+    def _usage(self, messages: List[BaseMessage], record: Dict[str, Any]) -> Dict[str, int]:
+        if record.get("usage_metadata"):
+            return record["usage_metadata"]
+        input_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        output_tokens = estimate_tokens(record["content"])
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _result(self, messages: List[BaseMessage], record: Dict[str, Any]) -> ChatResult:
+        message = AIMessage(content=record["content"], usage_metadata=self._usage(messages, record))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages: List[BaseMessage], record: Dict[str, Any]) -> Iterator[tuple]:
+        """(delay before the chunk, chunk) pairs; the last chunk carries the usage."""
+        content = record["content"]
+        size = self.chunk_tokens * 4
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        for index, piece in enumerate(pieces):
+            delay = self.latency.tokens_delay(max(1, math.ceil(len(piece) / 4)))
+            if index == 0:
+                delay += self.latency.first_token_delay()
+            usage = self._usage(messages, record) if index == len(pieces) - 1 else None
+            yield delay, ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=usage))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        record = self._answer(messages)
+        time.sleep(self.latency.total_delay(estimate_tokens(record["content"])))
+        return self._result(messages, record)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        record = self._answer(messages)
+        await asyncio.sleep(self.latency.total_delay(estimate_tokens(record["content"])))
+        return self._result(messages, record)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages, self._answer(messages)):
+            time.sleep(delay)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages, self._answer(messages)):
+            await asyncio.sleep(delay)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
@@ -0,0 +1,74 @@
+"""
+Process-wide counters and latency/size samples for the phase1 graph.
+
+Nodes and helpers record into the shared ``metrics`` registry; ``metrics.snapshot()``
+returns plain dicts that the UI or the benchmarks can print or dump as JSON.
+"""
+
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, List
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, provider independent token estimate (~4 characters per token)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``pct`` in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class MetricsRegistry:
+    """Thread-safe store of named counters and sample series."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self._samples[name].append(value)
+
+    def samples(self, name: str) -> List[float]:
+        with self._lock:
+            return list(self._samples.get(name, []))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return the counters and a count/sum/mean/p50/p95/p99/max summary per series."""
+        with self._lock:
+            counters = dict(self._counters)
+            series = {name: list(values) for name, values in self._samples.items()}
+        summaries = {
+            name: {
+                "count": len(values),
+                "sum": sum(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": max(values),
+            }
+            for name, values in series.items()
+            if values
+        }
+        return {"counters": counters, "series": summaries}
+
+
+metrics = MetricsRegistry()
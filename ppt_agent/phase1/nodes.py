@@ -1,17 +1,32 @@
 from dotenv import load_dotenv
 import logging
-import json
 import re
 import textwrap
-import os
+import time
+from concurrent.futures import as_completed
 from typing import Annotated, Literal
 
 from langchain.schema import HumanMessage, SystemMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langgraph.config import get_stream_writer
 from langgraph.types import Command, interrupt
 from phase1.config.agents import AGENT_LLM_MAP
+from phase1.config.configuration import Configuration
+from phase1.deck_cache import deck_key, get_deck_cache
 from phase1.prompts.template import get_prompt_template
-from phase1.state import PPTState, create_key_message, create_slide
+from phase1.state import PPTState, apply_slide_patch, create_key_message, create_slide_from_dict
+from phase1.incremental_render import render_presentation_incremental
 from phase1.llm import get_llm_by_type
+from phase1.metrics import estimate_tokens, metrics
+from phase1.parallel_render import render_presentation_parallel
+from phase1.router import classify_intent
+from phase1.projection import is_slide_content_current, project_slide, project_state, slide_input_hash, to_json
+from phase1.renderer import render_presentation
+from phase1.sandbox import get_pptx_pool
+from phase1.streaming_json import StreamingArrayParser
+from phase1.themes import get_theme_registry
+from phase1.structured import JSON_OUTPUT_KWARGS, StructuredOutputError, parse_json_text, repair_input, validate_output
 logger = logging.getLogger(__name__)
 load_dotenv()
 
@@ -32,9 +47,123 @@ def extract_code_from_response(response_text):
 
 def parse_llm_json(response_str):
     """Extract JSON from markdown code blocks and return as dictionary"""
-    # Remove markdown code blocks
-    json_str = re.sub(r"```json\n?|```\n?", "", response_str).strip()
-    return json.loads(json_str)
+    return parse_json_text(response_str)
+
+
+def _invoke_llm(agent_name, model, messages, on_chunk=None, **kwargs):
+    """Stream ``model``'s answer and return it as one message.
+
+    Streaming lets ``workflow.stream(..., stream_mode="messages")`` show tokens as
+    they arrive; ``on_chunk``, when given, is called with the text of each chunk.
+    Prompt tokens (estimated, and provider usage when reported) and time to
+    first token are recorded for ``agent_name``. ``kwargs`` go to ``model.stream``.
+    """
+    _record_prompt_tokens(agent_name, messages)
+    start = time.perf_counter()
+    response = None
+    for chunk in model.stream(messages, **kwargs):
+        if response is None:
+            metrics.observe(f"time_to_first_token_seconds.{agent_name}", time.perf_counter() - start)
+            response = chunk
+        else:
+            response = response + chunk
+        if on_chunk is not None and isinstance(chunk.content, str):
+            on_chunk(chunk.content)
+    return _finish_response(agent_name, response, start)
+
+
+def _record_prompt_tokens(agent_name, messages):
+    metrics.observe(
+        f"prompt_tokens.{agent_name}",
+        sum(estimate_tokens(str(message.content)) for message in messages),
+    )
+
+
+def _finish_response(agent_name, response, start):
+    """Record latency and provider token usage of a streamed answer."""
+    if response is None:
+        response = AIMessage(content="")
+    metrics.observe(f"llm_seconds.{agent_name}", time.perf_counter() - start)
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        metrics.observe(f"input_tokens.{agent_name}", usage.get("input_tokens", 0))
+        metrics.observe(f"output_tokens.{agent_name}", usage.get("output_tokens", 0))
+    return response
+
+
+def _invoke_structured(agent_name, model, messages, on_chunk=None):
+    """Ask ``model`` for JSON and return the reply validated against ``agent_name``'s schema.
+
+    A reply that does not validate gets one repair follow-up (schema, error and
+    the reply only) instead of a rerun of the whole prompt.
+    """
+    response = _invoke_llm(agent_name, model, messages, on_chunk=on_chunk, **JSON_OUTPUT_KWARGS)
+    try:
+        return _validated(agent_name, response.content)
+    except StructuredOutputError as e:
+        _evict_cached(model, messages)
+        repair_model = get_llm_by_type(AGENT_LLM_MAP["json_repair"], agent_name="json_repair")
+        repair_messages = _repair_messages(agent_name, response.content, e)
+        repaired = _invoke_llm("json_repair", repair_model, repair_messages, **JSON_OUTPUT_KWARGS)
+        return _repaired(agent_name, repaired.content, repair_model, repair_messages)
+
+
+def _evict_cached(model, messages):
+    """Drop an invalid reply from the response cache, so it is not replayed (and repaired) forever."""
+    evict = getattr(model, "evict", None)
+    if evict is not None:
+        evict(messages, **JSON_OUTPUT_KWARGS)
+
+
+def _validated(agent_name, text):
+    metrics.incr(f"structured.calls.{agent_name}")
+    try:
+        return validate_output(agent_name, text)
+    except StructuredOutputError as e:
+        metrics.incr(f"structured.parse_failures.{agent_name}")
+        logger.warning("Invalid %s output, asking for a repair: %s", agent_name, e)
+        raise
+
+
+def _repair_messages(agent_name, text, error):
+    return [
+        SystemMessage(content=get_prompt_template("json_repair")),
+        HumanMessage(content=repair_input(agent_name, text, error)),
+    ]
+
+
+def _repaired(agent_name, text, repair_model, repair_messages):
+    try:
+        parsed_response = validate_output(agent_name, text)
+    except StructuredOutputError:
+        metrics.incr(f"structured.repair_failures.{agent_name}")
+        _evict_cached(repair_model, repair_messages)
+        raise
+    metrics.incr(f"structured.repairs.{agent_name}")
+    return parsed_response
+
+
+def _log_routing_decision(path: str, requirement: str, has_slides: bool, parsed_response: dict) -> None:
+    """Append an LLM routing decision to a JSONL replay set for the rule-based router."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(to_json({
+            "requirement": requirement,
+            "has_slides": has_slides,
+            "agent": parsed_response.get("agent") if parsed_response.get("status") == "call_agent" else None,
+        }) + "\n")
+
+
+def _action_context(parsed_response: dict) -> str:
+    """Short description of a routing decision for the action message."""
+    return parsed_response.get("context") or parsed_response.get("details") or ""
+
+
+def _latest_requirement(state: PPTState) -> str:
+    """Return the most recent user requirement (routing actions are appended after it)."""
+    for message in reversed(state.get("messages", [])):
+        if isinstance(message, HumanMessage) and getattr(message, "name", None) == "requirement":
+            return message.content
+    return ""
 
 
 def ppt_initiator_node(
@@ -42,18 +171,20 @@ def ppt_initiator_node(
 ) -> Command[Literal["ppt_planner_node"]]:
     logger.info("Gathering Requirment ...")
 
-    model = get_llm_by_type(AGENT_LLM_MAP["ppt_initiator"])
+    model = get_llm_by_type(AGENT_LLM_MAP["ppt_initiator"], agent_name="ppt_initiator")
+
+    parsed_response = _invoke_structured("ppt_initiator", model, _initiator_messages(state))
+    return _initiator_command(parsed_response)
+
+
+def _initiator_messages(state: PPTState) -> list:
+    return [
+        SystemMessage(content=get_prompt_template("ppt_initiator")),
+        HumanMessage(content=state["user_requirement"]),
+    ]
 
-    ppt_initiator_response = model.invoke(
-        [
-            SystemMessage(content=get_prompt_template("ppt_initiator")),
-            HumanMessage(content=state["user_requirement"]),
-        ],
-    )
-    # to do look for mechanism that, if the response is not json, then retry the same prompt again
-    # you need to see how do you couple it so that the if parsing fails, how llm will be called again
-    parsed_response = parse_llm_json(ppt_initiator_response.content)
 
+def _initiator_command(parsed_response: dict) -> Command[Literal["ppt_planner_node"]]:
     return Command(
         update={
             "file_name": parsed_response["file_name"],
@@ -69,7 +200,7 @@ def user_input_node(
     state: PPTState,
 ) -> Command[Literal["user_task_manager_node"]]:
     logger.info("Getting user input ...")
-    model = get_llm_by_type(AGENT_LLM_MAP["user_input"])
+    model = get_llm_by_type(AGENT_LLM_MAP["user_input"], agent_name="user_input")
     initial_requirements = interrupt("Please Give you requirements for the PPT.")
 
     return Command(
@@ -82,58 +213,163 @@ def user_input_node(
     )
 
 
+def _compact_requirements(state: PPTState, requirement_contents: list, window: int) -> dict:
+    """Fold all but the last ``window`` requirements into the running requirement summary.
+
+    Only requirements not yet in the summary are sent to the summarizer, so each
+    requirement is summarized once. Returns the state update (empty when
+    nothing had to be folded).
+    """
+    foldable = _foldable_requirements(state, requirement_contents, window)
+    if not foldable:
+        return {}
+    model = get_llm_by_type(
+        AGENT_LLM_MAP["requirement_summarizer"], agent_name="requirement_summarizer"
+    )
+    summary_response = _invoke_llm(
+        "requirement_summarizer", model, _summarizer_messages(state, foldable)
+    )
+    return _summary_update(state, foldable, summary_response)
+
+
+def _foldable_requirements(state: PPTState, requirement_contents: list, window: int) -> list:
+    summarized = state.get("summarized_requirements", 0)
+    return requirement_contents[summarized : max(len(requirement_contents) - window, 0)]
+
+
+def _summarizer_messages(state: PPTState, foldable: list) -> list:
+    return [
+        SystemMessage(content=get_prompt_template("requirement_summarizer")),
+        HumanMessage(content=to_json({
+            "summary": state.get("requirement_summary", ""),
+            "new_requirements": foldable,
+        })),
+    ]
+
+
+def _summary_update(state: PPTState, foldable: list, summary_response) -> dict:
+    return {
+        "requirement_summary": summary_response.content.strip(),
+        "summarized_requirements": state.get("summarized_requirements", 0) + len(foldable),
+    }
+
+
 def user_task_manager_node(
-    state: PPTState,
+    state: PPTState, config: RunnableConfig
 ) -> Command[Literal["user_input_node", "__end__"]]:
     logger.info("Routing task ...")
-    model = get_llm_by_type(AGENT_LLM_MAP["user_task_manager"])
+    requirement_contents = _requirement_contents(state)
+    # TODO:cheeck if overall requirmenet makes sense and the last requirment makes sense
+    # TODO: if the last requirment is not clear, ask for more input, and got to user_input_node
+    if len(state.get("file_name", "")) == 0:
+        return _initiator_handoff(requirement_contents)
+
+    configurable = Configuration.from_runnable_config(config)
+    compaction = {}
+    user_task_manage_response_parsed = _fast_route(state, configurable, requirement_contents)
+    if user_task_manage_response_parsed is None:
+        model = get_llm_by_type(AGENT_LLM_MAP["user_task_manager"], agent_name="user_task_manager")
+        window = max(1, configurable.requirement_history_window)
+        compaction = _compact_requirements(state, requirement_contents, window)
+        user_task_manage_response_parsed = _invoke_structured(
+            "user_task_manager",
+            model,
+            _routing_messages(state, requirement_contents, compaction, window),
+        )
+        _record_routing_decision(
+            state, configurable, requirement_contents, user_task_manage_response_parsed
+        )
+    return _routing_command(user_task_manage_response_parsed, requirement_contents, compaction)
+
+
+def _requirement_contents(state: PPTState) -> list:
     # The state is expected to have a "messages" field (list of HumanMessage/AIMessage/etc)
-    messages = state.get("messages", [])
-    file_name = state.get("file_name", "")
-    requirement_contents = [
+    return [
         msg.content
-        for msg in messages
+        for msg in state.get("messages", [])
         if isinstance(msg, HumanMessage) and getattr(msg, "name", None) == "requirement"
     ]
-    # TODO:cheeck if overall requirmenet makes sense and the last requirment makes sense
-    # TODO: if the last requirment is not clear, ask for more input, and got to user_input_node
-    if len(file_name) == 0:
-        return Command(
-            update={"user_requirement": str(requirement_contents),
-                    "messages": [
-                        SystemMessage(
-                            content="Calling PPT Initiator",
-                            name="action",
-                        )
-                    ]},
-            goto="ppt_initiator_node",
-        )
 
-    user_task_manage_response = model.invoke(
-        [
-            SystemMessage(content=get_prompt_template("user_task_manager")),
-            HumanMessage(content=str({
-                    "ppt_content": state["slides"],
-                    "user_requirment": requirement_contents,
-                })),
-        ],
+
+def _initiator_handoff(requirement_contents: list) -> Command:
+    return Command(
+        update={"user_requirement": str(requirement_contents),
+                "messages": [
+                    SystemMessage(
+                        content="Calling PPT Initiator",
+                        name="action",
+                    )
+                ]},
+        goto="ppt_initiator_node",
     )
-    print("USER TASK MANAGE RESPONSE", user_task_manage_response.content)
-    user_task_manage_response_parsed = parse_llm_json(
-        user_task_manage_response.content
+
+
+def _fast_route(state: PPTState, configurable: Configuration, requirement_contents: list):
+    """Return a routing decision without the LLM when the rules are confident enough, else None."""
+    decision = classify_intent(requirement_contents[-1], bool(state.get("slides"))) if requirement_contents else None
+    if decision and decision.agent and decision.confidence >= configurable.fast_route_threshold:
+        # unambiguous request: skip the routing prompt (and the summary update,
+        # which catches up on the next LLM-routed turn)
+        metrics.incr("router.fast_path")
+        return {
+            "status": "call_agent",
+            "agent": decision.agent,
+            "context": f"Matched routing rule (confidence {decision.confidence:.2f})",
+        }
+    metrics.incr("router.llm")
+    return None
+
+
+def _routing_messages(state: PPTState, requirement_contents: list, compaction: dict, window: int) -> list:
+    requirement_summary = compaction.get("requirement_summary", state.get("requirement_summary", ""))
+    recent_requirements = requirement_contents[-window:]
+    metrics.observe(
+        "requirement_tokens.raw",
+        sum(estimate_tokens(requirement) for requirement in requirement_contents),
+    )
+    metrics.observe(
+        "requirement_tokens.compacted",
+        estimate_tokens(requirement_summary)
+        + sum(estimate_tokens(requirement) for requirement in recent_requirements),
     )
+    return [
+        SystemMessage(content=get_prompt_template("user_task_manager")),
+        HumanMessage(content=to_json({
+                "ppt_content": project_state(state, "user_task_manager"),
+                "earlier_requirements_summary": requirement_summary,
+                "user_requirment": recent_requirements,
+            })),
+    ]
 
+
+def _record_routing_decision(
+    state: PPTState, configurable: Configuration, requirement_contents: list, user_task_manage_response_parsed: dict
+) -> None:
+    logger.debug("Routing decision: %s", user_task_manage_response_parsed)
+    if configurable.routing_log_path and requirement_contents:
+        _log_routing_decision(
+            configurable.routing_log_path,
+            requirement_contents[-1],
+            bool(state.get("slides")),
+            user_task_manage_response_parsed,
+        )
+
+
+def _routing_command(
+    user_task_manage_response_parsed: dict, requirement_contents: list, compaction: dict
+) -> Command[Literal["user_input_node", "__end__"]]:
     if user_task_manage_response_parsed["status"] == "call_agent":
         if user_task_manage_response_parsed["agent"] == "ppt_planner":
             return Command(
                 update={
+                    **compaction,
                     "requirement_cleaned": user_task_manage_response_parsed[
                         "cleaned_requirement"
                     ],
                     "user_requirement": str(requirement_contents),
                     "messages": [
                         SystemMessage(
-                            content="Calling PPT Planner : " + str(user_task_manage_response_parsed),
+                            content="Calling PPT Planner : " + _action_context(user_task_manage_response_parsed),
                             name="action",
                             
                         )
@@ -144,10 +380,11 @@ def user_task_manager_node(
         elif user_task_manage_response_parsed["agent"] == "ppt_refiner":
             return Command(
                 update={
+                    **compaction,
                     "user_requirement": str(requirement_contents),
                     "messages": [
                         SystemMessage(
-                            content="Calling PPT Refiner : " + str(user_task_manage_response_parsed),
+                            content="Calling PPT Refiner : " + _action_context(user_task_manage_response_parsed),
                             name="action",
                         ),
                     ]
@@ -157,10 +394,11 @@ def user_task_manager_node(
         elif user_task_manage_response_parsed["agent"] == "pptx_coder":
             return Command(
                 update={
+                    **compaction,
                     
                     "messages": [
                         SystemMessage(
-                            content="Preperaring PPT for download: " + str(user_task_manage_response_parsed),
+                            content="Preperaring PPT for download: " + _action_context(user_task_manage_response_parsed),
                             name="action",
                         ),
                     ]
@@ -170,10 +408,11 @@ def user_task_manager_node(
         elif user_task_manage_response_parsed["agent"] == "slide_builder":
             return Command(
                 update={
+                    **compaction,
                     
                     "messages": [
                         SystemMessage(
-                            content="Building the Slides : " + str(user_task_manage_response_parsed),
+                            content="Building the Slides : " + _action_context(user_task_manage_response_parsed),
                             name="action",
                         ),
                     ]
@@ -183,10 +422,11 @@ def user_task_manager_node(
         else:
             
             return Command(update={
+                    **compaction,
                     
                     "messages": [
                         SystemMessage(
-                            content="Exiting the loop : " + str(user_task_manage_response_parsed),
+                            content="Exiting the loop : " + _action_context(user_task_manage_response_parsed),
                             name="action",
                         ),
                     ]
@@ -195,19 +435,65 @@ def user_task_manager_node(
 
 
 def ppt_planner_node(
-    state: PPTState,
+    state: PPTState, config: RunnableConfig
 ) -> Command[Literal["user_input_node"]]:
     logger.info("PPT Planner working...")
 
-    model = get_llm_by_type(AGENT_LLM_MAP["ppt_planner"])
+    model = get_llm_by_type(AGENT_LLM_MAP["ppt_planner"], agent_name="ppt_planner")
+    configurable = Configuration.from_runnable_config(config)
+
+    # With pipelining, each slide is handed to the slide builder as soon as the
+    # streamed plan closes it, so building slide 1 overlaps planning slide 10
+    executor = None
+    on_chunk = None
+    pipelined = []  # (input hash, future) per streamed slide, in plan order
+    if configurable.pipeline_slide_building:
+        builder_model = get_llm_by_type(AGENT_LLM_MAP["slide_builder"], agent_name="slide_builder")
+        executor = ContextThreadPoolExecutor(
+            max_workers=max(1, configurable.slide_builder_concurrency)
+        )
+        parser = StreamingArrayParser(("slides",))
+        writer = get_stream_writer()
 
-    pptplaner_response = model.invoke(
-        [
-            SystemMessage(content=get_prompt_template("ppt_planner")),
-            HumanMessage(content=state["requirement_cleaned"]),
-        ],
-    )
-    parsed_response = parse_llm_json(pptplaner_response.content)
+        def on_chunk(text):
+            for _, slide_data in parser.feed(text):
+                slide = create_slide_from_dict(slide_data)
+                pipelined.append(
+                    (slide_input_hash(slide), executor.submit(_build_slide_content, builder_model, slide))
+                )
+                writer({"event": "slide_planned", "slide_number": len(pipelined), "slide": slide})
+
+    try:
+        parsed_response = _invoke_structured(
+            "ppt_planner", model, _planner_messages(state), on_chunk=on_chunk
+        )
+        update = _plan_update(state, parsed_response)
+
+        # the final parse is authoritative: a pipelined build is only kept when
+        # it was made from exactly the same slide
+        for slide, (input_hash, future) in zip(update["slides"], pipelined):
+            if slide_input_hash(slide) != input_hash:
+                continue
+            try:
+                _attach_slide_content(slide, future.result(), input_hash)
+            except Exception:
+                logger.exception("Pipelined build failed for slide %r", slide.get("title"))
+        metrics.incr("planner.pipelined_slides", len(pipelined))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Command(update=update, goto="user_input_node")
+
+
+def _planner_messages(state: PPTState) -> list:
+    return [
+        SystemMessage(content=get_prompt_template("ppt_planner")),
+        HumanMessage(content=state["requirement_cleaned"]),
+    ]
+
+
+def _plan_update(state: PPTState, parsed_response: dict) -> dict:
     key_messages = []
     if "key_messages" in parsed_response:
         for km_data in parsed_response["key_messages"]:
@@ -218,36 +504,20 @@ def ppt_planner_node(
             key_messages.append(key_message)
 
     # Process slides using helper functions from state.py
-    slides = []
-    if "slides" in parsed_response:
-        for slide_data in parsed_response["slides"]:
-            slide = create_slide(
-                key_message_part=slide_data.get("key_message_part", ""),
-                title=slide_data.get("title", ""),
-                content=slide_data.get("content", ""),
-                image=slide_data.get("image"),
-                message_here=slide_data.get("message_here", ""),
-                layout_description=slide_data.get(
-                    "layout_description", "Standard content layout"
-                ),
-            )
-            slides.append(slide)
-
-    return Command(
-        update={
-            "file_name": parsed_response.get("file_name", state.get("file_name", "")),
-            "ppt_title": parsed_response.get(
-                "ppt_title", state.get("ppt_title", "")
-            ),
-            "number_of_slides": parsed_response.get(
-                "number_of_slides", len(slides)
-            ),
-            "key_messages": key_messages,
-            "slides": slides,
-            "missing_information": parsed_response.get("missing_information", ""),
-        },
-        goto="user_input_node",
-    )
+    slides = [create_slide_from_dict(slide_data) for slide_data in parsed_response.get("slides", [])]
+
+    return {
+        "file_name": parsed_response.get("file_name", state.get("file_name", "")),
+        "ppt_title": parsed_response.get(
+            "ppt_title", state.get("ppt_title", "")
+        ),
+        "number_of_slides": parsed_response.get(
+            "number_of_slides", len(slides)
+        ),
+        "key_messages": key_messages,
+        "slides": slides,
+        "missing_information": parsed_response.get("missing_information", ""),
+    }
 
 
 def ppt_refiner_node(
@@ -255,178 +525,238 @@ def ppt_refiner_node(
 ) -> Command[Literal["user_input_node"]]:
     logger.info("PPT refiner working...")
 
-    model = get_llm_by_type(AGENT_LLM_MAP["ppt_refiner"])
+    model = get_llm_by_type(AGENT_LLM_MAP["ppt_refiner"], agent_name="ppt_refiner")
 
-    ppt_refiner_response = model.invoke(
-        [
-            SystemMessage(content=get_prompt_template("ppt_refiner")),
-            HumanMessage(
-                content=str({
-                    "ppt_content": state["slides"],
-                    "feedback": state["messages"][-1].content,
-                }),
-            ),
-        ],
-    )
-    parsed_response = parse_llm_json(ppt_refiner_response.content)
-    print("===============PARSED RESPONSE===============")
-    print(parsed_response)
-    print("===============PARSED RESPONSE===============")
-    # key_messages = []
-    # if "key_messages" in parsed_response:
-    #     for km_data in parsed_response["key_messages"]:
-    #         key_message = create_key_message(
-    #             message=km_data["message"],
-    #             milestone_slide=km_data["milestone_slide_number"],
-    #         )
-    #         key_messages.append(key_message)
+    parsed_response = _invoke_structured("ppt_refiner", model, _refiner_messages(state))
+    return _refiner_command(state, parsed_response)
 
-    # Process slides using helper functions from state.py
-    
-    if "slides" in parsed_response:
-        slides = []
-
-        for slide_data in parsed_response["slides"]:
-            print("===============SLIDE DATA===============")
-            print(slide_data)
-            print("===============SLIDE DATA===============")
-
-            slide = create_slide(
-                key_message_part=slide_data.get("key_message_part", ""),
-                title=slide_data.get("title", ""),
-                content=slide_data.get("content", ""),
-                image=slide_data.get("image"),
-                message_here=slide_data.get("message_here", ""),
-                layout_description=slide_data.get(
-                    "layout_description", "Standard content layout"
-                ),
-            )
-            slides.append(slide)
+
+def _refiner_messages(state: PPTState) -> list:
+    return [
+        SystemMessage(content=get_prompt_template("ppt_refiner")),
+        HumanMessage(
+            content=to_json({
+                "ppt_content": project_state(state, "ppt_refiner"),
+                "feedback": _latest_requirement(state),
+            }),
+        ),
+    ]
+
+
+def _refiner_command(state: PPTState, parsed_response: dict) -> Command[Literal["user_input_node"]]:
+    logger.debug("Refiner response: %s", parsed_response)
+    slides = state.get("slides", [])
+    if "operations" in parsed_response:
+        # targeted edits: only the touched slides change
+        try:
+            slides = apply_slide_patch(slides, parsed_response["operations"])
+            action = f"Applied {len(parsed_response['operations'])} slide edits"
+        except ValueError as e:
+            logger.warning("Rejected refiner patch: %s", e)
+            action = f"Could not apply the requested edits: {e}"
+    elif "slides" in parsed_response:
+        # older full-deck responses are still accepted
+        slides = [create_slide_from_dict(slide_data) for slide_data in parsed_response["slides"]]
+        action = f"Rebuilt {len(slides)} slides"
+    else:
+        action = "Refiner returned no edits"
 
     return Command(
         update={
-            "slides": slides
+            "slides": slides,
+            "messages": [SystemMessage(content=action, name="action")],
         },
         goto="user_input_node",
     )
 
-def pptx_coder_node(state: PPTState) -> Command[Literal["__end__"]]:
-    logger.info("Gathering pptx code ...")
-    model = get_llm_by_type(AGENT_LLM_MAP["pptx_coder"])
-    print("STATE TYPE", type(state))
-    print("STATE", state)
-    coder_response = model.invoke(
-        [
-            SystemMessage(content=get_prompt_template("pptx_coder")),
-            HumanMessage(content=str(state)),
-        ],
-    )
-    print("CODER RESPONSE")
-    parsed_response = coder_response.content
-    code = extract_code_from_response(parsed_response)
-
-    # Fixed imports with COM initialization for Windows
-    pre_code = """
-    import subprocess
-    import sys
-    import os
-
-    # Windows COM initialization fix
-    if os.name == 'nt':  # Windows
+
+def pptx_coder_node(
+    state: PPTState, config: RunnableConfig
+) -> Command[Literal["__end__"]]:
+    configurable = Configuration.from_runnable_config(config)
+    renderer = configurable.pptx_renderer
+    file_name = state.get("file_name") or "presentation.pptx"
+    # the native renderer starts from a clone of the theme master, parsed once per process
+    themes = get_theme_registry()
+    try:
+        theme = themes.get(configurable.pptx_theme) if renderer != "llm" and configurable.pptx_theme else None
+    except Exception as e:
+        logger.exception("Could not load theme %r", configurable.pptx_theme)
+        return Command(
+            update={"messages": [SystemMessage(content=f"Could not render the PPT: {e}", name="action")]},
+            goto="__end__",
+        )
+
+    # an unchanged deck is written from the cache instead of being rendered again
+    deck_cache = get_deck_cache()
+    key = deck_key(state, renderer, theme.fingerprint if theme else None) if deck_cache is not None else None
+    cached = deck_cache.get(key) if deck_cache is not None else None
+    if cached is not None:
+        with open(file_name, "wb") as f:
+            f.write(cached.pptx)
+        action = f"Saved the PPT to {file_name} from the deck cache (unchanged since it was last rendered)"
+    elif renderer == "llm":
+        action, code = _generate_pptx_with_llm(state, file_name)
+        if code is not None and deck_cache is not None:
+            _cache_deck(deck_cache, key, file_name, code)
+    else:
+        logger.info("Rendering pptx ...")
         try:
-            import pythoncom
-            pythoncom.CoInitialize()
-            print("✅ COM initialized for Windows")
-        except ImportError:
-            print("⚠️ pythoncom not available, continuing without COM init")
+            result = _render_pptx(state.get("slides", []), file_name, renderer, configurable.pptx_theme, theme)
         except Exception as e:
-            print(f"⚠️ COM initialization warning: {e}")
+            logger.exception("Rendering %s failed", file_name)
+            action = f"Could not render the PPT: {e}"
+        else:
+            slowest = max(result.slide_timings, default=0.0)
+            action = (
+                f"Saved {result.number_of_slides} slides to {result.file_path} "
+                f"in {result.total_seconds:.2f}s (slowest slide {slowest:.3f}s)"
+            )
+            if result.reused_slides:
+                action += f", {result.reused_slides} unchanged slides reused from the previous deck"
+            if deck_cache is not None:
+                _cache_deck(deck_cache, key, file_name)
 
-    try:
-        from pptx import Presentation
-        from pptx.util import Inches, Pt
-        from pptx.enum.text import PP_ALIGN, MSO_VERTICAL_ANCHOR
-        from pptx.dml.color import RGBColor
-        from pptx.enum.shapes import MSO_SHAPE
-        print("✅ All pptx imports successful")
-    except ImportError:
-        print("📦 Installing python-pptx...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "python-pptx"])
-        from pptx import Presentation
-        from pptx.util import Inches, Pt
-        from pptx.enum.text import PP_ALIGN, MSO_VERTICAL_ANCHOR
-        from pptx.dml.color import RGBColor
-        from pptx.enum.shapes import MSO_SHAPE
-        print("✅ python-pptx installed and imported")
-    """
+    return Command(
+        update={"messages": [SystemMessage(content=action, name="action")]},
+        goto="__end__",
+    )
 
-    print("EXECUTING PRE-CODE + GENERATED CODE")
-    print("=" * 50)
 
-    # Create a shared namespace for both exec calls
-    exec_namespace = {}
+def _render_pptx(slides, file_name, renderer, theme_name, theme):
+    """Render ``slides`` with one of the native renderers."""
+    if renderer == "parallel":
+        return render_presentation_parallel(slides, file_name, theme=theme_name)
+    if renderer == "incremental":
+        return render_presentation_incremental(slides, file_name, theme=theme_name)
+    prs = get_theme_registry().new_presentation(theme_name) if theme else None
+    return render_presentation(slides, file_name, prs=prs)
 
-    try:
-        # Execute imports first
-        clean_pre_code = textwrap.dedent(pre_code)
-        exec(clean_pre_code, exec_namespace)
 
-        # Execute generated code in the same namespace
-        clean_code = textwrap.dedent(code)
-        print(clean_code)
-        exec(clean_code, exec_namespace)
+def _cache_deck(deck_cache, key, file_name, code=None):
+    with open(file_name, "rb") as f:
+        deck_cache.put(key, f.read(), code)
 
-        print("✅ PPT generation completed successfully!")
 
-        # COM cleanup for Windows
-        if os.name == 'nt':
-            try:
-                import pythoncom
-                pythoncom.CoUninitialize()
-                print("✅ COM cleaned up")
-            except:
-                pass
+def _generate_pptx_with_llm(state: PPTState, file_name: str):
+    """Legacy path: ask the LLM for python-pptx code and run it in the sandbox pool.
 
-    except Exception as e:
-        print(f"❌ Error during execution: {e}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+    Returns the action message for the user and the code, which is None
+    unless the code wrote ``file_name``.
+    """
+    logger.info("Gathering pptx code ...")
+    model = get_llm_by_type(AGENT_LLM_MAP["pptx_coder"], agent_name="pptx_coder")
+    coder_response = _invoke_llm(
+        "pptx_coder",
+        model,
+        [
+            SystemMessage(content=get_prompt_template("pptx_coder")),
+            HumanMessage(content=to_json(project_state(state, "pptx_coder"))),
+        ],
+    )
+    code = textwrap.dedent(extract_code_from_response(coder_response.content))
+
+    result = get_pptx_pool().run(code, output_file=file_name)
+    if result.stdout:
+        logger.info("Generated pptx code output:\n%s", result.stdout)
+    if result.stderr:
+        logger.warning("Generated pptx code errors:\n%s", result.stderr)
+    if not result.ok:
+        logger.error("Generated pptx code failed: %s", result.error)
+        return f"Could not generate the PPT: {result.error.strip().splitlines()[-1]}", None
+    if result.output_file is None:
+        return f"The generated code ran in {result.exec_seconds:.2f}s but did not write {file_name}", None
+    return f"Saved the PPT to {result.output_file} in {result.exec_seconds:.2f}s", code
+
+
+def _build_slide_content(model, slide):
+    """Run the slide builder prompt for a single slide and return its parsed layout."""
+    return _invoke_structured("slide_builder", model, _slide_builder_messages(slide))
+
+
+def _slide_builder_messages(slide) -> list:
+    return [
+        SystemMessage(content=get_prompt_template("slide_builder")),
+        HumanMessage(content=to_json(project_slide(slide))),
+    ]
 
-        # COM cleanup even on error
-        if os.name == 'nt':
-            try:
-                import pythoncom
-                pythoncom.CoUninitialize()
-            except:
-                pass
 
-    print("CODER RESPONSE END")
-    print("=" * 50)
+def _attach_slide_content(slide, slide_content, input_hash) -> None:
+    slide.pop("slide_build_error", None)
+    slide["slide_content"] = slide_content
+    slide["slide_content_hash"] = input_hash
 
-    return Command(
-        goto="__end__"
-    )
 
-def slide_builder_node(state: PPTState) -> Command[Literal["__end__"]]:
-    logger.info("Gathering pptx code ...")
-    model = get_llm_by_type(AGENT_LLM_MAP["slide_builder"])
-    print("STATE TYPE", type(state))
-    print("STATE", state)
-    slides = state["slides"].copy()
-    for slide in slides:
-        slide_response = model.invoke(
-            [
-                SystemMessage(content=get_prompt_template("slide_builder")),
-                HumanMessage(content=str(slide)),
-            ],
-        )
-        parsed_response = parse_llm_json(slide_response.content)
-        slide["slide_content"] = parsed_response
+def _stale_slides(slides) -> tuple:
+    """Return the input hash of every slide and the indices of slides that need a (re)build."""
+    # only slides whose inputs changed since their last build (or that were
+    # never built) go back to the model
+    input_hashes = [slide_input_hash(slide) for slide in slides]
+    stale = [index for index, slide in enumerate(slides) if not is_slide_content_current(slide)]
+    return input_hashes, stale
+
 
+def _slide_built(writer, slides, index, input_hash, slide_content, error) -> None:
+    """Store one build outcome on its slide and announce it on the custom stream."""
+    slide = slides[index]
+    if error is not None:
+        slide["slide_build_error"] = error
+    else:
+        _attach_slide_content(slide, slide_content, input_hash)
+    # lets the UI show each slide as soon as it is built
+    writer({
+        "event": "slide_built",
+        "slide_number": index + 1,
+        "slide_content": slide_content,
+        "error": error,
+    })
+
+
+def _slide_builder_command(slides, stale) -> Command[Literal["user_input_node"]]:
+    logger.info("Rebuilt %d slides, reused %d", len(stale), len(slides) - len(stale))
     return Command(
         update={
             "slides": slides,
+            "slides_rebuilt": len(stale),
+            "slides_reused": len(slides) - len(stale),
         },
         goto="user_input_node",
     )
+
+
+def slide_builder_node(
+    state: PPTState, config: RunnableConfig
+) -> Command[Literal["user_input_node"]]:
+    logger.info("Building slides ...")
+    model = get_llm_by_type(AGENT_LLM_MAP["slide_builder"], agent_name="slide_builder")
+    configurable = Configuration.from_runnable_config(config)
+    slides = [dict(slide) for slide in state["slides"]]
+    if not slides:
+        return Command(goto="user_input_node")
+
+    input_hashes, stale = _stale_slides(slides)
+
+    def build(slide):
+        # a failing slide must not take the rest of the deck down with it
+        try:
+            return _build_slide_content(model, slide), None
+        except Exception as e:
+            logger.exception("Failed to build slide %r", slide.get("title"))
+            return None, f"{type(e).__name__}: {e}"
+
+    if stale:
+        writer = get_stream_writer()
+        start = time.perf_counter()
+        max_workers = min(max(1, configurable.slide_builder_concurrency), len(stale))
+        # ContextThreadPoolExecutor keeps the runnable context (callbacks, streaming)
+        # attached to the model calls made from the worker threads
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(build, slides[index]): index for index in stale}
+            for completed, future in enumerate(as_completed(futures)):
+                index = futures[future]
+                slide_content, error = future.result()
+                if completed == 0:
+                    metrics.observe("time_to_first_slide_seconds", time.perf_counter() - start)
+                _slide_built(writer, slides, index, input_hashes[index], slide_content, error)
+
+    return _slide_builder_command(slides, stale)
@@ -0,0 +1,142 @@
+"""
+Native rendering of large decks in worker processes, one slide range per task.
+
+``render_presentation`` builds every slide into one python-pptx object graph
+on one core, and python-pptx names each new notes slide by walking the whole
+package, so the cost per slide grows with the deck. With
+``pptx_renderer="parallel"`` the slides are split into contiguous ranges
+that a process pool renders into partial packages, all cloned from the same
+theme (``phase1.themes``); ``phase1.pptx_merge.assemble_deck`` then combines
+their slides, in order, into the final deck. The output is the same whatever
+the number of workers or the range size.
+
+Decks shorter than ``min_slides`` are rendered in-process. Configured by the
+PARALLEL_RENDER section of conf.yaml; merge time and tasks are recorded in
+``phase1.metrics`` under ``parallel_render.*``.
+"""
+
+import atexit
+import io
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from phase1.config import load_yaml_config
+from phase1.metrics import metrics
+from phase1.pptx_merge import PackageReader, assemble_deck
+from phase1.renderer import (
+    SLIDE_HEIGHT,
+    SLIDE_WIDTH,
+    RenderResult,
+    allowed_image_dirs,
+    render_presentation,
+    render_slide,
+    renderable_content,
+)
+from phase1.state import Slide
+from phase1.themes import new_presentation
+
+# shared pool, started on the first parallel render
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _render_config() -> dict:
+    return load_yaml_config(str(Path(__file__).parent / "conf.yaml")).get("PARALLEL_RENDER") or {}
+
+
+def _workers() -> int:
+    return _render_config().get("workers") or os.cpu_count() or 1
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Return the shared pool of PARALLEL_RENDER ``workers`` processes (default: one per core)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = _workers()
+                # spawn, not fork: the graph process runs threads
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def new_partial_presentation(theme: Optional[str] = None):
+    """Empty deck every partial package starts from, so their layouts and notes master match."""
+    prs = new_presentation(theme)
+    if not theme:
+        prs.slide_width = SLIDE_WIDTH
+        prs.slide_height = SLIDE_HEIGHT
+    # notes slides of any partial must find the notes master in the base
+    prs.notes_master
+    return prs
+
+
+def render_range(
+    slides: List[Slide], theme: Optional[str] = None, image_dirs: Optional[Sequence[str]] = None
+) -> Tuple[bytes, List[float]]:
+    """Render ``slides`` into a partial package; returns its bytes and the per-slide timings."""
+    prs = new_partial_presentation(theme)
+    if image_dirs is None:
+        image_dirs = allowed_image_dirs()
+    timings = []
+    for slide in slides:
+        start = time.perf_counter()
+        render_slide(prs, renderable_content(slide), image_dirs)
+        timings.append(time.perf_counter() - start)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue(), timings
+
+
+def split_ranges(count: int, workers: int, slides_per_task: Optional[int] = None) -> List[range]:
+    """Contiguous ranges covering ``count`` slides; by default two per worker."""
+    size = slides_per_task or max(1, math.ceil(count / (workers * 2)))
+    return [range(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def render_presentation_parallel(
+    slides: List[Slide],
+    file_path: str,
+    theme: Optional[str] = None,
+    pool: Optional[Executor] = None,
+    slides_per_task: Optional[int] = None,
+    min_slides: Optional[int] = None,
+    image_dirs: Optional[Sequence[str]] = None,
+) -> RenderResult:
+    """Render ``slides`` range by range in ``pool`` and merge the ranges into ``file_path``."""
+    conf = _render_config()
+    min_slides = conf.get("min_slides", 40) if min_slides is None else min_slides
+    # resolved here: the workers do not see this process's configuration
+    image_dirs = allowed_image_dirs() if image_dirs is None else tuple(image_dirs)
+    if len(slides) < max(1, min_slides):
+        return render_presentation(
+            slides, file_path, prs=new_presentation(theme) if theme else None, image_dirs=image_dirs
+        )
+
+    start = time.perf_counter()
+    pool = pool or get_render_pool()
+    ranges = split_ranges(len(slides), _workers(), slides_per_task or conf.get("slides_per_task"))
+    futures = [pool.submit(render_range, [slides[index] for index in task], theme, image_dirs) for task in ranges]
+    # collected in range order, whatever order they finish in
+    partials = [future.result() for future in futures]
+    metrics.incr("parallel_render.tasks", len(ranges))
+
+    merge_start = time.perf_counter()
+    readers = [PackageReader(data) for data, _ in partials]
+    slide_parts = [(reader, partname) for reader in readers for partname in reader.slides()]
+    assemble_deck(readers[0], slide_parts, file_path)
+    for reader in readers:
+        reader.close()
+    metrics.observe("parallel_render.merge_seconds", time.perf_counter() - merge_start)
+
+    result = RenderResult(file_path=file_path)
+    result.slide_timings = [timing for _, timings in partials for timing in timings]
+    result.total_seconds = time.perf_counter() - start
+    return result
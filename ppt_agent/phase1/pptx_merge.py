@@ -0,0 +1,359 @@
+"""
+Slide-level assembly of saved .pptx packages, without python-pptx objects.
+
+``assemble_deck`` writes a deck whose masters, layouts and theme come from a
+``base`` package and whose slides are taken, in the given order, from any
+number of source packages rendered from the same theme. Slide and notes XML
+are copied as bytes: their relationships keep their ids, so the ``r:id``
+references inside stay valid. Only the small ``.rels`` parts,
+``presentation.xml`` and ``[Content_Types].xml`` are rewritten.
+
+Slides, notes slides and attached media are renumbered in deck order, parts
+with identical bytes are stored once and every zip entry gets the same fixed
+timestamp: the output depends only on the slides and their order, not on how
+they were split across source packages.
+
+Layouts and the notes master are matched by part name, which holds when every
+package was cloned from the same theme (``phase1.themes``). Slides whose
+attached parts have relationships of their own (charts, embedded workbooks)
+are not supported.
+"""
+
+import functools
+import hashlib
+import io
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+
+RELS_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
+CONTENT_TYPES_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/content-types"
+SECTIONS_XPATH = "//*[local-name()='sectionLst']"
+
+# fixed entry timestamp (the zip epoch), so equal decks are equal bytes
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+# already compressed formats are stored as they are
+STORED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "tif", "tiff", "mp3", "mp4", "m4a", "m4v", "mov", "wmv", "avi"}
+
+SLIDE_PARTNAME = "/ppt/slides/slide{}.xml"
+NOTES_SLIDE_PARTNAME = "/ppt/notesSlides/notesSlide{}.xml"
+FIRST_SLIDE_ID = 256
+
+
+@dataclass
+class Relationship:
+    rId: str
+    reltype: str
+    target: str  # absolute part name, or the raw reference when external
+    external: bool = False
+
+
+class ContentTypes:
+    """``[Content_Types].xml``: defaults by extension and overrides by part name."""
+
+    def __init__(self, defaults: Dict[str, str], overrides: Dict[str, str]):
+        self.defaults = defaults
+        self.overrides = overrides
+
+    @classmethod
+    def from_xml(cls, xml: bytes) -> "ContentTypes":
+        root = etree.fromstring(xml)
+        defaults = {
+            element.get("Extension").lower(): element.get("ContentType")
+            for element in root.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Default")
+        }
+        overrides = {
+            element.get("PartName"): element.get("ContentType")
+            for element in root.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Override")
+        }
+        return cls(defaults, overrides)
+
+    def lookup(self, partname: str) -> str:
+        if partname in self.overrides:
+            return self.overrides[partname]
+        return self.defaults[PackURI(partname).ext.lower()]
+
+    def to_xml(self, parts: Dict[str, str]) -> bytes:
+        """Serialize for ``parts`` (part name -> content type), in their order."""
+        root = etree.Element(f"{{{CONTENT_TYPES_NAMESPACE}}}Types", nsmap={None: CONTENT_TYPES_NAMESPACE})
+        # only the defaults the parts use: the same parts give the same XML
+        used = {PackURI(partname).ext.lower() for partname in parts}
+        defaults = {extension: self.defaults[extension] for extension in used if extension in self.defaults}
+        defaults["rels"] = "application/vnd.openxmlformats-package.relationships+xml"
+        for extension in sorted(defaults):
+            etree.SubElement(root, f"{{{CONTENT_TYPES_NAMESPACE}}}Default", Extension=extension, ContentType=defaults[extension])
+        for partname, content_type in parts.items():
+            if defaults.get(PackURI(partname).ext.lower()) != content_type:
+                etree.SubElement(root, f"{{{CONTENT_TYPES_NAMESPACE}}}Override", PartName=partname, ContentType=content_type)
+        return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+@functools.lru_cache(maxsize=4096)
+def _relative_ref(partname: str, base_uri: str) -> str:
+    return PackURI(partname).relative_ref(base_uri)
+
+
+def rels_to_xml(source_partname: str, relationships: Sequence[Relationship]) -> bytes:
+    """Serialize relationships of ``source_partname`` (``/`` for the package)."""
+    base_uri = PackURI(source_partname).baseURI if source_partname != "/" else PACKAGE_URI.baseURI
+    root = etree.Element(f"{{{RELS_NAMESPACE}}}Relationships", nsmap={None: RELS_NAMESPACE})
+    for rel in relationships:
+        element = etree.SubElement(root, f"{{{RELS_NAMESPACE}}}Relationship", Id=rel.rId, Type=rel.reltype)
+        if rel.external:
+            element.set("Target", rel.target)
+            element.set("TargetMode", RTM.EXTERNAL)
+        else:
+            element.set("Target", _relative_ref(rel.target, base_uri))
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _rels_member(partname: str) -> str:
+    if partname == "/":
+        return "_rels/.rels"
+    return PackURI(partname).rels_uri.membername
+
+
+class PackageReader:
+    """Read-only view of a saved .pptx: raw parts, relationships and content types."""
+
+    def __init__(self, source: Union[str, bytes, BinaryIO]):
+        self.zip = zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source)
+        self.members = self.zip.namelist()
+        self._members = set(self.members)
+        self.content_types = ContentTypes.from_xml(self.zip.read(CONTENT_TYPES_URI.membername))
+        self._rels: Dict[str, List[Relationship]] = {}
+
+    def close(self) -> None:
+        self.zip.close()
+
+    def read(self, partname: str) -> bytes:
+        return self.zip.read(PackURI(partname).membername)
+
+    def read_rels(self, partname: str) -> Optional[bytes]:
+        member = _rels_member(partname)
+        return self.zip.read(member) if member in self._members else None
+
+    def rels(self, partname: str) -> List[Relationship]:
+        """Relationships of ``partname`` (``/`` for the package), in document order."""
+        if partname not in self._rels:
+            xml = self.read_rels(partname)
+            base_uri = PackURI(partname).baseURI if partname != "/" else PACKAGE_URI.baseURI
+            relationships = []
+            if xml is not None:
+                for element in etree.fromstring(xml).iter(f"{{{RELS_NAMESPACE}}}Relationship"):
+                    external = element.get("TargetMode") == RTM.EXTERNAL
+                    target = element.get("Target")
+                    relationships.append(Relationship(
+                        rId=element.get("Id"),
+                        reltype=element.get("Type"),
+                        target=target if external else str(PackURI.from_rel_ref(base_uri, target)),
+                        external=external,
+                    ))
+            self._rels[partname] = relationships
+        return self._rels[partname]
+
+    @property
+    def main_partname(self) -> str:
+        return next(rel.target for rel in self.rels("/") if rel.reltype == RT.OFFICE_DOCUMENT)
+
+    def slides(self) -> List[str]:
+        """Part names of the slides, in presentation order."""
+        main = self.main_partname
+        targets = {rel.rId: rel.target for rel in self.rels(main) if rel.reltype == RT.SLIDE}
+        presentation = parse_xml(self.read(main))
+        slide_list = presentation.sldIdLst
+        return [targets[slide_id.rId] for slide_id in slide_list.sldId_lst] if slide_list is not None else []
+
+    def related(self, partname: str, reltype: str) -> Optional[str]:
+        return next((rel.target for rel in self.rels(partname) if rel.reltype == reltype and not rel.external), None)
+
+
+def _numbered(partname: str) -> Tuple[str, str]:
+    """``/ppt/media/image3.png`` -> (``/ppt/media/image``, ``.png``)."""
+    match = re.match(r"^(.*?)(\d*)(\.[^./]+)$", partname)
+    return (match.group(1), match.group(3)) if match else (partname, "")
+
+
+class _DeckWriter:
+    def __init__(self, output, content_types: ContentTypes):
+        self.zip = zipfile.ZipFile(output, "w")
+        self.content_types = content_types
+        self.parts: Dict[str, str] = {}
+        self._by_digest: Dict[Tuple[str, str], str] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+
+    def write(self, member: str, data: bytes) -> None:
+        info = zipfile.ZipInfo(member, date_time=ZIP_TIMESTAMP)
+        extension = member.rsplit(".", 1)[-1].lower()
+        info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+        self.zip.writestr(info, data)
+
+    def add_part(self, partname: str, content_type: str, blob: bytes, rels: Optional[bytes] = None) -> None:
+        self.parts[partname] = content_type
+        self.write(PackURI(partname).membername, blob)
+        if rels is not None:
+            self.write(_rels_member(partname), rels)
+
+    def new_partname(self, like: str) -> str:
+        """Next free part name numbered like ``like``."""
+        stem, extension = _numbered(like)
+        number = self._counters.get((stem, extension), 0)
+        while True:
+            number += 1
+            partname = f"{stem}{number}{extension}"
+            if partname not in self.parts:
+                self._counters[(stem, extension)] = number
+                return partname
+
+    def add_shared(self, content_type: str, blob: bytes, like: str) -> str:
+        """Store a leaf part once per distinct content and return its part name."""
+        key = (content_type, hashlib.sha1(blob).hexdigest())
+        if key not in self._by_digest:
+            partname = self.new_partname(like)
+            self.add_part(partname, content_type, blob)
+            self._by_digest[key] = partname
+        return self._by_digest[key]
+
+    def close(self) -> None:
+        # written last, once every part is known; readers look it up by name
+        self.write(CONTENT_TYPES_URI.membername, self.content_types.to_xml(self.parts))
+        self.zip.close()
+
+
+def _base_parts(base: PackageReader) -> List[str]:
+    """Parts of ``base`` reachable without going through a slide, in member order."""
+    main = base.main_partname
+    reachable: Set[str] = set()
+    pending = ["/"]
+    while pending:
+        partname = pending.pop()
+        for rel in base.rels(partname):
+            if rel.external or rel.target in reachable:
+                continue
+            if partname == main and rel.reltype == RT.SLIDE:
+                continue
+            reachable.add(rel.target)
+            pending.append(rel.target)
+    members = {PackURI(partname).membername: partname for partname in reachable}
+    return [members[member] for member in base.members if member in members]
+
+
+def _copy_attached(writer: _DeckWriter, source: PackageReader, partname: str) -> str:
+    if source.rels(partname):
+        raise ValueError(f"{partname} has relationships of its own, which slide merging does not support")
+    return writer.add_shared(source.content_types.lookup(partname), source.read(partname), partname)
+
+
+def _copy_slide(
+    writer: _DeckWriter, source: PackageReader, partname: str, new_partname: str, shared: Set[str]
+) -> None:
+    relationships = []
+    for rel in source.rels(partname):
+        target = rel.target
+        if rel.external:
+            pass
+        elif rel.reltype == RT.SLIDE_LAYOUT:
+            if target not in shared:
+                raise ValueError(f"{partname}: layout {target} is not in the base deck, render every part from the same theme")
+        elif rel.reltype == RT.NOTES_SLIDE:
+            target = _copy_notes(writer, source, target, new_partname, shared)
+        else:
+            target = _copy_attached(writer, source, target)
+        relationships.append(Relationship(rel.rId, rel.reltype, target, rel.external))
+    writer.add_part(
+        new_partname,
+        source.content_types.lookup(partname),
+        source.read(partname),
+        rels_to_xml(new_partname, relationships),
+    )
+
+
+def _copy_notes(writer: _DeckWriter, source: PackageReader, partname: str, slide_partname: str, shared: Set[str]) -> str:
+    new_partname = writer.new_partname(NOTES_SLIDE_PARTNAME.format(1))
+    relationships = []
+    for rel in source.rels(partname):
+        target = rel.target
+        if rel.external:
+            pass
+        elif rel.reltype == RT.SLIDE:
+            target = slide_partname
+        elif rel.reltype == RT.NOTES_MASTER:
+            if target not in shared:
+                raise ValueError(f"{partname}: the base deck has no notes master {target}")
+        else:
+            target = _copy_attached(writer, source, target)
+        relationships.append(Relationship(rel.rId, rel.reltype, target, rel.external))
+    writer.add_part(
+        new_partname,
+        source.content_types.lookup(partname),
+        source.read(partname),
+        rels_to_xml(new_partname, relationships),
+    )
+    return new_partname
+
+
+def _presentation_parts(base: PackageReader, slide_partnames: Sequence[str]) -> Tuple[bytes, bytes]:
+    """``presentation.xml`` and its rels with the slide list replaced by ``slide_partnames``."""
+    main = base.main_partname
+    relationships = [rel for rel in base.rels(main) if rel.reltype != RT.SLIDE]
+    used = {int(rel.rId[3:]) for rel in relationships if rel.rId[3:].isdigit()}
+    next_rid = max(used, default=0) + 1
+
+    presentation = parse_xml(base.read(main))
+    if presentation.sldIdLst is not None:
+        presentation.remove(presentation.sldIdLst)
+    # sections list slide ids that no longer exist
+    for sections in presentation.xpath(SECTIONS_XPATH):
+        sections.getparent().remove(sections)
+    if slide_partnames:
+        slide_list = presentation.get_or_add_sldIdLst()
+        for index, partname in enumerate(slide_partnames):
+            rId = f"rId{next_rid + index}"
+            relationships.append(Relationship(rId, RT.SLIDE, partname))
+            # add_sldId would rescan the list for a free id at every slide
+            slide_id = etree.SubElement(slide_list, qn("p:sldId"), id=str(FIRST_SLIDE_ID + index))
+            slide_id.set(qn("r:id"), rId)
+    xml = etree.tostring(presentation, xml_declaration=True, encoding="UTF-8", standalone=True)
+    return xml, rels_to_xml(main, relationships)
+
+
+def assemble_deck(
+    base: PackageReader,
+    slides: Sequence[Tuple[PackageReader, str]],
+    output: Union[str, BinaryIO],
+) -> List[str]:
+    """Write ``base`` with exactly ``slides`` ((package, slide part name) pairs) to ``output``.
+
+    Returns the part names of the slides in the written deck, in order.
+    """
+    defaults = {}
+    packages = {id(package): package for package in [base] + [source for source, _ in slides]}
+    for package in packages.values():
+        for extension, content_type in package.content_types.defaults.items():
+            defaults.setdefault(extension, content_type)
+    writer = _DeckWriter(output, ContentTypes(defaults, {}))
+    shared = _base_parts(base)
+    shared_set = set(shared)
+    slide_partnames = [SLIDE_PARTNAME.format(index + 1) for index in range(len(slides))]
+    main = base.main_partname
+    presentation_xml, presentation_rels = _presentation_parts(base, slide_partnames)
+
+    writer.write("_rels/.rels", base.read_rels("/"))
+    for partname in shared:
+        if partname == main:
+            writer.add_part(partname, base.content_types.lookup(partname), presentation_xml, presentation_rels)
+        else:
+            writer.add_part(partname, base.content_types.lookup(partname), base.read(partname), base.read_rels(partname))
+    for (source, partname), new_partname in zip(slides, slide_partnames):
+        _copy_slide(writer, source, partname, new_partname, shared_set)
+    writer.close()
+    return slide_partnames
+
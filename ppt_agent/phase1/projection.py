@@ -0,0 +1,69 @@
+"""
+Projection of ``PPTState`` into the compact JSON each node sends to its LLM.
+
+Nodes used to send ``str(state)`` (including the ever growing ``messages``
+list) or Python reprs of every slide. Each node now declares the state fields
+it needs in ``NODE_STATE_FIELDS``; ``project_state`` picks only those and
+``to_json`` serializes them compactly.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Mapping
+
+# Fields of a Slide the LLM needs to plan, refine or build it. ``slide_content``
+# (the built layout) and bookkeeping fields are deliberately left out.
+SLIDE_INPUT_FIELDS = (
+    "key_message_part",
+    "which_key_message_this_slide_supports",
+    "title",
+    "content",
+    "image",
+    "message_here",
+    "layout_description",
+)
+
+NODE_STATE_FIELDS: Dict[str, tuple] = {
+    "user_task_manager": ("slides",),
+    "ppt_refiner": ("slides",),
+    "pptx_coder": ("file_name", "ppt_title", "number_of_slides", "key_messages", "slides"),
+}
+
+
+def to_json(value: Any) -> str:
+    """Serialize ``value`` as compact JSON, keeping non-ASCII text readable."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def project_slide(slide: Mapping[str, Any], fields: Iterable[str] = SLIDE_INPUT_FIELDS) -> Dict[str, Any]:
+    """Keep only the given (present) fields of a slide."""
+    return {field: slide[field] for field in fields if field in slide}
+
+
+def slide_input_hash(slide: Mapping[str, Any]) -> str:
+    """Stable hash of the fields the slide builder sees for ``slide``."""
+    raw = json.dumps(project_slide(slide), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_slide_content_current(slide: Mapping[str, Any]) -> bool:
+    """Whether the slide's built ``slide_content`` was built from its current input fields."""
+    return bool(slide.get("slide_content")) and slide.get("slide_content_hash") == slide_input_hash(slide)
+
+
+def project_fields(state: Mapping[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Pick ``fields`` out of ``state``; slides are reduced to their input fields."""
+    projected = {}
+    for field in fields:
+        if field not in state:
+            continue
+        value = state[field]
+        if field == "slides":
+            value = [project_slide(slide) for slide in value or []]
+        projected[field] = value
+    return projected
+
+
+def project_state(state: Mapping[str, Any], node: str) -> Dict[str, Any]:
+    """Return the part of ``state`` declared for ``node`` in NODE_STATE_FIELDS."""
+    return project_fields(state, NODE_STATE_FIELDS[node])
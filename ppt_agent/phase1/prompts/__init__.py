@@ -1,9 +1,16 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
-from .template import apply_prompt_template, get_prompt_template
+from .template import (
+    apply_prompt_template,
+    current_time_message,
+    get_prompt_template,
+    precompile_templates,
+)
 
 __all__ = [
     "apply_prompt_template",
+    "current_time_message",
     "get_prompt_template",
+    "precompile_templates",
 ]
@@ -3,35 +3,81 @@
 
 import os
 import dataclasses
+import threading
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Dict
+from jinja2 import Environment, FileSystemLoader, Template
 from langgraph.prebuilt.chat_agent_executor import AgentState
 from phase1.config.configuration import Configuration
 
-# Initialize Jinja2 environment
+PROMPTS_DIR = os.path.dirname(__file__)
+
+# Initialize Jinja2 environment. Prompts are markdown sent to an LLM, not HTML,
+# so nothing is escaped.
 env = Environment(
-    loader=FileSystemLoader(os.path.dirname(__file__)),
-    autoescape=select_autoescape(),
+    loader=FileSystemLoader(PROMPTS_DIR),
+    autoescape=False,
     trim_blocks=True,
     lstrip_blocks=True,
 )
 
+# Compiled templates and renders of templates without variables, by prompt name
+_compiled: Dict[str, Template] = {}
+_static_renders: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def _compiled_template(prompt_name: str) -> Template:
+    template = _compiled.get(prompt_name)
+    if template is None:
+        with _lock:
+            template = _compiled.get(prompt_name)
+            if template is None:
+                template = _compiled[prompt_name] = env.get_template(f"{prompt_name}.md")
+    return template
+
+
+def precompile_templates() -> None:
+    """Compile every prompt template up front, so no node pays for it on its first call."""
+    for file_name in os.listdir(PROMPTS_DIR):
+        if file_name.endswith(".md"):
+            _compiled_template(file_name[: -len(".md")])
+
 
 def get_prompt_template(prompt_name: str) -> str:
     """
     Load and return a prompt template using Jinja2.
 
+    The template is compiled once and, since it is rendered without variables,
+    the rendered text is memoized: every call returns the same string.
+
     Args:
         prompt_name: Name of the prompt template file (without .md extension)
 
     Returns:
         The template string with proper variable substitution syntax
     """
+    prompt = _static_renders.get(prompt_name)
+    if prompt is not None:
+        return prompt
     try:
-        template = env.get_template(f"{prompt_name}.md")
-        return template.render()
+        prompt = _compiled_template(prompt_name).render()
     except Exception as e:
         raise ValueError(f"Error loading template {prompt_name}: {e}")
+    _static_renders[prompt_name] = prompt
+    return prompt
+
+
+def current_time_message() -> dict:
+    """System message carrying the current time.
+
+    Kept out of the prompt templates so the large system prompt stays
+    byte-identical between calls and can be cached downstream.
+    """
+    return {
+        "role": "system",
+        "content": "CURRENT_TIME: " + datetime.now().strftime("%a %b %d %Y %H:%M:%S %z"),
+    }
 
 
 def apply_prompt_template(
@@ -45,21 +91,21 @@ def apply_prompt_template(
         state: Current agent state containing variables to substitute
 
     Returns:
-        List of messages with the system prompt as the first message
+        List of messages with the system prompt first, then the current time,
+        then the state's messages
     """
     # Convert state to dict for template rendering
-    state_vars = {
-        "CURRENT_TIME": datetime.now().strftime("%a %b %d %Y %H:%M:%S %z"),
-        **state,
-    }
+    state_vars = dict(state)
 
     # Add configurable variables
     if configurable:
         state_vars.update(dataclasses.asdict(configurable))
 
     try:
-        template = env.get_template(f"{prompt_name}.md")
-        system_prompt = template.render(**state_vars)
-        return [{"role": "system", "content": system_prompt}] + state["messages"]
+        system_prompt = _compiled_template(prompt_name).render(**state_vars)
+        return [
+            {"role": "system", "content": system_prompt},
+            current_time_message(),
+        ] + state["messages"]
     except Exception as e:
         raise ValueError(f"Error applying template {prompt_name}: {e}")
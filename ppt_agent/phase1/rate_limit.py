@@ -0,0 +1,333 @@
+"""
+Client-side rate limiting for LLM calls.
+
+Every model gets one shared ``ModelRateLimiter`` (see ``phase1.llm``) that
+
+* spaces requests with token buckets for requests/min and tokens/min,
+* caps in-flight calls with an AIMD window: each success grows the window
+  by ``1 / window`` (about +1 per window of calls), each throttling answer
+  (HTTP 429 / ``ResourceExhausted``) halves it,
+* retries throttled calls with full-jitter exponential backoff.
+
+``RateLimitedChatModel`` applies a limiter to ``invoke``/``stream`` and
+their async variants. Queue depth, wait time, throttles and retries are
+recorded in ``phase1.metrics`` under ``rate_limit.*.<model>``.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from phase1.metrics import estimate_tokens, metrics
+
+logger = logging.getLogger(__name__)
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """True for provider answers that mean "slow down" (HTTP 429 / RESOURCE_EXHAUSTED)."""
+    while error is not None:
+        if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+            return True
+        if type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "RateLimitError"):
+            return True
+        error = error.__cause__
+    return False
+
+
+class TokenBucket:
+    """Refills ``rate_per_minute`` units per minute up to ``capacity``.
+
+    ``reserve`` takes the units immediately (the level may go negative) and
+    returns how long the caller must wait before using them, so concurrent
+    callers queue up in arrival order without holding the lock while waiting.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        # caller holds the lock
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units and return the seconds to wait until they are available."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # a single request larger than the bucket would otherwise never fit
+            self._level -= min(amount, self.capacity)
+            if self._level >= 0:
+                return 0.0
+            return -self._level / self.rate_per_second
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) units after the real cost is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level - amount)
+
+
+class AIMDWindow:
+    """Concurrency window with additive increase and multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float = 1,
+        maximum: float = 32,
+        decrease_factor: float = 0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self.waiting = 0
+
+    def has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+
+
+class ModelRateLimiter:
+    """Shared request/token budget and concurrency window for one model.
+
+    ``requests_per_minute`` or ``tokens_per_minute`` set to None disables that
+    bucket. ``run``/``arun`` wrap a single provider call; ``acquire``/``release``
+    are exposed for callers (like streaming) that hold a slot across several steps.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: float = 4,
+        min_concurrency: float = 1,
+        max_concurrency: float = 32,
+        max_retries: int = 5,
+        base_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0,
+    ):
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.window = AIMDWindow(initial_concurrency, min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._condition = threading.Condition()
+
+    def _reserve(self, tokens: int) -> float:
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def _enter_queue(self) -> None:
+        # caller holds the condition
+        self.window.waiting += 1
+        metrics.observe(f"rate_limit.queue_depth.{self.model}", self.window.waiting)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a concurrency slot and the request/token budget are available."""
+        start = time.perf_counter()
+        with self._condition:
+            self._enter_queue()
+            while not self.window.has_capacity():
+                self._condition.wait()
+            self.window.waiting -= 1
+            self.window.in_flight += 1
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        metrics.observe(f"rate_limit.wait_seconds.{self.model}", time.perf_counter() - start)
+
+    async def aacquire(self, tokens: int) -> None:
+        """Async ``acquire``: waits on the event loop instead of blocking a thread."""
+        start = time.perf_counter()
+        with self._condition:
+            self._enter_queue()
+        try:
+            # the window is shared with sync callers, so poll it instead of
+            # waiting on an asyncio primitive
+            delay = 0.001
+            while True:
+                with self._condition:
+                    if self.window.has_capacity():
+                        self.window.in_flight += 1
+                        break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.05)
+        finally:
+            with self._condition:
+                self.window.waiting -= 1
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        metrics.observe(f"rate_limit.wait_seconds.{self.model}", time.perf_counter() - start)
+
+    def release(self, error: Optional[BaseException] = None, actual_tokens: int = 0, estimated_tokens: int = 0) -> None:
+        """Free the slot and feed the outcome into the AIMD window."""
+        if self.tokens and actual_tokens:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+        with self._condition:
+            self.window.in_flight -= 1
+            if error is None:
+                self.window.on_success()
+            elif is_throttling_error(error):
+                self.window.on_throttle()
+                metrics.incr(f"rate_limit.throttled.{self.model}")
+            metrics.observe(f"rate_limit.concurrency_limit.{self.model}", self.window.limit)
+            self._condition.notify_all()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** attempt))
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """True when ``error`` is a throttle and retry ``attempt`` is still within budget."""
+        if not is_throttling_error(error) or attempt >= self.max_retries:
+            return False
+        metrics.incr(f"rate_limit.retries.{self.model}")
+        return True
+
+    def run(self, call: Callable[[], Any], tokens: int) -> Any:
+        """Run ``call`` within the budget, retrying throttled attempts."""
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                result = call()
+            except Exception as e:
+                self.release(e)
+                if not self.should_retry(e, attempt):
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException as e:
+                self.release(e)
+                raise
+            self.release(actual_tokens=_usage_tokens(result), estimated_tokens=tokens)
+            return result
+
+    async def arun(self, call: Callable[[], Any], tokens: int) -> Any:
+        """Async ``run``; ``call`` returns an awaitable."""
+        attempt = 0
+        while True:
+            await self.aacquire(tokens)
+            try:
+                result = await call()
+            except Exception as e:
+                self.release(e)
+                if not self.should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException as e:
+                # cancelled: give the slot back without judging the provider
+                self.release(e)
+                raise
+            self.release(actual_tokens=_usage_tokens(result), estimated_tokens=tokens)
+            return result
+
+
+def _usage_tokens(response) -> int:
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens", 0)
+
+
+def _estimate_request_tokens(messages: List[BaseMessage]) -> int:
+    return sum(estimate_tokens(str(message.content)) for message in messages)
+
+
+class RateLimitedChatModel:
+    """Wraps a chat model so every provider call goes through a ModelRateLimiter.
+
+    Streams are retried only while no chunk has been yielded yet. Everything
+    else is delegated to the wrapped model.
+    """
+
+    def __init__(self, llm, limiter: ModelRateLimiter):
+        self.llm = llm
+        self.limiter = limiter
+
+    def invoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        return self.limiter.run(
+            lambda: self.llm.invoke(input, config, **kwargs), _estimate_request_tokens(input)
+        )
+
+    async def ainvoke(self, input: List[BaseMessage], config=None, **kwargs: Any) -> AIMessage:
+        return await self.limiter.arun(
+            lambda: self.llm.ainvoke(input, config, **kwargs), _estimate_request_tokens(input)
+        )
+
+    def stream(self, input: List[BaseMessage], config=None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        tokens = _estimate_request_tokens(input)
+        attempt = 0
+        while True:
+            self.limiter.acquire(tokens)
+            response = None
+            try:
+                for chunk in self.llm.stream(input, config, **kwargs):
+                    response = chunk if response is None else response + chunk
+                    yield chunk
+            except Exception as e:
+                self.limiter.release(e)
+                if response is not None or not self.limiter.should_retry(e, attempt):
+                    raise
+                time.sleep(self.limiter.backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException as e:
+                # closed early by the consumer or cancelled
+                self.limiter.release(e)
+                raise
+            self.limiter.release(actual_tokens=_usage_tokens(response), estimated_tokens=tokens)
+            return
+
+    async def astream(
+        self, input: List[BaseMessage], config=None, **kwargs: Any
+    ) -> AsyncIterator[AIMessageChunk]:
+        tokens = _estimate_request_tokens(input)
+        attempt = 0
+        while True:
+            await self.limiter.aacquire(tokens)
+            response = None
+            try:
+                async for chunk in self.llm.astream(input, config, **kwargs):
+                    response = chunk if response is None else response + chunk
+                    yield chunk
+            except Exception as e:
+                self.limiter.release(e)
+                if response is not None or not self.limiter.should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.limiter.backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException as e:
+                # closed early by the consumer or cancelled
+                self.limiter.release(e)
+                raise
+            self.limiter.release(actual_tokens=_usage_tokens(response), estimated_tokens=tokens)
+            return
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
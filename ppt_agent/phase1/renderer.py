@@ -0,0 +1,333 @@
+"""
+Deterministic renderer that turns the ``slide_content`` JSON produced by the
+slide builder straight into a .pptx, without asking an LLM to write code.
+
+Each ``layout_type`` emitted by ``prompts/slide_builder.md`` is mapped to a
+handler in ``LAYOUT_HANDLERS``; unknown layouts fall back to the generic
+title-and-body handler.
+
+Image blocks name their picture in ``url``/``path``, text the LLM wrote: a
+local file is embedded only when it lies under one of the ``image_dirs`` of
+the RENDERER section of conf.yaml, anything else is drawn as a labelled
+placeholder.
+"""
+
+import functools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import PP_ALIGN
+from pptx.util import Emu, Inches, Pt
+
+from phase1.config import load_yaml_config
+from phase1.projection import is_slide_content_current
+from phase1.state import Slide
+
+logger = logging.getLogger(__name__)
+
+# python-pptx default template layouts
+TITLE_LAYOUT = 0
+TITLE_ONLY_LAYOUT = 5
+BLANK_LAYOUT = 6
+
+# themes (see phase1.themes) order their layouts freely, they are found by name
+LAYOUT_NAMES = {
+    TITLE_LAYOUT: "Title Slide",
+    TITLE_ONLY_LAYOUT: "Title Only",
+    BLANK_LAYOUT: "Blank",
+}
+
+SLIDE_WIDTH = Inches(10)
+SLIDE_HEIGHT = Inches(7.5)
+MARGIN = Inches(0.5)
+BODY_TOP = Inches(1.6)
+CENTER_HEIGHT = Inches(3.5)
+
+ALIGNMENTS = {
+    "left": PP_ALIGN.LEFT,
+    "center": PP_ALIGN.CENTER,
+    "right": PP_ALIGN.RIGHT,
+    "justify": PP_ALIGN.JUSTIFY,
+}
+
+PLACEHOLDER_FILL = RGBColor(0xE7, 0xE6, 0xE6)
+
+
+@dataclass
+class RenderResult:
+    """Outcome of a render: where the deck was written and how long each slide took.
+
+    ``reused_slides`` were copied from a previous deck instead of rendered.
+    """
+
+    file_path: str
+    slide_timings: List[float] = field(default_factory=list)
+    total_seconds: float = 0.0
+    reused_slides: int = 0
+
+    @property
+    def number_of_slides(self) -> int:
+        return len(self.slide_timings) + self.reused_slides
+
+
+@dataclass(frozen=True)
+class BlockContext:
+    """What the content blocks of a slide are laid out in: the body regions of the
+    deck's slide size and the directories pictures may be embedded from."""
+
+    regions: Dict[str, Dict[str, Emu]]
+    image_dirs: Tuple[str, ...]
+
+
+def _box(left, top, width, height) -> Dict[str, Emu]:
+    return {"left": left, "top": top, "width": width, "height": height}
+
+
+@functools.lru_cache(maxsize=None)
+def body_regions(slide_width: int, slide_height: int) -> Dict[str, Dict[str, Emu]]:
+    """Boxes the ``position`` of a content block maps to, for a slide size."""
+    full_width = slide_width - 2 * MARGIN
+    half_width = (full_width - MARGIN) // 2
+    body_height = slide_height - BODY_TOP - MARGIN
+    return {
+        "body": _box(MARGIN, BODY_TOP, full_width, body_height),
+        "center": _box(MARGIN, (slide_height - CENTER_HEIGHT) // 2, full_width, CENTER_HEIGHT),
+        "left": _box(MARGIN, BODY_TOP, half_width, body_height),
+        "right": _box(MARGIN + half_width + MARGIN, BODY_TOP, half_width, body_height),
+    }
+
+
+def allowed_image_dirs() -> Tuple[str, ...]:
+    """The RENDERER ``image_dirs`` of conf.yaml, resolved (relative paths against the phase1 package)."""
+    package = Path(__file__).parent
+    conf = load_yaml_config(str(package / "conf.yaml")).get("RENDERER") or {}
+    return tuple(os.path.realpath(package / path) for path in conf.get("image_dirs") or ())
+
+
+def local_image(source: Optional[str], image_dirs: Sequence[str]) -> Optional[str]:
+    """``source`` if it is a file under one of ``image_dirs``, else None."""
+    if not source or not os.path.isfile(source):
+        return None
+    path = os.path.realpath(source)
+    for directory in image_dirs:
+        if os.path.commonpath([path, directory]) == directory:
+            return path
+    return None
+
+
+def _as_lines(text: Any) -> List[str]:
+    if text is None:
+        return []
+    if isinstance(text, str):
+        return [line for line in text.splitlines() if line.strip()]
+    return [str(line) for line in text]
+
+
+def _set_title(slide, title: str) -> None:
+    if slide.shapes.title is not None:
+        slide.shapes.title.text = title or ""
+
+
+def _add_text_block(slide, block: Dict[str, Any], region: Dict[str, Emu], context: BlockContext) -> None:
+    style = block.get("style") or {}
+    text_frame = slide.shapes.add_textbox(**region).text_frame
+    text_frame.word_wrap = True
+
+    lines = _as_lines(block.get("text"))
+    heading = block.get("heading")
+    if heading:
+        lines = [heading] + lines
+
+    for index, line in enumerate(lines):
+        paragraph = text_frame.paragraphs[0] if index == 0 else text_frame.add_paragraph()
+        is_heading = heading and index == 0
+        if style.get("bullet_points") and not is_heading:
+            line = "• " + line.lstrip("-• ").strip()
+        paragraph.text = line
+        paragraph.alignment = ALIGNMENTS.get(style.get("alignment", "left"), PP_ALIGN.LEFT)
+        font = paragraph.font
+        font.size = Pt(style.get("font_size", 18) + (4 if is_heading else 0))
+        font.bold = bool(style.get("bold")) or bool(is_heading)
+        font.italic = bool(style.get("italic"))
+
+
+def _add_image_block(slide, block: Dict[str, Any], region: Dict[str, Emu], context: BlockContext) -> None:
+    source = block.get("url") or block.get("path")
+    path = local_image(source, context.image_dirs)
+    if path is not None:
+        try:
+            slide.shapes.add_picture(path, region["left"], region["top"], width=region["width"])
+            return
+        except Exception as e:
+            logger.warning("Drawing a placeholder for unreadable image %s: %s", path, e)
+    elif source and os.path.isfile(source):
+        logger.warning("Not embedding %s: outside the RENDERER image_dirs", source)
+    # remote, described, unreadable or disallowed images are drawn as a labelled placeholder
+    shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, **region)
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = PLACEHOLDER_FILL
+    shape.text_frame.word_wrap = True
+    shape.text_frame.text = block.get("alt_text") or source or "Image"
+    shape.text_frame.paragraphs[0].font.color.rgb = RGBColor(0x40, 0x40, 0x40)
+
+
+BLOCK_RENDERERS: Dict[str, Callable[[Any, Dict[str, Any], Dict[str, Emu], BlockContext], None]] = {
+    "text": _add_text_block,
+    "image": _add_image_block,
+}
+
+
+def _add_blocks(
+    slide, blocks: List[Dict[str, Any]], context: BlockContext, default_position: str = "body"
+) -> None:
+    regions = context.regions
+    for block in blocks:
+        region = regions.get(block.get("position", default_position), regions[default_position])
+        renderer = BLOCK_RENDERERS.get(block.get("type", "text"))
+        if renderer is None:
+            logger.warning("Skipping unsupported content block type %r", block.get("type"))
+            continue
+        renderer(slide, block, region, context)
+
+
+def _layout(prs, index: int):
+    layout = prs.slide_layouts.get_by_name(LAYOUT_NAMES[index])
+    if layout is not None:
+        return layout
+    layouts = prs.slide_layouts
+    return layouts[index] if index < len(layouts) else layouts[len(layouts) - 1]
+
+
+def _render_title(prs, content: Dict[str, Any], context: BlockContext):
+    slide = prs.slides.add_slide(_layout(prs, TITLE_LAYOUT))
+    _set_title(slide, content.get("title", ""))
+    subtitle_lines = [
+        line for block in content.get("content_blocks", []) for line in _as_lines(block.get("text"))
+    ]
+    if len(slide.placeholders) > 1:
+        slide.placeholders[1].text = "\n".join(subtitle_lines)
+    return slide
+
+
+def _render_title_and_body(prs, content: Dict[str, Any], context: BlockContext):
+    slide = prs.slides.add_slide(_layout(prs, TITLE_ONLY_LAYOUT))
+    _set_title(slide, content.get("title", ""))
+    _add_blocks(slide, content.get("content_blocks", []), context)
+    return slide
+
+
+def _render_two_column(prs, content: Dict[str, Any], context: BlockContext):
+    slide = prs.slides.add_slide(_layout(prs, TITLE_ONLY_LAYOUT))
+    _set_title(slide, content.get("title", ""))
+    blocks = content.get("content_blocks", [])
+    # blocks without an explicit side are laid out left then right
+    for index, block in enumerate(blocks):
+        if block.get("position") not in ("left", "right"):
+            block = {**block, "position": "left" if index % 2 == 0 else "right"}
+        _add_blocks(slide, [block], context)
+    return slide
+
+
+def _render_quote(prs, content: Dict[str, Any], context: BlockContext):
+    slide = prs.slides.add_slide(_layout(prs, BLANK_LAYOUT))
+    blocks = [{**block, "position": "center"} for block in content.get("content_blocks", [])]
+    _add_blocks(slide, blocks, context, default_position="center")
+    return slide
+
+
+LAYOUT_HANDLERS: Dict[str, Callable[[Any, Dict[str, Any], BlockContext], Any]] = {
+    "title": _render_title,
+    "title-and-bullets": _render_title_and_body,
+    "title-and-content": _render_title_and_body,
+    "image-left-text-right": _render_two_column,
+    "text-left-image-right": _render_two_column,
+    "two-column": _render_two_column,
+    "comparison": _render_two_column,
+    "quote": _render_quote,
+}
+
+
+def slide_content_from_plan(slide: Slide) -> Dict[str, Any]:
+    """Build a minimal ``slide_content`` for a planned slide the slide builder has not processed."""
+    blocks = [
+        {
+            "type": "text",
+            "position": "left" if slide.get("image") else "body",
+            "text": _as_lines(slide.get("content", "")),
+            "style": {"font_size": 18, "bullet_points": True},
+        }
+    ]
+    if slide.get("image"):
+        blocks.append({"type": "image", "position": "right", "alt_text": slide["image"]})
+    return {
+        "layout_type": "image-left-text-right" if slide.get("image") else "title-and-bullets",
+        "title": slide.get("title", ""),
+        "content_blocks": blocks,
+        "speaker_notes": [slide["message_here"]] if slide.get("message_here") else [],
+    }
+
+
+def renderable_content(slide: Slide) -> Dict[str, Any]:
+    """The built ``slide_content`` if it is current, else a layout from the slide's planned fields."""
+    # an edit (e.g. by the refiner) leaves the old slide_content on the slide
+    # until the slide builder runs again
+    if is_slide_content_current(slide):
+        return slide["slide_content"]
+    return slide_content_from_plan(slide)
+
+
+def render_slide(prs, content: Dict[str, Any], image_dirs: Optional[Sequence[str]] = None):
+    """Append one slide described by ``content`` (slide builder JSON) to ``prs``.
+
+    Pictures are embedded from ``image_dirs``, by default ``allowed_image_dirs()``.
+    """
+    context = BlockContext(
+        regions=body_regions(prs.slide_width or SLIDE_WIDTH, prs.slide_height or SLIDE_HEIGHT),
+        image_dirs=allowed_image_dirs() if image_dirs is None else tuple(image_dirs),
+    )
+    handler = LAYOUT_HANDLERS.get(content.get("layout_type"), _render_title_and_body)
+    slide = handler(prs, content, context)
+    notes = _as_lines(content.get("speaker_notes"))
+    if notes:
+        slide.notes_slide.notes_text_frame.text = "\n".join(notes)
+    return slide
+
+
+def render_presentation(
+    slides: List[Slide],
+    file_path: str,
+    prs: Optional[Presentation] = None,
+    image_dirs: Optional[Sequence[str]] = None,
+) -> RenderResult:
+    """Render every slide into a new (or the given) presentation and save it to ``file_path``.
+
+    ``prs`` is typically a clone of a theme master from ``phase1.themes``;
+    its slide size is kept and the content blocks are laid out for it.
+    """
+    start = time.perf_counter()
+    if prs is None:
+        prs = Presentation()
+        prs.slide_width = SLIDE_WIDTH
+        prs.slide_height = SLIDE_HEIGHT
+
+    if image_dirs is None:
+        image_dirs = allowed_image_dirs()
+    result = RenderResult(file_path=file_path)
+    for slide in slides:
+        slide_start = time.perf_counter()
+        render_slide(prs, renderable_content(slide), image_dirs)
+        result.slide_timings.append(time.perf_counter() - slide_start)
+
+    prs.save(file_path)
+    result.total_seconds = time.perf_counter() - start
+    logger.info(
+        "Rendered %d slides to %s in %.3fs", result.number_of_slides, file_path, result.total_seconds
+    )
+    return result
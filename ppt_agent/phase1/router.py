@@ -0,0 +1,82 @@
+"""
+Rule-based fast path for ``user_task_manager_node``.
+
+Short, unambiguous requests ("download the ppt", "build the slides") do not
+need the 8KB routing prompt. ``classify_intent`` matches the latest user
+message against a compiled keyword table and returns the agent with a
+confidence score; the node only skips the LLM when the confidence reaches
+``Configuration.fast_route_threshold``.
+
+Planning requests are never fast-routed: the planner needs the
+``cleaned_requirement`` the LLM router writes.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+# (agent, pattern) in the routing prompt's priority order
+INTENT_PATTERNS = [
+    (
+        "pptx_coder",
+        re.compile(
+            r"\b(download|export|save)\b|\bgive me the (file|ppt|pptx|deck|presentation)\b"
+            r"|\bget the (file|ppt|pptx|deck)\b|\bfinal version\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "slide_builder",
+        re.compile(
+            r"\b(build|generate|create|make)\s+(the\s+|all\s+the\s+)?slides\b"
+            r"|\bturn (this|it) into slides\b|\bbuild the (presentation|deck)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "ppt_refiner",
+        re.compile(
+            r"\b(change|modify|update|edit|remove|delete|fix|rename|shorten|reword)\b"
+            r".*\bslide\s*(#\s*)?\d+\b"
+            r"|\bslide\s*(#\s*)?\d+\b.*\b(change|modify|update|edit|remove|delete|fix|rename|shorten|reword)\b",
+            re.IGNORECASE,
+        ),
+    ),
+]
+
+# words that signal new content or restructuring, which belongs to the planner
+PLANNING_PATTERN = re.compile(
+    r"\b(add|include|more slides|new slides?|restructure|reorganize|expand|about)\b",
+    re.IGNORECASE,
+)
+
+# messages longer than this are left to the LLM even when a keyword matches
+MAX_FAST_ROUTE_WORDS = 12
+
+
+class RouteDecision(NamedTuple):
+    agent: Optional[str]
+    confidence: float
+
+
+def classify_intent(requirement: str, has_slides: bool) -> RouteDecision:
+    """Guess the agent for ``requirement`` with a confidence in [0, 1].
+
+    Returns ``RouteDecision(None, 0.0)`` when no rule matches.
+    """
+    matches = [agent for agent, pattern in INTENT_PATTERNS if pattern.search(requirement)]
+    if not matches:
+        return RouteDecision(None, 0.0)
+
+    agent = matches[0]
+    confidence = 0.95
+    if len(matches) > 1:
+        # several intents in one message: prefer the first but let the LLM decide
+        confidence -= 0.3
+    if PLANNING_PATTERN.search(requirement):
+        confidence -= 0.4
+    if len(requirement.split()) > MAX_FAST_ROUTE_WORDS:
+        confidence -= 0.3
+    if not has_slides and agent in ("slide_builder", "ppt_refiner"):
+        # nothing to build or refine yet, the router will likely plan first
+        confidence -= 0.5
+    return RouteDecision(agent, max(confidence, 0.0))
@@ -0,0 +1,258 @@
+"""
+Warm pool of worker processes that run LLM-written python-pptx code.
+
+``pptx_renderer="llm"`` used to ``exec`` the generated script inside the
+graph process: every run paid for importing python-pptx, objects leaked into
+the long-lived server and a script stuck in a loop hung it. ``PptxWorkerPool``
+keeps ``workers`` processes started in advance with python-pptx imported.
+A job is handed to an idle worker, which runs the code in a fresh namespace
+with stdout/stderr captured and reports back; the parent enforces the
+wall-clock limit, the worker its address-space limit (``RLIMIT_AS``, POSIX
+only).
+
+A worker is replaced ("recycled") after a timeout, a crash, a MemoryError or
+``max_jobs_per_worker`` jobs. Queue wait, execution time, jobs, failures and
+recycles (per reason) are recorded in ``phase1.metrics`` under
+``pptx_sandbox.*``.
+"""
+
+import atexit
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from phase1.config import load_yaml_config
+from phase1.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# shared pool, started on the first LLM-rendered deck
+_pool = None
+_pool_lock = threading.Lock()
+
+# names the generated scripts expect to be imported already (see prompts/pptx_coder.md)
+PRELOADED_IMPORTS = """
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pptx.enum.text import PP_ALIGN, MSO_VERTICAL_ANCHOR
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+"""
+
+
+@dataclass
+class SandboxResult:
+    """Outcome of one job: the file it wrote (when it exists), its output and timings."""
+
+    ok: bool
+    output_file: Optional[str] = None
+    stdout: str = ""
+    stderr: str = ""
+    error: Optional[str] = None
+    queue_wait_seconds: float = 0.0
+    exec_seconds: float = 0.0
+
+
+def _limit_memory(memory_limit_mb: Optional[int]) -> None:
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        # Windows: no rlimits, only the wall-clock limit applies
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(conn, memory_limit_mb: Optional[int]) -> None:
+    """Worker loop: import python-pptx once, then run jobs until told to stop."""
+    if os.name == "nt":
+        try:
+            import pythoncom
+
+            pythoncom.CoInitialize()
+        except ImportError:
+            pass
+    preloaded: Dict[str, Any] = {}
+    exec(PRELOADED_IMPORTS, preloaded)
+    _limit_memory(memory_limit_mb)
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        code, output_file = job
+        stdout, stderr = io.StringIO(), io.StringIO()
+        error, out_of_memory = None, False
+        start = time.perf_counter()
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                exec(code, {**preloaded, "__name__": "__main__"})
+        except MemoryError:
+            error, out_of_memory = "MemoryError: the script exceeded the memory limit", True
+        except BaseException:
+            error = traceback.format_exc()
+        conn.send({
+            "error": error,
+            "out_of_memory": out_of_memory,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "exec_seconds": time.perf_counter() - start,
+            "output_file": output_file if output_file and os.path.exists(output_file) else None,
+        })
+
+
+class _Worker:
+    def __init__(self, context, memory_limit_mb: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit_mb), daemon=True, name="pptx-sandbox"
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.ready = False
+
+    def wait_ready(self, timeout: float) -> None:
+        if self.ready:
+            return
+        if not self.conn.poll(timeout):
+            raise TimeoutError("pptx sandbox worker did not start in time")
+        self.conn.recv()
+        self.ready = True
+
+    def stop(self, kill: bool = False) -> None:
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class PptxWorkerPool:
+    """Pre-started python-pptx worker processes with per-job time and memory limits."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout_seconds: float = 120.0,
+        memory_limit_mb: Optional[int] = 1024,
+        max_jobs_per_worker: int = 20,
+        start_timeout_seconds: float = 60.0,
+    ):
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.start_timeout_seconds = start_timeout_seconds
+        # spawn, not fork: the graph process runs threads
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(workers):
+            self._add_worker()
+
+    def _add_worker(self) -> None:
+        worker = _Worker(self._context, self.memory_limit_mb)
+        with self._lock:
+            self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _recycle(self, worker: _Worker, reason: str, kill: bool = False) -> None:
+        metrics.incr(f"pptx_sandbox.recycles.{reason}")
+        logger.info("Recycling pptx sandbox worker %s (%s)", worker.process.pid, reason)
+        with self._lock:
+            self._workers.remove(worker)
+        worker.stop(kill=kill)
+        if not self._closed:
+            self._add_worker()
+
+    def run(self, code: str, output_file: Optional[str] = None) -> SandboxResult:
+        """Run ``code`` in a worker and return its output.
+
+        ``output_file`` is the path the script is expected to write; it is
+        returned in the result when the file exists afterwards.
+        """
+        start = time.perf_counter()
+        worker = self._idle.get()
+        queue_wait = time.perf_counter() - start
+        metrics.observe("pptx_sandbox.queue_wait_seconds", queue_wait)
+        metrics.incr("pptx_sandbox.jobs")
+
+        try:
+            worker.wait_ready(self.start_timeout_seconds)
+            worker.conn.send((code, output_file))
+            if not worker.conn.poll(self.timeout_seconds):
+                self._recycle(worker, "timeout", kill=True)
+                return self._failed(f"Timed out after {self.timeout_seconds}s", queue_wait)
+            reply = worker.conn.recv()
+        except (EOFError, OSError, TimeoutError) as e:
+            self._recycle(worker, "crash", kill=True)
+            return self._failed(f"Sandbox worker died: {e!r}", queue_wait)
+
+        worker.jobs += 1
+        metrics.observe("pptx_sandbox.exec_seconds", reply["exec_seconds"])
+        if reply["out_of_memory"]:
+            self._recycle(worker, "memory")
+        elif worker.jobs >= self.max_jobs_per_worker:
+            self._recycle(worker, "max_jobs")
+        else:
+            self._idle.put(worker)
+        if reply["error"]:
+            metrics.incr("pptx_sandbox.failures")
+        return SandboxResult(
+            ok=reply["error"] is None,
+            output_file=reply["output_file"],
+            stdout=reply["stdout"],
+            stderr=reply["stderr"],
+            error=reply["error"],
+            queue_wait_seconds=queue_wait,
+            exec_seconds=reply["exec_seconds"],
+        )
+
+    def _failed(self, error: str, queue_wait: float) -> SandboxResult:
+        metrics.incr("pptx_sandbox.failures")
+        return SandboxResult(ok=False, error=error, queue_wait_seconds=queue_wait)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": len(self._workers), "idle": self._idle.qsize()}
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+
+def get_pptx_pool() -> PptxWorkerPool:
+    """Return the shared pool configured by the PPTX_SANDBOX section of conf.yaml."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                conf = load_yaml_config(str(Path(__file__).parent / "conf.yaml")).get("PPTX_SANDBOX") or {}
+                _pool = PptxWorkerPool(**conf)
+                atexit.register(_pool.close)
+    return _pool
@@ -17,6 +17,8 @@ class Slide(TypedDict):
     message_here: str           # Specific message for this slide
     layout_description: str
     slide_content : dict     # Manual layout instructions
+    slide_build_error: Optional[str]  # Set when the last slide build for this slide failed
+    slide_content_hash: str     # Hash of the input fields slide_content was built from
 
 class PPTState(MessagesState):
     """LangGraph compatible PPT state - User's simplified design"""
@@ -29,6 +31,10 @@ class PPTState(MessagesState):
     slides: List[Slide]
     latest_response : str
     missing_information: str
+    requirement_summary: str     # Running summary of requirements older than the router's window
+    summarized_requirements: int # Number of requirements already folded into requirement_summary
+    slides_rebuilt: int          # Slides sent to the slide builder on the last build
+    slides_reused: int           # Slides whose slide_content was still up to date
 
 # === HELPER FUNCTIONS FOR STATE MANAGEMENT ===
 
@@ -68,6 +74,19 @@ def create_slide(
         layout_description=layout_description
     )
 
+def create_slide_from_dict(slide_data: dict) -> Slide:
+    """Helper to create a Slide from an LLM-produced slide dictionary"""
+    return create_slide(
+        key_message_part=slide_data.get("key_message_part", ""),
+        title=slide_data.get("title", ""),
+        content=slide_data.get("content", ""),
+        image=slide_data.get("image"),
+        message_here=slide_data.get("message_here", ""),
+        layout_description=slide_data.get(
+            "layout_description", "Standard content layout"
+        ),
+    )
+
 def add_slide_to_state(state: PPTState, slide: Slide) -> PPTState:
     """Add a slide to the PPT state"""
     new_slides = state["slides"].copy()
@@ -85,6 +104,82 @@ def update_slide_count(state: PPTState) -> PPTState:
         "number_of_slides": len(state["slides"])
     }
 
+# === SLIDE PATCHES (used by the ppt refiner) ===
+
+# Slide fields a refiner patch may replace
+PATCHABLE_SLIDE_FIELDS = (
+    "key_message_part",
+    "title",
+    "content",
+    "image",
+    "message_here",
+    "layout_description",
+)
+
+def _check_slide_number(op: dict, key: str, number_of_slides: int, allow_zero: bool = False) -> int:
+    number = op.get(key)
+    lowest = 0 if allow_zero else 1
+    if not isinstance(number, int) or isinstance(number, bool) or not lowest <= number <= number_of_slides:
+        raise ValueError(
+            f"Invalid '{key}' in {op!r}: expected a slide number between {lowest} and {number_of_slides}"
+        )
+    return number
+
+def validate_slide_patch(operations: list, number_of_slides: int) -> None:
+    """Check a list of refiner edit operations against a deck of ``number_of_slides``.
+
+    Operations use 1-based slide numbers and are validated in order, each one
+    against the deck as left by the previous ones. Raises ValueError on the
+    first invalid operation.
+    """
+    if not isinstance(operations, list):
+        raise ValueError("Slide patch must be a list of operations")
+    for op in operations:
+        if not isinstance(op, dict):
+            raise ValueError(f"Invalid operation {op!r}: expected an object")
+        kind = op.get("op")
+        if kind == "replace":
+            _check_slide_number(op, "slide", number_of_slides)
+            if op.get("field") not in PATCHABLE_SLIDE_FIELDS:
+                raise ValueError(f"Invalid 'field' in {op!r}: expected one of {PATCHABLE_SLIDE_FIELDS}")
+            if "value" not in op:
+                raise ValueError(f"Missing 'value' in {op!r}")
+        elif kind == "insert":
+            _check_slide_number(op, "after", number_of_slides, allow_zero=True)
+            if not isinstance(op.get("value"), dict):
+                raise ValueError(f"Invalid 'value' in {op!r}: expected a slide object")
+            number_of_slides += 1
+        elif kind == "delete":
+            _check_slide_number(op, "slide", number_of_slides)
+            number_of_slides -= 1
+        elif kind == "move":
+            _check_slide_number(op, "slide", number_of_slides)
+            _check_slide_number(op, "to", number_of_slides)
+        else:
+            raise ValueError(f"Unknown operation {kind!r} in {op!r}")
+
+def apply_slide_patch(slides: List[Slide], operations: list) -> List[Slide]:
+    """Return a new slide list with ``operations`` applied.
+
+    The patch is validated first, so either every operation is applied or a
+    ValueError is raised and nothing changes. Only the touched slides are
+    copied; untouched slides are carried over as-is.
+    """
+    validate_slide_patch(operations, len(slides))
+    new_slides = list(slides)
+    for op in operations:
+        kind = op["op"]
+        if kind == "replace":
+            index = op["slide"] - 1
+            new_slides[index] = {**new_slides[index], op["field"]: op["value"]}
+        elif kind == "insert":
+            new_slides.insert(op["after"], create_slide_from_dict(op["value"]))
+        elif kind == "delete":
+            del new_slides[op["slide"] - 1]
+        elif kind == "move":
+            new_slides.insert(op["to"] - 1, new_slides.pop(op["slide"] - 1))
+    return new_slides
+
 # === USAGE EXAMPLES ===
 
 def example_ppt_state() -> PPTState:
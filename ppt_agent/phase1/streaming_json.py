@@ -0,0 +1,96 @@
+"""
+Incremental parser for streamed LLM JSON.
+
+``parse_llm_json`` only works once the whole response has arrived. The
+planner's answer is a large object whose ``slides`` and ``key_messages``
+arrays are what downstream nodes need, one element at a time.
+``StreamingArrayParser`` is fed the response chunk by chunk and returns
+each object element of the watched top-level arrays as soon as its closing
+brace arrives, so slide 1 can be built while the planner is still writing
+slide 10.
+"""
+
+import json
+import logging
+from typing import Any, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingArrayParser:
+    """Emit completed object elements of top-level arrays while JSON text streams in.
+
+    Text before the first ``{`` (such as a ```json fence) is ignored. Only
+    elements that are JSON objects are emitted; the full response should still
+    be parsed at the end, this parser only lets work start early.
+
+    Example:
+        parser = StreamingArrayParser(("slides", "key_messages"))
+        for chunk in stream:
+            for key, element in parser.feed(chunk.content):
+                ...
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = set(keys)
+        self._position = 0  # number of characters already scanned
+        self._text = ""
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key = None  # last string closed directly inside the top-level object
+        self._array_key = None  # key of the watched array currently open, if any
+        self._element_start = None
+        self.emitted = {key: 0 for key in self.keys}
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Consume ``text`` and return the ``(key, element)`` pairs completed by it."""
+        if not text:
+            return []
+        self._text += text
+        completed = []
+        text_ = self._text
+        for index in range(self._position, len(text_)):
+            char = text_[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = text_[self._string_start + 1 : index]
+                continue
+
+            if char == '"':
+                if self._stack:
+                    self._in_string = True
+                    self._string_start = index
+            elif char in "{[":
+                if char == "[" and len(self._stack) == 1 and self._last_key in self.keys:
+                    self._array_key = self._last_key
+                elif char == "{" and len(self._stack) == 2 and self._array_key is not None:
+                    self._element_start = index
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if char == "}" and len(self._stack) == 2 and self._element_start is not None:
+                    element = self._decode(text_[self._element_start : index + 1])
+                    if element is not None:
+                        completed.append((self._array_key, element))
+                        self.emitted[self._array_key] += 1
+                    self._element_start = None
+                elif char == "]" and len(self._stack) == 1:
+                    self._array_key = None
+        self._position = len(text_)
+        return completed
+
+    @staticmethod
+    def _decode(raw: str):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning("Could not decode streamed element: %s", raw[:200])
+            return None
@@ -3,8 +3,15 @@ import streamlit as st
 from dotenv import load_dotenv
 from phase1.builder import build_graph
 import os
+import time
 import traceback
 from langgraph.types import Command, interrupt
+from phase1.metrics import metrics
+from phase1.context_cache import context_cache_stats
+from phase1.structured import structured_output_stats
+
+# nodes whose LLM tokens are streamed into the UI
+STREAMED_NODES = ("ppt_planner_node", "ppt_refiner_node")
 
 load_dotenv()
 st.set_page_config(layout="wide")
@@ -91,18 +98,47 @@ if "__interrupt__" in st.session_state.result:
                 prompt_text = prompt.text if hasattr(prompt, 'text') else str(prompt)
                 st.sidebar.info(f"🔄 Processing: {prompt_text}")
                 
-                # Add loading spinner and progress tracking
-                with st.spinner("Processing your request..."):
-                    st.sidebar.write("⏳ Invoking workflow...")
-                    
-                    # Resume workflow with comprehensive error handling
-                    new_result = workflow.invoke(
-                        Command(resume=prompt_text), 
-                        config=config
-                    )
-                    
-                    st.session_state.result = new_result
-                    st.sidebar.success("✅ Request processed successfully")
+                # Stream the workflow so planner tokens and built slides show up as they arrive
+                st.sidebar.write("⏳ Streaming workflow...")
+                streamed_text = ""
+                token_placeholder = key_messages_tab.empty()
+                interrupt_payload = None
+                started_at = time.perf_counter()
+                first_token_at = first_slide_at = None
+
+                for mode, payload in workflow.stream(
+                    Command(resume=prompt_text),
+                    config=config,
+                    stream_mode=["messages", "updates", "custom"],
+                ):
+                    if mode == "messages":
+                        chunk, metadata = payload
+                        if metadata.get("langgraph_node") in STREAMED_NODES and chunk.content:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                            streamed_text += str(chunk.content)
+                            token_placeholder.code(streamed_text)
+                    elif mode == "custom" and payload.get("event") == "slide_built":
+                        if first_slide_at is None:
+                            first_slide_at = time.perf_counter()
+                        slides_tab.write(f"Slide {payload['slide_number']} built")
+                        slides_tab.json(payload["slide_content"] or {"error": payload["error"]})
+                    elif mode == "updates" and "__interrupt__" in payload:
+                        interrupt_payload = payload["__interrupt__"]
+
+                new_result = dict(workflow.get_state(config).values)
+                if interrupt_payload is not None:
+                    new_result["__interrupt__"] = interrupt_payload
+                token_placeholder.empty()
+
+                if first_token_at is not None:
+                    metrics.observe("ui.time_to_first_token_seconds", first_token_at - started_at)
+                if first_slide_at is not None:
+                    metrics.observe("ui.time_to_first_slide_seconds", first_slide_at - started_at)
+                metrics.observe("ui.turn_seconds", time.perf_counter() - started_at)
+
+                st.session_state.result = new_result
+                st.sidebar.success("✅ Request processed successfully")
                 
                 # Display results with comprehensive error handling
                 try:
@@ -151,6 +187,11 @@ if "__interrupt__" in st.session_state.result:
                         others_tab.write(f"Current slide: {st.session_state.result.get('current_slide_index', 0)}")
                         others_tab.write(f"Total slides: {st.session_state.result.get('total_slides_to_process', 0)}")
                         others_tab.write(f"Progress: {st.session_state.result.get('slide_building_progress', 'N/A')}")
+
+                    if "slides_rebuilt" in st.session_state.result:
+                        others_tab.write("**Last Slide Build:**")
+                        others_tab.write(f"Rebuilt: {st.session_state.result['slides_rebuilt']}")
+                        others_tab.write(f"Reused: {st.session_state.result.get('slides_reused', 0)}")
                     
                 except Exception as e:
                     st.error(f"❌ Error displaying results: {e}")
@@ -181,6 +222,16 @@ with st.expander("🔍 Detailed Debug Information"):
     st.write("Result Type:", type(st.session_state.result))
     st.write("Result Content:", st.session_state.result)
     
+    st.write("### Latency Metrics")
+    snapshot = metrics.snapshot()
+    st.write(snapshot)
+
+    st.write("### Structured Output")
+    st.write(structured_output_stats(snapshot["counters"]))
+
+    st.write("### Context Cache")
+    st.write(context_cache_stats(snapshot["counters"]))
+    
     st.write("### Environment Info")
     st.write("Python Version:", os.sys.version)
     st.write("Working Directory:", os.getcwd())
@@ -0,0 +1,155 @@
+"""
+Per-node output schemas and validation for LLM JSON replies.
+
+Nodes ask the model for JSON (``JSON_OUTPUT_KWARGS`` switches Gemini to its
+JSON response mode) and validate the reply against the schema of their agent
+in ``NODE_SCHEMAS``. The schemas are built from ``KeyMessage``/``Slide`` in
+``phase1.state`` and compiled once into pydantic ``TypeAdapter`` validators.
+
+When a reply does not validate, ``repair_input`` builds a short follow-up
+(schema, error and the broken reply, without the original prompt) for the
+``json_repair`` agent.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Union, get_type_hints
+
+from pydantic import ConfigDict, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+from phase1.projection import SLIDE_INPUT_FIELDS, to_json
+from phase1.state import KeyMessage, Slide
+
+# generation kwargs for a JSON-only answer, passed through every model wrapper
+JSON_OUTPUT_KWARGS = {"response_mime_type": "application/json"}
+
+# LLM replies may carry keys the nodes do not use yet: keep them
+_ALLOW_EXTRA = ConfigDict(extra="allow")
+
+
+class StructuredOutputError(ValueError):
+    """An LLM reply that is not valid JSON for its agent's schema."""
+
+
+def _derive(name: str, source: type, fields: tuple, total: bool = True, **extra_fields: type) -> type:
+    """TypedDict with the given fields (and annotations) of a ``phase1.state`` TypedDict."""
+    hints = {**get_type_hints(source), **extra_fields}
+    schema = TypedDict(name, {field: hints[field] for field in fields if field in hints}, total=total)
+    schema.__pydantic_config__ = _ALLOW_EXTRA
+    return schema
+
+
+KeyMessageSchema = _derive("KeyMessageSchema", KeyMessage, tuple(get_type_hints(KeyMessage)))
+
+# the planner writes ``key_message_part``, which create_slide stores on the Slide
+PlannedSlideSchema = _derive(
+    "PlannedSlideSchema", Slide, SLIDE_INPUT_FIELDS, total=False, key_message_part=str
+)
+
+
+class InitiatorOutput(TypedDict):
+    __pydantic_config__ = _ALLOW_EXTRA
+    file_name: str
+    title_of_ppt: str
+    requirement_cleaned: str
+
+
+class RouterOutput(TypedDict):
+    __pydantic_config__ = _ALLOW_EXTRA
+    status: str
+    agent: NotRequired[str]
+    cleaned_requirement: NotRequired[str]
+    context: NotRequired[str]
+    details: NotRequired[str]
+
+
+class PlannerOutput(TypedDict):
+    __pydantic_config__ = _ALLOW_EXTRA
+    file_name: NotRequired[str]
+    ppt_title: NotRequired[str]
+    number_of_slides: NotRequired[int]
+    key_messages: List[KeyMessageSchema]
+    slides: List[PlannedSlideSchema]
+    missing_information: NotRequired[Optional[str]]
+
+
+class RefinerOutput(TypedDict):
+    __pydantic_config__ = _ALLOW_EXTRA
+    operations: NotRequired[List[Dict[str, Any]]]
+    slides: NotRequired[List[PlannedSlideSchema]]
+
+
+class SlideBuilderOutput(TypedDict):
+    __pydantic_config__ = _ALLOW_EXTRA
+    layout_type: str
+    title: NotRequired[str]
+    content_blocks: List[Dict[str, Any]]
+    speaker_notes: NotRequired[Union[str, List[str]]]
+
+
+NODE_SCHEMAS: Dict[str, TypeAdapter] = {
+    "ppt_initiator": TypeAdapter(InitiatorOutput),
+    "user_task_manager": TypeAdapter(RouterOutput),
+    "ppt_planner": TypeAdapter(PlannerOutput),
+    "ppt_refiner": TypeAdapter(RefinerOutput),
+    "slide_builder": TypeAdapter(SlideBuilderOutput),
+}
+
+_json_schemas: Dict[str, Dict[str, Any]] = {}
+
+
+def parse_json_text(text: str) -> Any:
+    """Decode a JSON reply, tolerating markdown code fences around it."""
+    return json.loads(re.sub(r"```json\n?|```\n?", "", text).strip())
+
+
+def validate_output(agent_name: str, text: str) -> Dict[str, Any]:
+    """Parse ``text`` and validate it against ``agent_name``'s schema.
+
+    Raises StructuredOutputError describing what is wrong.
+    """
+    try:
+        value = parse_json_text(text)
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"invalid JSON: {e}") from e
+    try:
+        return NODE_SCHEMAS[agent_name].validate_python(value)
+    except ValidationError as e:
+        raise StructuredOutputError(str(e)) from e
+
+
+def json_schema(agent_name: str) -> Dict[str, Any]:
+    """JSON schema of ``agent_name``'s output (cached)."""
+    schema = _json_schemas.get(agent_name)
+    if schema is None:
+        schema = _json_schemas[agent_name] = NODE_SCHEMAS[agent_name].json_schema()
+    return schema
+
+
+def repair_input(agent_name: str, text: str, error: StructuredOutputError) -> str:
+    """Human message for the ``json_repair`` agent."""
+    return to_json({
+        "schema": json_schema(agent_name),
+        "error": str(error)[:2000],
+        "invalid_output": text,
+    })
+
+
+def structured_output_stats(counters: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """Per-agent parse-failure and repair rates from ``metrics.snapshot()["counters"]``."""
+    stats = {}
+    for agent_name in NODE_SCHEMAS:
+        calls = counters.get(f"structured.calls.{agent_name}", 0)
+        if not calls:
+            continue
+        failures = counters.get(f"structured.parse_failures.{agent_name}", 0)
+        repairs = counters.get(f"structured.repairs.{agent_name}", 0)
+        stats[agent_name] = {
+            "calls": calls,
+            "parse_failures": failures,
+            "repairs": repairs,
+            "parse_failure_rate": failures / calls,
+            "repair_success_rate": repairs / failures if failures else None,
+        }
+    return stats
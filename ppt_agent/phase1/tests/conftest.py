@@ -0,0 +1,232 @@
+"""
+Shared fixtures: a scripted offline LLM and helpers to drive the graph.
+
+``scripted_llm`` seeds ``get_llm_by_type`` with a ``ReplayChatModel`` whose
+answers come from ``ScriptedLLM.answers`` (agent name -> text, or callable
+taking the request messages), so the graph runs without a provider.
+"""
+
+import asyncio
+import json
+import os
+import time
+import zipfile
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+from PIL import Image
+from pptx import Presentation
+
+from phase1 import builder, deck_cache, llm
+from phase1.benchmarks.end_to_end import PERSISTENT_CACHES
+from phase1.builder import build_graph
+from phase1.config import load_yaml_config
+from phase1.config.agents import AGENT_LLM_MAP
+from phase1.llm_replay import LatencyModel, RecordingStore, ReplayChatModel
+from phase1.metrics import metrics
+from phase1.prompts.template import get_prompt_template
+from phase1.router import classify_intent
+
+PROMPTED_AGENTS = (
+    "ppt_initiator",
+    "ppt_planner",
+    "ppt_refiner",
+    "pptx_coder",
+    "slide_builder",
+    "user_task_manager",
+    "requirement_summarizer",
+    "json_repair",
+)
+
+
+def plan(number_of_slides: int) -> dict:
+    """Planner answer with ``number_of_slides`` plain slides."""
+    return {
+        "ppt_title": "Test deck",
+        "number_of_slides": number_of_slides,
+        "key_messages": [{"message": "The main finding", "milestone_slide_number": 1}],
+        "slides": [
+            {
+                "title": f"Slide {number}",
+                "content": f"First point of slide {number}\nSecond point of slide {number}",
+                "key_message_part": "1",
+            }
+            for number in range(1, number_of_slides + 1)
+        ],
+    }
+
+
+def routed(messages) -> str:
+    """Task manager answer: the agent the routing rules pick for the latest requirement."""
+    requirement = (json.loads(messages[-1].content).get("user_requirment") or [""])[-1]
+    return json.dumps({
+        "status": "call_agent",
+        "agent": classify_intent(requirement, True).agent or "ppt_planner",
+        "cleaned_requirement": requirement,
+        "context": "scripted",
+    })
+
+
+def built_slide(messages) -> str:
+    """Slide builder answer echoing the title of the slide it was asked to build."""
+    slide = json.loads(messages[-1].content)
+    return json.dumps({
+        "layout_type": "title-and-bullets",
+        "title": slide.get("title", ""),
+        "content_blocks": [{"type": "text", "text": ["First point", "Second point"]}],
+        "speaker_notes": ["Walk through the points."],
+    })
+
+
+class ScriptedLLM:
+    """Canned answers per agent, recognised by the system prompt of the request."""
+
+    def __init__(self, output_dir: str, number_of_slides: int = 3):
+        self.calls = []  # agent of every request, in order
+        self.answers = {
+            "ppt_initiator": json.dumps({
+                "file_name": os.path.join(output_dir, "deck.pptx"),
+                "title_of_ppt": "Test deck",
+                "requirement_cleaned": "A short test deck",
+            }),
+            "ppt_planner": json.dumps(plan(number_of_slides)),
+            "ppt_refiner": json.dumps({"operations": [{"op": "replace", "slide": 2, "field": "title", "value": "Short"}]}),
+            "slide_builder": built_slide,
+            "user_task_manager": routed,
+            "requirement_summarizer": "The user wants a short test deck.",
+        }
+        self._agents = {get_prompt_template(agent): agent for agent in PROMPTED_AGENTS}
+        self.model = ReplayChatModel(
+            store=RecordingStore(os.path.join(output_dir, "recordings.jsonl")),
+            latency=LatencyModel(0.0, 0.0, "none", 0.0),
+            fallback=self._answer,
+        )
+
+    def _answer(self, messages) -> str:
+        agent = self._agents.get(messages[0].content)
+        self.calls.append(agent)
+        if agent not in self.answers:
+            raise AssertionError(f"Unexpected request to {agent or 'an unknown agent'}")
+        answer = self.answers[agent]
+        return answer(messages) if callable(answer) else answer
+
+    def count(self, agent: str) -> int:
+        return self.calls.count(agent)
+
+
+class CountingModel:
+    """Minimal chat model: answers ``reply`` (text, or callable taking the messages) after ``delay`` seconds."""
+
+    def __init__(self, reply="answer", delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+
+    def _content(self, messages) -> str:
+        self.calls += 1
+        return self.reply(messages) if callable(self.reply) else self.reply
+
+    def invoke(self, messages, config=None, **kwargs):
+        time.sleep(self.delay)
+        return AIMessage(content=self._content(messages))
+
+    def stream(self, messages, config=None, **kwargs):
+        time.sleep(self.delay)
+        content = self._content(messages)
+        for start in range(0, len(content), 4):
+            yield AIMessageChunk(content=content[start:start + 4])
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        return AIMessage(content=self._content(messages))
+
+    async def astream(self, messages, config=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        content = self._content(messages)
+        for start in range(0, len(content), 4):
+            yield AIMessageChunk(content=content[start:start + 4])
+
+
+def deck_texts(path: str) -> list:
+    """Text of every shape, slide by slide, of the deck at ``path``."""
+    return [
+        [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+        for slide in Presentation(path).slides
+    ]
+
+
+def deck_parts(path: str) -> dict:
+    """Slide, notes and media parts of the deck at ``path``, by part name."""
+    with zipfile.ZipFile(path) as package:
+        return {
+            name: package.read(name)
+            for name in package.namelist()
+            if name.startswith(("ppt/slides/", "ppt/notesSlides/", "ppt/media/"))
+        }
+
+
+def deck_titles(path: str) -> list:
+    return [slide.shapes.title.text if slide.shapes.title is not None else None for slide in Presentation(path).slides]
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Keep the persistent caches of conf.yaml under ``tmp_path``, rebuilt for every test."""
+    conf = load_yaml_config(llm._conf_path())
+    for section, name in PERSISTENT_CACHES.items():
+        monkeypatch.setitem(conf, section, {**(conf.get(section) or {}), "path": str(tmp_path / "cache" / name)})
+    monkeypatch.setattr(llm, "_response_cache", None)
+    monkeypatch.setattr(deck_cache, "_deck_cache", None)
+    monkeypatch.setattr(builder, "_checkpointer", None)
+
+
+@pytest.fixture
+def override_conf(monkeypatch):
+    """Change conf.yaml sections for one test: ``override_conf("LLM_CACHE", enabled=False)``."""
+    conf = load_yaml_config(llm._conf_path())
+
+    def override(section: str, **values):
+        monkeypatch.setitem(conf, section, {**(conf.get(section) or {}), **values})
+
+    return override
+
+
+@pytest.fixture
+def images(tmp_path, override_conf) -> list:
+    """Two small pictures for image blocks, in a directory the renderer embeds pictures from."""
+    override_conf("RENDERER", image_dirs=[str(tmp_path)])
+    paths = []
+    for color in ("red", "blue"):
+        paths.append(str(tmp_path / f"{color}.png"))
+        Image.new("RGB", (40, 30), color).save(paths[-1])
+    return paths
+
+
+@pytest.fixture
+def scripted_llm(tmp_path, monkeypatch) -> ScriptedLLM:
+    scripted = ScriptedLLM(str(tmp_path))
+    for llm_type in set(AGENT_LLM_MAP.values()):
+        monkeypatch.setitem(llm._llm_cache, llm_type, scripted.model)
+    return scripted
+
+
+@pytest.fixture
+def workflow(scripted_llm):
+    return build_graph(graph_checkpointer=MemorySaver())
+
+
+def run_turns(workflow, turns, thread_id: str = "test", **configurable):
+    """Start a session and answer the user input interrupt with each of ``turns``; returns the state."""
+    config = {"configurable": {"thread_id": thread_id, **configurable}}
+    workflow.invoke({"input": "start"}, config=config)
+    for turn in turns:
+        workflow.invoke(Command(resume=turn), config=config)
+    return workflow.get_state(config).values
@@ -0,0 +1,50 @@
+import asyncio
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from phase1.builder import build_graph
+from phase1.tests.conftest import built_slide, deck_titles, run_turns
+
+TURNS = [
+    "Make a presentation about water scarcity",
+    "build the slides",
+    "shorten the title of slide 2",
+    "build the slides",
+    "download the ppt",
+]
+COMPARED_FIELDS = ("file_name", "ppt_title", "key_messages", "slides", "slides_rebuilt", "slides_reused")
+
+
+async def arun_turns(workflow, turns, thread_id="test", **configurable):
+    config = {"configurable": {"thread_id": thread_id, **configurable}}
+    await workflow.ainvoke({"input": "start"}, config=config)
+    for turn in turns:
+        await workflow.ainvoke(Command(resume=turn), config=config)
+    return (await workflow.aget_state(config)).values
+
+
+def test_async_graph_matches_the_sync_graph(workflow, scripted_llm):
+    expected = run_turns(workflow, TURNS)
+    sync_calls = list(scripted_llm.calls)
+    scripted_llm.calls.clear()
+
+    state = asyncio.run(arun_turns(build_graph(use_async=True, graph_checkpointer=MemorySaver()), TURNS))
+
+    assert {field: state[field] for field in COMPARED_FIELDS} == {field: expected[field] for field in COMPARED_FIELDS}
+    assert sorted(scripted_llm.calls) == sorted(sync_calls)
+    assert deck_titles(state["file_name"]) == ["Slide 1", "Short", "Slide 3"]
+
+
+def test_async_slide_builder_records_failed_slides(scripted_llm):
+    def build(messages):
+        if "Slide 3" in messages[-1].content:
+            raise RuntimeError("provider error")
+        return built_slide(messages)
+
+    scripted_llm.answers["slide_builder"] = build
+    workflow = build_graph(use_async=True, graph_checkpointer=MemorySaver())
+
+    state = asyncio.run(arun_turns(workflow, TURNS[:2], slide_builder_concurrency=2))
+
+    assert [slide.get("slide_build_error") for slide in state["slides"]] == [None, None, "RuntimeError: provider error"]
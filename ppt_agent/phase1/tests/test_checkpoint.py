@@ -0,0 +1,89 @@
+import asyncio
+
+from langgraph.types import Command
+
+from phase1 import builder
+from phase1.builder import build_graph
+from phase1.checkpoint import SQLiteCheckpointSaver
+from phase1.tests.conftest import run_turns
+
+QUESTION = "Make a presentation about water scarcity"
+
+
+def rows(saver, table, thread_id=None):
+    query = f"SELECT COUNT(*) FROM {table}"
+    if thread_id is None:
+        return saver.conn.execute(query).fetchone()[0]
+    return saver.conn.execute(query + " WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+
+
+def test_sessions_survive_a_restart(tmp_path, scripted_llm):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    state = run_turns(build_graph(graph_checkpointer=SQLiteCheckpointSaver(path)), [QUESTION])
+
+    restarted = build_graph(graph_checkpointer=SQLiteCheckpointSaver(path))
+    config = {"configurable": {"thread_id": "test"}}
+    assert restarted.get_state(config).values["slides"] == state["slides"]
+
+    restarted.invoke(Command(resume="build the slides"), config=config)
+    assert all("slide_content" in slide for slide in restarted.get_state(config).values["slides"])
+
+
+def test_old_checkpoints_and_their_blobs_are_compacted(tmp_path, scripted_llm):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"), max_checkpoints_per_thread=3)
+    workflow = build_graph(graph_checkpointer=saver)
+
+    state = run_turns(workflow, [QUESTION, "build the slides", "shorten the title of slide 2"])
+
+    assert rows(saver, "checkpoints") == 3
+    # every remaining blob is referenced by a remaining checkpoint
+    assert saver.conn.execute(
+        "SELECT COUNT(*) FROM checkpoint_blobs AS blob WHERE NOT EXISTS (SELECT 1 FROM checkpoint_channels "
+        "AS used WHERE used.thread_id = blob.thread_id AND used.checkpoint_ns = blob.checkpoint_ns "
+        "AND used.channel = blob.channel AND used.version = blob.version)"
+    ).fetchone()[0] == 0
+    assert workflow.get_state({"configurable": {"thread_id": "test"}}).values == state
+
+
+def test_least_recently_used_threads_are_evicted(tmp_path, scripted_llm):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"), max_threads=2)
+    workflow = build_graph(graph_checkpointer=saver)
+
+    for thread_id in ("first", "second"):
+        run_turns(workflow, [], thread_id=thread_id)
+    # reading "first" makes "second" the least recently used thread
+    workflow.get_state({"configurable": {"thread_id": "first"}})
+    run_turns(workflow, [], thread_id="third")
+
+    assert rows(saver, "checkpoints", "second") == 0
+    assert rows(saver, "checkpoint_blobs", "second") == 0
+    assert rows(saver, "checkpoints", "first") > 0
+    assert rows(saver, "checkpoints", "third") > 0
+
+
+def test_async_graph_uses_the_same_checkpoints(tmp_path, scripted_llm):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"))
+    workflow = build_graph(use_async=True, graph_checkpointer=saver)
+    config = {"configurable": {"thread_id": "test"}}
+
+    async def session():
+        await workflow.ainvoke({"input": "start"}, config=config)
+        await workflow.ainvoke(Command(resume=QUESTION), config=config)
+        return [item async for item in saver.alist(config, limit=2)]
+
+    listed = asyncio.run(session())
+
+    assert len(listed) == 2
+    assert listed[0].checkpoint["id"] > listed[1].checkpoint["id"]
+    assert saver.get_tuple(config).checkpoint == listed[0].checkpoint
+
+
+def test_the_builder_opens_the_checkpoint_database_on_first_use(monkeypatch, override_conf, scripted_llm):
+    monkeypatch.setattr(builder, "_checkpointer", None)
+    override_conf("CHECKPOINTER", backend="memory")
+
+    build_graph(graph_checkpointer=SQLiteCheckpointSaver(":memory:"))
+    assert builder._checkpointer is None
+
+    build_graph()
+    assert builder.get_checkpointer() is builder._checkpointer is not None
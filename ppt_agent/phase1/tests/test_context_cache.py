@@ -0,0 +1,98 @@
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from phase1 import context_cache
+from phase1.context_cache import ContextCachedChatModel, ContextCacheRegistry, LocalContextCacheBackend
+from phase1.metrics import metrics
+from phase1.tests.conftest import CountingModel
+
+PROMPT = "You are a planner. " * 10
+MESSAGES = [SystemMessage(content=PROMPT), HumanMessage(content="Plan a deck")]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(context_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def backend():
+    return LocalContextCacheBackend()
+
+
+def cached_model(backend, **registry):
+    seen = []
+    model = CountingModel(lambda messages: seen.append(messages) or "answer")
+    registry = ContextCacheRegistry(backend, **{"min_tokens": 10, "ttl_seconds": 100, "refresh_margin_seconds": 10, **registry})
+    return ContextCachedChatModel(model, registry, "gemini"), seen
+
+
+def counters():
+    return metrics.snapshot()["counters"]
+
+
+def test_the_prompt_is_registered_once_and_resolved_by_the_backend(clock, backend):
+    model, seen = cached_model(backend)
+
+    model.invoke(MESSAGES)
+    "".join(chunk.content for chunk in model.stream(MESSAGES))
+
+    assert [messages[0].content for messages in seen] == [PROMPT, PROMPT]
+    assert model.registry.stats() == {"prompts": 1, "live_handles": 1}
+    assert counters()["context_cache.registrations.gemini"] == 1
+    assert counters()["context_cache.cached_tokens.gemini"] > 0
+
+
+def test_small_prompts_and_extra_system_messages_are_sent_inline(clock, backend):
+    model, _ = cached_model(backend, min_tokens=1000)
+    model.invoke(MESSAGES)
+    assert model.registry.stats()["prompts"] == 0
+
+    model, _ = cached_model(backend)
+    model.invoke(MESSAGES + [SystemMessage(content="CURRENT_TIME: now")])
+    assert model.registry.stats()["prompts"] == 0
+
+
+def test_handles_are_refreshed_before_they_expire(clock, backend):
+    model, _ = cached_model(backend)
+    first = model.registry.handle("gemini", PROMPT)
+
+    clock[0] += 85
+    assert model.registry.handle("gemini", PROMPT) == first
+    clock[0] += 10
+
+    assert model.registry.handle("gemini", PROMPT) != first
+    assert counters()["context_cache.refreshes.gemini"] == 1
+
+
+def test_a_handle_the_provider_lost_is_replaced_and_the_call_retried(clock, backend):
+    model, seen = cached_model(backend)
+    lost = model.registry.handle("gemini", PROMPT)
+    backend.delete(lost)
+
+    assert model.invoke(MESSAGES).content == "answer"
+
+    assert model.registry.handle("gemini", PROMPT) != lost
+    assert counters()["context_cache.expired_handles.gemini"] == 1
+    assert seen[0][0].content == PROMPT
+
+
+def test_failed_registrations_fall_back_to_inline_prompts_for_a_while(clock, backend, monkeypatch):
+    model, seen = cached_model(backend, retry_failed_after_seconds=60)
+    create = backend.create
+
+    def refuse(*args):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(backend, "create", refuse)
+    model.invoke(MESSAGES)
+    monkeypatch.setattr(backend, "create", create)
+    clock[0] += 30
+    assert model.registry.handle("gemini", PROMPT) is None
+    clock[0] += 31
+
+    assert model.registry.handle("gemini", PROMPT) is not None
+    assert seen[0] == MESSAGES
+    assert counters()["context_cache.registration_failures.gemini"] == 1
@@ -0,0 +1,95 @@
+import os
+
+from phase1.deck_cache import DeckCache, deck_key, get_deck_cache
+from phase1.metrics import metrics
+from phase1.projection import slide_input_hash
+from phase1.tests.conftest import deck_titles, plan, run_turns
+
+
+def age(cache, key, seconds, accessed=None):
+    """Backdate the creation (and access) time of ``key``'s deck."""
+    path = os.path.join(cache.path, f"{key}.pptx")
+    mtime = os.stat(path).st_mtime - seconds
+    os.utime(path, (accessed if accessed is not None else mtime, mtime))
+
+
+def test_decks_and_their_code_round_trip(tmp_path):
+    cache = DeckCache(str(tmp_path))
+    cache.put("a", b"deck", code="print('deck')")
+    cache.put("b", b"other deck")
+
+    assert cache.get("a").pptx == b"deck" and cache.get("a").code == "print('deck')"
+    assert cache.get("b").code is None
+    assert cache.get("c") is None
+    assert metrics.snapshot()["counters"]["deck_cache.misses"] == 1
+
+
+def test_old_decks_expire(tmp_path):
+    cache = DeckCache(str(tmp_path), max_age_seconds=60)
+    cache.put("a", b"deck")
+    age(cache, "a", 120)
+
+    assert cache.get("a") is None
+    assert not os.listdir(str(tmp_path))
+
+
+def test_least_recently_used_decks_go_first_when_full(tmp_path):
+    cache = DeckCache(str(tmp_path), max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    age(cache, "a", 0, accessed=2_000_000_000)  # a was hit after b was written
+    age(cache, "b", 0, accessed=1_000_000_000)
+
+    cache.put("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def built_state():
+    state = {**plan(2), "slides": [dict(slide) for slide in plan(2)["slides"]]}
+    for slide in state["slides"]:
+        slide["slide_content"] = {"layout_type": "title-and-bullets", "title": slide["title"]}
+        slide["slide_content_hash"] = slide_input_hash(slide)
+    return state
+
+
+def test_keys_follow_what_the_renderer_draws():
+    state = built_state()
+    key = deck_key(state, "native")
+
+    relaid = built_state()
+    relaid["slides"][0]["slide_content"]["layout_type"] = "quote"
+    assert deck_key(relaid, "native") != key
+    assert deck_key(relaid, "llm") == deck_key(state, "llm")
+    assert deck_key(state, "native", theme="corporate") != key
+    assert deck_key(state, "parallel") != key
+
+    # an edit makes the built layout stale, the deck is drawn from the plan
+    edited = built_state()
+    edited["slides"][0]["title"] = "Edited"
+    stale = built_state()
+    stale["slides"][0]["title"] = "Edited"
+    stale["slides"][0]["slide_content"]["layout_type"] = "quote"
+    assert deck_key(edited, "native") == deck_key(stale, "native") != key
+
+
+def test_the_cache_is_on_by_default_and_can_be_disabled(override_conf):
+    assert isinstance(get_deck_cache(), DeckCache)
+
+    override_conf("DECK_CACHE", enabled=False)
+    assert get_deck_cache() is None
+
+
+def test_unchanged_decks_are_written_from_the_cache(workflow, scripted_llm):
+    turns = ["Make a deck about water", "build the slides", "download the ppt"]
+
+    run_turns(workflow, turns, thread_id="first")
+    run_turns(workflow, turns, thread_id="second")
+    assert metrics.snapshot()["counters"]["deck_cache.hits"] == 1
+
+    # the refiner edit is not built into slide_content, yet it must reach the deck
+    state = run_turns(workflow, turns[:2] + ["shorten the title of slide 2"] + turns[2:], thread_id="edited")
+
+    assert metrics.snapshot()["counters"]["deck_cache.hits"] == 1
+    assert deck_titles(state["file_name"]) == ["Slide 1", "Short", "Slide 3"]
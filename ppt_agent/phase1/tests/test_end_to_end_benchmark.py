@@ -0,0 +1,57 @@
+import copy
+
+import pytest
+
+from phase1 import deck_cache, llm
+from phase1.benchmarks import end_to_end
+from phase1.benchmarks.end_to_end import PERSISTENT_CACHES
+from phase1.config import load_yaml_config
+from phase1.llm_replay import LatencyModel
+
+
+@pytest.fixture
+def run(monkeypatch):
+    # the benchmark seeds the client registry with its replay model
+    monkeypatch.setattr(llm, "_llm_cache", {})
+
+    def run(**kwargs):
+        return end_to_end.run(**{
+            "sessions": 2,
+            "concurrency": 2,
+            "use_async": False,
+            "language": "en",
+            "number_of_slides": 3,
+            "latency": LatencyModel(0.0, 0.0, "none"),
+            **kwargs,
+        })
+
+    return run
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_every_session_produces_a_deck(run, use_async):
+    report = run(use_async=use_async)
+
+    assert report["totals"]["decks"] == 2
+    assert set(report["node_seconds"]) >= {"ppt_planner_node", "slide_builder_node", "pptx_coder_node"}
+    assert report["counters"]["router.fast_path"] > 0
+
+
+def test_runs_start_cold_and_leave_the_configuration_alone(run, override_conf):
+    override_conf("DECK_CACHE", enabled=True)
+    conf = load_yaml_config(llm._conf_path())
+    before = copy.deepcopy({section: conf.get(section) for section in PERSISTENT_CACHES})
+
+    reports = [run(sessions=1), run(sessions=1)]
+
+    assert [report["counters"].get("deck_cache.hits", 0) for report in reports] == [0, 0]
+    assert [report["counters"]["deck_cache.misses"] for report in reports] == [1, 1]
+    assert {section: conf.get(section) for section in PERSISTENT_CACHES} == before
+    assert llm._response_cache is None and deck_cache._deck_cache is None
+
+
+def test_llm_routing_sends_every_turn_to_the_router(run):
+    report = run(sessions=1, llm_routing=True)
+
+    assert "router.fast_path" not in report["counters"]
+    assert report["counters"]["router.llm"] == 3
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from phase1.hedging import HedgedChatModel, HedgePolicy
+from phase1.metrics import metrics
+
+MESSAGES = [HumanMessage(content="hi")]
+
+
+class SlowFirstModel:
+    """The first request answers "slow" after ``slow`` seconds, later ones answer "fast" at once."""
+
+    def __init__(self, slow: float = 0.5, error: Exception = None):
+        self.slow = slow
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            return self.slow if self.calls == 1 else 0.0
+
+    def _reply(self, delay: float) -> str:
+        if self.error is not None:
+            raise self.error
+        return "slow answer" if delay else "fast answer"
+
+    def invoke(self, messages, config=None, **kwargs):
+        delay = self._delay()
+        time.sleep(delay)
+        return AIMessage(content=self._reply(delay))
+
+    def stream(self, messages, config=None, **kwargs):
+        delay = self._delay()
+        time.sleep(delay)
+        for word in self._reply(delay).split():
+            yield AIMessageChunk(content=word)
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        delay = self._delay()
+        await asyncio.sleep(delay)
+        return AIMessage(content=self._reply(delay))
+
+    async def astream(self, messages, config=None, **kwargs):
+        delay = self._delay()
+        await asyncio.sleep(delay)
+        for word in self._reply(delay).split():
+            yield AIMessageChunk(content=word)
+
+
+def hedged(model, **policy):
+    return HedgedChatModel(model, HedgePolicy("agent", **{"default_deadline_seconds": 0.05, "max_hedge_ratio": 1.0, **policy}))
+
+
+async def acollect(model):
+    return "".join([chunk.content async for chunk in model.astream(MESSAGES)])
+
+
+@pytest.mark.parametrize("call", [
+    lambda model: model.invoke(MESSAGES).content,
+    lambda model: "".join(chunk.content for chunk in model.stream(MESSAGES)),
+    lambda model: asyncio.run(model.ainvoke(MESSAGES)).content,
+    lambda model: asyncio.run(acollect(model)),
+], ids=["invoke", "stream", "ainvoke", "astream"])
+def test_a_slow_call_is_won_by_its_duplicate(call):
+    model = hedged(SlowFirstModel())
+    start = time.perf_counter()
+
+    assert call(model).replace(" ", "") == "fastanswer"
+    assert time.perf_counter() - start < 0.4
+    assert model.llm.calls == 2
+    assert metrics.snapshot()["counters"]["hedge.wins.agent"] == 1
+
+
+def test_no_duplicate_without_budget():
+    model = hedged(SlowFirstModel(slow=0.1), max_hedge_ratio=0.0)
+
+    assert model.invoke(MESSAGES).content == "slow answer"
+    assert model.llm.calls == 1
+    assert metrics.snapshot()["counters"]["hedge.budget_exhausted.agent"] == 1
+
+
+def test_the_deadline_follows_recent_latencies():
+    policy = HedgePolicy("agent", percentile=50, min_samples=3, default_deadline_seconds=10.0)
+    for seconds in (0.1, 0.2):
+        policy.record("invoke", seconds, hedge_won=False)
+    assert policy.deadline("invoke") == 10.0
+
+    policy.record("invoke", 0.3, hedge_won=False)
+
+    assert policy.deadline("invoke") == pytest.approx(0.2)
+    assert policy.deadline("stream") == 10.0
+
+
+def test_errors_are_raised_when_every_attempt_fails():
+    model = hedged(SlowFirstModel(slow=0.1, error=RuntimeError("provider error")))
+
+    with pytest.raises(RuntimeError):
+        model.invoke(MESSAGES)
+    with pytest.raises(RuntimeError):
+        list(model.stream(MESSAGES))
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from PIL import Image
+
+from phase1.benchmarks.incremental_render import _edits
+from phase1.benchmarks.parallel_render import make_slides
+from phase1.incremental_render import manifest_path, render_presentation_incremental
+from phase1.metrics import metrics
+from phase1.renderer import render_presentation
+from phase1.tests.conftest import deck_parts, deck_titles
+
+# slides each edit of _edits renders; the others come from the saved deck
+RENDERED_BY_EDIT = {"edit": 1, "insert": 1, "delete": 0, "reorder": 0}
+
+
+@pytest.fixture
+def slides(images):
+    return make_slides(8, images)
+
+
+@pytest.fixture
+def deck(slides, tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    render_presentation_incremental(slides, path)
+    return path
+
+
+def test_edits_reuse_unchanged_slides_and_match_a_fresh_render(slides, deck, tmp_path):
+    fresh = str(tmp_path / "fresh.pptx")
+
+    for name, edited in _edits(slides):
+        result = render_presentation_incremental(edited, deck)
+        render_presentation(edited, fresh)
+
+        assert len(result.slide_timings) == RENDERED_BY_EDIT[name], name
+        assert result.reused_slides == len(edited) - RENDERED_BY_EDIT[name], name
+        assert deck_parts(deck) == deck_parts(fresh), name
+        assert deck_titles(deck) == deck_titles(fresh), name
+
+
+def test_the_manifest_lists_every_slide_of_the_saved_deck(slides, deck):
+    with open(manifest_path(deck), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    assert len(manifest["slides"]) == len(slides)
+    assert len({entry["part"] for entry in manifest["slides"]}) == len(slides)
+
+
+def test_a_deck_modified_since_it_was_saved_is_rendered_again(slides, deck):
+    with open(deck, "ab") as f:
+        f.write(b"\0")
+
+    result = render_presentation_incremental(slides, deck)
+
+    assert result.reused_slides == 0
+    assert len(result.slide_timings) == len(slides)
+    assert metrics.snapshot()["counters"]["incremental_render.full_renders"] == 2
+
+
+def test_a_changed_picture_re_renders_the_slides_showing_it(slides, deck, images):
+    Image.new("RGB", (80, 60), "green").save(images[0])
+
+    result = render_presentation_incremental(slides, deck)
+
+    # make_slides alternates the two pictures
+    assert len(result.slide_timings) == len(slides) // 2
+
+
+def test_stale_layouts_are_rendered_from_the_plan(slides, deck):
+    slides[1]["title"] = "Short"  # an edit the slide builder has not seen yet
+
+    result = render_presentation_incremental(slides, deck)
+
+    assert len(result.slide_timings) == 1
+    assert deck_titles(deck)[1] == "Short"
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from phase1.llm_cache import CachedChatModel, LLMResponseCache, make_cache_key
+from phase1.tests.conftest import CountingModel
+
+MESSAGES = [SystemMessage(content="You are a planner."), HumanMessage(content="Plan a deck")]
+
+
+def test_key_depends_on_model_settings_messages_and_kwargs():
+    key = make_cache_key("gemini", 0.0, MESSAGES)
+
+    assert key == make_cache_key("gemini", 0.0, list(MESSAGES))
+    assert key != make_cache_key("other", 0.0, MESSAGES)
+    assert key != make_cache_key("gemini", 0.5, MESSAGES)
+    assert key != make_cache_key("gemini", 0.0, MESSAGES[:1] + [HumanMessage(content="Plan a talk")])
+    assert key != make_cache_key("gemini", 0.0, MESSAGES, response_mime_type="application/json")
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    LLMResponseCache(path=path).set("key", {"content": "cached"})
+
+    cache = LLMResponseCache(path=path)
+
+    assert cache.get("key") == {"content": "cached"}
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("key") == {"content": "cached"}
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_from_memory():
+    cache = LLMResponseCache(max_memory_entries=2)
+    cache.set("a", {"content": "a"})
+    cache.set("b", {"content": "b"})
+    cache.get("a")
+    cache.set("c", {"content": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"content": "a"}
+    assert cache.stats()["memory_evictions"] == 1
+
+
+def test_disk_tier_keeps_max_disk_entries(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = LLMResponseCache(max_disk_entries=2, path=path)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"content": key})
+
+    reopened = LLMResponseCache(path=path)
+
+    assert reopened.stats()["disk_entries"] == 2
+    assert reopened.get("a") is None
+    assert reopened.get("c") == {"content": "c"}
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = LLMResponseCache(ttl_seconds=10)
+    cache.set("key", {"content": "old"})
+    now = time.time()
+    monkeypatch.setattr("phase1.llm_cache.time.time", lambda: now + 11)
+
+    assert cache.get("key") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_cached_model_calls_the_provider_once():
+    model = CountingModel("the plan")
+    cached = CachedChatModel(model, LLMResponseCache(), "gemini", 0.0)
+
+    first = cached.invoke(MESSAGES)
+    second = cached.invoke(MESSAGES)
+    streamed = "".join(chunk.content for chunk in cached.stream(MESSAGES))
+
+    assert first.content == second.content == streamed == "the plan"
+    assert second.response_metadata["llm_cache_hit"] is True
+    assert model.calls == 1
+
+
+def test_stream_is_cached_once_complete():
+    model = CountingModel("a streamed answer")
+    cached = CachedChatModel(model, LLMResponseCache(), "gemini", 0.0)
+
+    chunks = list(cached.stream(MESSAGES))
+    replay = list(cached.stream(MESSAGES))
+
+    assert len(chunks) > 1
+    assert [chunk.content for chunk in replay] == ["a streamed answer"]
+    assert model.calls == 1
+
+
+def test_async_calls_share_the_cache():
+    model = CountingModel("the plan")
+    cached = CachedChatModel(model, LLMResponseCache(), "gemini", 0.0)
+
+    async def calls():
+        first = await cached.ainvoke(MESSAGES)
+        chunks = [chunk async for chunk in cached.astream(MESSAGES)]
+        return first.content, "".join(chunk.content for chunk in chunks)
+
+    assert asyncio.run(calls()) == ("the plan", "the plan")
+    assert model.calls == 1
+
+
+def test_bypass_always_calls_the_provider():
+    model = CountingModel("the plan")
+    cache = LLMResponseCache()
+    bypass = CachedChatModel(model, cache, "gemini", 0.0).without_cache()
+
+    bypass.invoke(MESSAGES)
+    bypass.invoke(MESSAGES)
+
+    assert model.calls == 2
+    assert cache.stats()["bypasses"] == 2
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from phase1 import llm
+from phase1.tests.conftest import CountingModel
+
+
+@pytest.fixture
+def client_factory(monkeypatch, override_conf):
+    """Replaces the Gemini client with a CountingModel and records every client built."""
+    override_conf("LLM_CACHE", enabled=False)
+    override_conf("RATE_LIMITS", enabled=False)
+    monkeypatch.setattr(llm, "_llm_cache", {})
+    built = []
+
+    def create(llm_type, conf):
+        time.sleep(0.05)  # widen the window for a racing thread
+        built.append(llm_type)
+        return CountingModel(llm_type)
+
+    monkeypatch.setattr(llm, "_create_llm_use_conf", create)
+    return built
+
+
+def test_importing_the_graph_builds_no_client():
+    code = "import sys, phase1.builder, phase1.llm as llm; print(len(llm._llm_cache), 'langchain_google_genai' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+
+    assert result.stdout.split() == ["0", "False"]
+
+
+def test_client_is_built_on_first_use(client_factory):
+    assert client_factory == []
+
+    model = llm.get_llm_by_type("basic")
+
+    assert client_factory == ["basic"]
+    assert llm.get_llm_by_type("basic") is model
+
+
+def test_concurrent_first_calls_build_one_client(client_factory):
+    barrier = threading.Barrier(8)
+    models = []
+
+    def first_call():
+        barrier.wait()
+        models.append(llm.get_llm_by_type("reasoning"))
+
+    threads = [threading.Thread(target=first_call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client_factory == ["reasoning"]
+    assert all(model is models[0] for model in models)
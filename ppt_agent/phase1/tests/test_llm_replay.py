@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from phase1 import llm
+from phase1.llm_replay import (
+    LatencyModel,
+    RecordingChatModel,
+    RecordingStore,
+    ReplayChatModel,
+    ReplayMissError,
+    message_hash,
+)
+from phase1.tests.conftest import CountingModel
+
+MESSAGES = [SystemMessage(content="You are a planner."), HumanMessage(content="Plan a deck")]
+ANSWER = "A plan with a few slides, " * 4
+NO_LATENCY = LatencyModel(0.0, 0.0, "none")
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    model = RecordingChatModel(CountingModel(ANSWER), RecordingStore(path))
+    model.invoke(MESSAGES)
+    "".join(chunk.content for chunk in model.stream(MESSAGES[1:]))
+    return path
+
+
+def test_recorded_answers_are_replayed_from_disk(recording):
+    replay = ReplayChatModel(store=RecordingStore(recording), latency=NO_LATENCY)
+
+    assert len(replay.store) == 2
+    assert replay.invoke(MESSAGES).content == ANSWER
+    assert asyncio.run(replay.ainvoke(MESSAGES[1:])).content == ANSWER
+
+
+def test_streams_are_chunked_and_end_with_the_usage(recording):
+    replay = ReplayChatModel(store=RecordingStore(recording), latency=NO_LATENCY, chunk_tokens=2)
+
+    chunks = list(replay.stream(MESSAGES))
+
+    assert len(chunks) > 1
+    assert "".join(chunk.content for chunk in chunks) == ANSWER
+    assert [bool(chunk.usage_metadata) for chunk in chunks] == [False] * (len(chunks) - 1) + [True]
+
+
+def test_unrecorded_requests_miss_unless_scripted(recording):
+    store = RecordingStore(recording)
+    request = [HumanMessage(content="Something else")]
+
+    with pytest.raises(ReplayMissError):
+        ReplayChatModel(store=store, latency=NO_LATENCY).invoke(request)
+    scripted = ReplayChatModel(store=store, latency=NO_LATENCY, fallback=lambda messages: "scripted")
+    assert scripted.invoke(request).content == "scripted"
+    assert message_hash(request) != message_hash(MESSAGES)
+
+
+def test_replies_take_as_long_as_the_latency_model_says(recording):
+    latency = LatencyModel(first_token_seconds=0.05, per_token_seconds=0.0, jitter="none")
+    replay = ReplayChatModel(store=RecordingStore(recording), latency=latency)
+
+    start = time.perf_counter()
+    replay.invoke(MESSAGES)
+
+    assert time.perf_counter() - start >= 0.05
+
+
+@pytest.mark.parametrize("jitter", ["uniform", "lognormal", "exponential"])
+def test_jitter_is_reproducible_with_a_seed(jitter):
+    delays = [
+        [LatencyModel(1.0, 0.01, jitter, 0.3, seed=7).total_delay(100) for _ in range(3)]
+        for _ in range(2)
+    ]
+
+    assert delays[0] == delays[1]
+    assert all(delay >= 0 for delay in delays[0])
+    if jitter == "uniform":
+        assert all(1.4 <= delay <= 2.6 for delay in delays[0])
+
+
+def test_unknown_jitter_is_rejected():
+    with pytest.raises(ValueError):
+        LatencyModel(jitter="gaussian")
+
+
+def test_the_replay_backend_needs_no_provider(monkeypatch, override_conf, recording):
+    monkeypatch.setenv("PPT_LLM_BACKEND", "replay")
+    override_conf(
+        "LLM_BACKEND",
+        recordings_path=recording,
+        latency={"first_token_seconds": 0.0, "per_token_seconds": 0.0, "jitter": "none"},
+    )
+    override_conf("LLM_CACHE", enabled=False)
+    monkeypatch.setattr(llm, "_llm_cache", {})
+    monkeypatch.setattr(llm, "_recording_store", None)
+    monkeypatch.setattr(llm, "_create_llm_use_conf", None)  # fails if a provider client is built
+
+    model = llm.get_llm_by_type("basic")
+
+    assert isinstance(model, ReplayChatModel)
+    assert model.invoke(MESSAGES).content == ANSWER
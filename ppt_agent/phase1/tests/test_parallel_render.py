@@ -0,0 +1,91 @@
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from pptx import Presentation
+
+from phase1.benchmarks.parallel_render import make_slides
+from phase1.metrics import metrics
+from phase1.parallel_render import render_presentation_parallel, split_ranges
+from phase1.renderer import render_presentation
+from phase1.tests.conftest import deck_parts, deck_titles
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        yield pool
+
+
+@pytest.fixture
+def slides(images):
+    return make_slides(12, images)
+
+
+@pytest.fixture
+def serial(slides, tmp_path):
+    path = str(tmp_path / "serial.pptx")
+    render_presentation(slides, path)
+    return path
+
+
+def render_parallel(slides, path, pool, **kwargs):
+    return render_presentation_parallel(slides, str(path), pool=pool, min_slides=0, **kwargs)
+
+
+@pytest.mark.parametrize("count, workers, slides_per_task", [(10, 2, None), (10, 3, 4), (1, 8, None), (0, 2, None)])
+def test_ranges_cover_every_slide_in_order(count, workers, slides_per_task):
+    ranges = split_ranges(count, workers, slides_per_task)
+
+    assert [index for task in ranges for index in task] == list(range(count))
+    if slides_per_task:
+        assert all(len(task) <= slides_per_task for task in ranges)
+    else:
+        assert len(ranges) <= 2 * workers
+
+
+def test_parallel_render_matches_the_serial_render(slides, serial, pool, tmp_path):
+    result = render_parallel(slides, tmp_path / "parallel.pptx", pool, slides_per_task=5)
+
+    assert result.number_of_slides == 12
+    assert deck_parts(result.file_path) == deck_parts(serial)
+    assert deck_titles(result.file_path) == deck_titles(serial)
+    assert metrics.snapshot()["counters"]["parallel_render.tasks"] == 3
+
+
+def test_the_deck_does_not_depend_on_the_range_size(slides, pool, tmp_path):
+    decks = [
+        render_parallel(slides, tmp_path / f"{size}.pptx", pool, slides_per_task=size).file_path
+        for size in (1, 4, 12)
+    ]
+
+    contents = []
+    for deck in decks:
+        with open(deck, "rb") as f:
+            contents.append(f.read())
+    assert contents[0] == contents[1] == contents[2]
+
+
+def test_repeated_pictures_are_stored_once(slides, pool, tmp_path):
+    result = render_parallel(slides, tmp_path / "parallel.pptx", pool, slides_per_task=2)
+
+    with zipfile.ZipFile(result.file_path) as package:
+        media = [name for name in package.namelist() if name.startswith("ppt/media/")]
+    assert len(media) == 2
+    notes = [slide.notes_slide.notes_text_frame.text for slide in Presentation(result.file_path).slides]
+    assert notes == [f"Notes for slide {number}" for number in range(1, 13)]
+
+
+def test_short_decks_are_rendered_in_process(slides, serial, tmp_path):
+    result = render_presentation_parallel(slides, str(tmp_path / "short.pptx"), pool=None, min_slides=100)
+
+    assert deck_parts(result.file_path) == deck_parts(serial)
+    assert "parallel_render.tasks" not in metrics.snapshot()["counters"]
+
+
+def test_ranges_render_in_worker_processes(slides, serial, tmp_path):
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        result = render_parallel(slides, tmp_path / "parallel.pptx", pool)
+
+    assert deck_parts(result.file_path) == deck_parts(serial)
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from langgraph.types import Command
+
+from phase1.config.configuration import Configuration
+from phase1.streaming_json import StreamingArrayParser
+from phase1.tests.conftest import run_turns
+
+QUESTION = "Make a presentation about water scarcity"
+
+PLAN = {
+    "ppt_title": "Braces {in} [strings]",
+    "key_messages": [{"message": "say \"hi\" }", "milestone_slide_number": 1}],
+    "slides": [
+        {"title": "One", "content": "a } b", "tags": [{"x": [1, 2]}]},
+        {"title": "Two \\ \"quoted\"", "content": ""},
+    ],
+    "notes": [{"ignored": True}],
+}
+
+
+@pytest.mark.parametrize("value, expected", [("false", False), ("0", False), ("no", False), ("1", True), ("Yes", True)])
+def test_boolean_options_are_parsed_from_the_environment(monkeypatch, value, expected):
+    monkeypatch.setenv("PIPELINE_SLIDE_BUILDING", value)
+
+    assert Configuration.from_runnable_config().pipeline_slide_building is expected
+
+
+def test_numeric_options_are_cast_and_falsy_values_are_kept(monkeypatch):
+    monkeypatch.setenv("SLIDE_BUILDER_CONCURRENCY", "8")
+    monkeypatch.setenv("FAST_ROUTE_THRESHOLD", "0.75")
+
+    configuration = Configuration.from_runnable_config(
+        {"configurable": {"requirement_history_window": 0, "pipeline_slide_building": False, "max_step_num": "5"}}
+    )
+
+    assert configuration.slide_builder_concurrency == 8
+    assert configuration.fast_route_threshold == 0.75
+    assert configuration.requirement_history_window == 0
+    assert configuration.pipeline_slide_building is False
+    assert configuration.max_step_num == 5
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10_000])
+def test_elements_are_emitted_as_they_close(chunk_size):
+    text = "```json\n" + json.dumps(PLAN, indent=2) + "\n```"
+    parser = StreamingArrayParser(("slides", "key_messages"))
+
+    emitted = []
+    for start in range(0, len(text), chunk_size):
+        emitted.extend(parser.feed(text[start:start + chunk_size]))
+
+    assert emitted == [("key_messages", PLAN["key_messages"][0])] + [("slides", slide) for slide in PLAN["slides"]]
+    assert parser.emitted == {"slides": 2, "key_messages": 1}
+
+
+def test_an_element_is_emitted_once_its_closing_brace_arrives():
+    parser = StreamingArrayParser(("slides",))
+
+    assert parser.feed('{"slides": [{"title": "One"') == []
+    assert parser.feed("}") == [("slides", {"title": "One"})]
+    assert parser.feed(", {") == []
+
+
+def test_pipelined_slides_are_built_while_planning(workflow, scripted_llm):
+    state = run_turns(workflow, [QUESTION], pipeline_slide_building=True)
+
+    assert scripted_llm.count("slide_builder") == 3
+    assert [slide["slide_content"]["title"] for slide in state["slides"]] == ["Slide 1", "Slide 2", "Slide 3"]
+
+    # the slides are current, building them again asks the model nothing
+    config = {"configurable": {"thread_id": "test"}}
+    workflow.invoke(Command(resume="build the slides"), config=config)
+    assert scripted_llm.count("slide_builder") == 3
+    assert workflow.get_state(config).values["slides_reused"] == 3
@@ -0,0 +1,46 @@
+import json
+
+from phase1.projection import (
+    NODE_STATE_FIELDS,
+    is_slide_content_current,
+    project_state,
+    slide_input_hash,
+    to_json,
+)
+from phase1.tests.conftest import plan
+
+
+def test_project_state_keeps_only_the_node_fields_and_slide_inputs():
+    slides = plan(2)["slides"]
+    slides[0]["slide_content"] = {"layout_type": "title"}
+    state = {"messages": ["a long history"], "file_name": "deck.pptx", "slides": slides}
+
+    projected = project_state(state, "ppt_refiner")
+
+    assert set(projected) == set(NODE_STATE_FIELDS["ppt_refiner"])
+    assert "slide_content" not in projected["slides"][0]
+    assert projected["slides"][0]["title"] == "Slide 1"
+
+
+def test_to_json_is_compact_and_keeps_non_ascii_text():
+    assert to_json({"title": "Café", "slides": [1, 2]}) == '{"title":"Café","slides":[1,2]}'
+
+
+def test_slide_input_hash_ignores_built_fields():
+    slide = plan(1)["slides"][0]
+    built = {**slide, "slide_content": {"layout_type": "quote"}, "slide_content_hash": "x"}
+
+    assert slide_input_hash(built) == slide_input_hash(slide)
+    assert slide_input_hash({**slide, "title": "Other"}) != slide_input_hash(slide)
+
+
+def test_slide_content_is_current_until_an_input_field_changes():
+    slide = {**plan(1)["slides"][0], "slide_content": {"layout_type": "quote"}}
+    assert not is_slide_content_current(slide)
+
+    slide["slide_content_hash"] = slide_input_hash(slide)
+    assert is_slide_content_current(slide)
+
+    slide["content"] = "edited"
+    assert not is_slide_content_current(slide)
+    assert json.loads(to_json(slide))["content"] == "edited"
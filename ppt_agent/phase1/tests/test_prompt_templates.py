@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from phase1.prompts import template
+from phase1.prompts.template import apply_prompt_template, get_prompt_template, precompile_templates
+
+
+@pytest.fixture
+def compiles(monkeypatch):
+    """Empty template caches; returns the names of the templates compiled during the test."""
+    monkeypatch.setattr(template, "_compiled", {})
+    monkeypatch.setattr(template, "_static_renders", {})
+    compiled = []
+    get_template = template.env.get_template
+
+    def counting_get_template(name, *args, **kwargs):
+        compiled.append(name)
+        return get_template(name, *args, **kwargs)
+
+    monkeypatch.setattr(template.env, "get_template", counting_get_template)
+    return compiled
+
+
+def test_prompts_are_compiled_and_rendered_once(compiles):
+    first = get_prompt_template("ppt_planner")
+
+    assert get_prompt_template("ppt_planner") is first
+    assert compiles == ["ppt_planner.md"]
+
+
+def test_precompile_compiles_every_prompt(compiles):
+    precompile_templates()
+    get_prompt_template("slide_builder")
+
+    prompts = sorted(name for name in os.listdir(template.PROMPTS_DIR) if name.endswith(".md"))
+    assert sorted(compiles) == prompts
+
+
+def test_unknown_prompts_raise_value_error():
+    with pytest.raises(ValueError):
+        get_prompt_template("no_such_prompt")
+
+
+def test_the_current_time_is_kept_out_of_the_system_prompt():
+    state = {"messages": [{"role": "user", "content": "hi"}]}
+
+    first = apply_prompt_template("ppt_planner", state)
+    second = apply_prompt_template("ppt_planner", state)
+
+    assert first[0] == second[0]
+    assert "CURRENT_TIME" not in first[0]["content"]
+    assert first[1]["content"].startswith("CURRENT_TIME: ")
+    assert first[2:] == state["messages"]
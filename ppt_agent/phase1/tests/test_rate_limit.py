@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from phase1 import rate_limit
+from phase1.rate_limit import AIMDWindow, ModelRateLimiter, RateLimitedChatModel, TokenBucket, is_throttling_error
+from phase1.tests.conftest import CountingModel
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+def flaky(failures, error=ResourceExhausted):
+    """Reply callable raising ``error`` on the first ``failures`` calls."""
+    calls = [0]
+
+    def reply(messages):
+        calls[0] += 1
+        if calls[0] <= failures:
+            raise error("slow down")
+        return "answer"
+
+    return reply
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_waits_once_empty_and_refills_over_time(clock):
+    bucket = TokenBucket(rate_per_minute=60)  # one unit per second
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(2) == pytest.approx(2.0)
+    clock[0] += 5
+    assert bucket.reserve(3) == 0.0
+
+
+def test_bucket_refunds_overestimated_tokens(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    bucket.reserve(60)
+
+    bucket.adjust(-10)  # the request used 10 units fewer than reserved
+
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_window_grows_additively_and_halves_on_throttles():
+    window = AIMDWindow(initial=4, minimum=1, maximum=5)
+
+    for _ in range(4):
+        window.on_success()
+    assert window.limit == pytest.approx(5.0, abs=0.1)
+    window.on_throttle()
+    assert window.limit == pytest.approx(2.5, abs=0.1)
+    for _ in range(5):
+        window.on_throttle()
+    assert window.limit == 1
+
+
+def test_throttles_are_recognised_through_causes():
+    class ApiError(Exception):
+        code = 429
+
+    wrapped = RuntimeError("call failed")
+    wrapped.__cause__ = ApiError()
+
+    assert is_throttling_error(wrapped)
+    assert is_throttling_error(ResourceExhausted())
+    assert not is_throttling_error(ValueError("bad request"))
+
+
+def test_throttled_calls_are_retried_and_shrink_the_window():
+    limiter = ModelRateLimiter("model", initial_concurrency=4, base_backoff_seconds=0)
+    model = RateLimitedChatModel(CountingModel(flaky(2)), limiter)
+
+    assert model.invoke([HumanMessage(content="hi")]).content == "answer"
+    assert model.llm.calls == 3
+    assert limiter.window.limit < 4
+    assert limiter.window.in_flight == 0
+
+
+def test_other_errors_and_exhausted_retries_are_raised():
+    limiter = ModelRateLimiter("model", max_retries=2, base_backoff_seconds=0)
+
+    with pytest.raises(ValueError):
+        RateLimitedChatModel(CountingModel(flaky(1, ValueError)), limiter).invoke([HumanMessage(content="hi")])
+    model = CountingModel(flaky(5))
+    with pytest.raises(ResourceExhausted):
+        RateLimitedChatModel(model, limiter).invoke([HumanMessage(content="hi")])
+    assert model.calls == 3
+
+
+def test_the_window_caps_calls_in_flight():
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def reply(messages):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return "answer"
+
+    model = RateLimitedChatModel(CountingModel(reply), ModelRateLimiter("model", initial_concurrency=2, max_concurrency=2))
+    threads = [threading.Thread(target=model.invoke, args=([HumanMessage(content="hi")],)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+
+
+def test_streams_are_not_retried_once_a_chunk_was_yielded():
+    class BrokenStream(CountingModel):
+        def stream(self, messages, config=None, **kwargs):
+            yield from super().stream(messages, config, **kwargs)
+            raise ResourceExhausted("slow down")
+
+    limiter = ModelRateLimiter("model", base_backoff_seconds=0)
+    model = BrokenStream("answer")
+
+    with pytest.raises(ResourceExhausted):
+        list(RateLimitedChatModel(model, limiter).stream([HumanMessage(content="hi")]))
+    assert model.calls == 1
+    assert limiter.window.in_flight == 0
+
+
+def test_async_calls_are_retried_too():
+    limiter = ModelRateLimiter("model", base_backoff_seconds=0)
+    model = RateLimitedChatModel(CountingModel(flaky(1)), limiter)
+
+    async def call():
+        reply = await model.ainvoke([HumanMessage(content="hi")])
+        chunks = [chunk.content async for chunk in model.astream([HumanMessage(content="hi")])]
+        return reply.content, "".join(chunks)
+
+    assert asyncio.run(call()) == ("answer", "answer")
+    assert model.llm.calls == 3
+    assert limiter.window.in_flight == 0
@@ -0,0 +1,150 @@
+import pytest
+from PIL import Image
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.util import Inches
+
+from phase1 import nodes
+from phase1.deck_cache import deck_key, get_deck_cache
+from phase1.projection import slide_input_hash
+from phase1.renderer import LAYOUT_HANDLERS, MARGIN, render_presentation, renderable_content
+from phase1.tests.conftest import deck_texts, deck_titles, run_turns
+
+
+def built(slide: dict, slide_content: dict) -> dict:
+    """``slide`` with a slide_content built from its current fields."""
+    slide = {**slide, "slide_content": slide_content}
+    slide["slide_content_hash"] = slide_input_hash(slide)
+    return slide
+
+
+@pytest.mark.parametrize("layout_type", sorted(LAYOUT_HANDLERS))
+def test_every_layout_renders_its_title_text_and_notes(tmp_path, layout_type):
+    slide = built({"title": "Water"}, {
+        "layout_type": layout_type,
+        "title": "Water",
+        "content_blocks": [
+            {"type": "text", "text": ["Rivers", "Lakes"], "style": {"bullet_points": True}},
+            {"type": "image", "alt_text": "A map of the basin"},
+        ],
+        "speaker_notes": ["Mention the drought"],
+    })
+    path = str(tmp_path / "deck.pptx")
+
+    result = render_presentation([slide], path)
+
+    assert result.number_of_slides == 1
+    text = "\n".join(deck_texts(path)[0])
+    if layout_type != "quote":  # quotes have no title placeholder
+        assert deck_titles(path) == ["Water"]
+    assert "Rivers" in text
+    notes = Presentation(path).slides[0].notes_slide.notes_text_frame.text
+    assert notes == "Mention the drought"
+
+
+def test_unbuilt_slides_render_from_their_plan(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+
+    render_presentation([{"title": "Planned", "content": "First point\nSecond point"}], path)
+
+    assert deck_titles(path) == ["Planned"]
+    assert any("Second point" in text for text in deck_texts(path)[0])
+
+
+def image_slide(path: str) -> dict:
+    return built({"title": "Map"}, {
+        "layout_type": "title-and-content",
+        "title": "Map",
+        "content_blocks": [{"type": "image", "path": path, "alt_text": "A map of the basin"}],
+    })
+
+
+def pictures(path: str) -> list:
+    return [shape for shape in Presentation(path).slides[0].shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+
+
+def test_pictures_are_embedded_only_from_the_image_dirs(tmp_path, tmp_path_factory, images):
+    outside = str(tmp_path_factory.mktemp("elsewhere") / "secret.png")
+    Image.new("RGB", (40, 30), "green").save(outside)
+    path = str(tmp_path / "deck.pptx")
+
+    render_presentation([image_slide(images[0]), image_slide(outside)], path)
+
+    assert len(pictures(path)) == 1
+    assert "A map of the basin" in deck_texts(path)[1]
+
+
+def test_unreadable_pictures_are_drawn_as_placeholders(tmp_path, images):
+    corrupt = str(tmp_path / "corrupt.png")
+    with open(corrupt, "wb") as f:
+        f.write(b"not a picture")
+    path = str(tmp_path / "deck.pptx")
+
+    render_presentation([image_slide(corrupt)], path)
+
+    assert pictures(path) == []
+    assert "A map of the basin" in deck_texts(path)[0]
+
+
+def test_blocks_are_laid_out_for_the_slide_size(tmp_path):
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Inches(13.333), Inches(7.5)
+    slide = built({"title": "Wide"}, {
+        "layout_type": "title-and-bullets",
+        "title": "Wide",
+        "content_blocks": [{"type": "text", "text": ["Rivers"]}],
+    })
+    path = str(tmp_path / "deck.pptx")
+
+    render_presentation([slide], path, prs=prs)
+
+    deck = Presentation(path)
+    body = [shape for shape in deck.slides[0].shapes if shape.has_text_frame and shape.text_frame.text == "Rivers"]
+    assert body[0].width == deck.slide_width - 2 * MARGIN
+
+
+def test_stale_slide_content_is_not_rendered():
+    slide = built({"title": "Slide 2"}, {"layout_type": "title-and-bullets", "title": "Slide 2"})
+    assert renderable_content(slide)["title"] == "Slide 2"
+
+    slide["title"] = "Short"
+
+    assert renderable_content(slide)["title"] == "Short"
+
+
+@pytest.mark.parametrize("renderer", ["native", "incremental", "parallel"])
+def test_refiner_edit_is_rendered(workflow, scripted_llm, renderer):
+    # the deck is downloaded after the edit without building the slides again
+    state = run_turns(
+        workflow,
+        ["Make a deck about water", "build the slides", "shorten the title of slide 2", "download the ppt"],
+        pptx_renderer=renderer,
+    )
+
+    assert state["slides"][1]["title"] == "Short"
+    assert deck_titles(state["file_name"]) == ["Slide 1", "Short", "Slide 3"]
+
+
+def last_action(state) -> str:
+    return [message.content for message in state["messages"] if message.name == "action"][-1]
+
+
+def test_render_failures_are_reported_and_not_cached(workflow, scripted_llm, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(nodes, "render_presentation", broken)
+    turns = ["Make a deck about water", "build the slides", "download the ppt"]
+
+    state = run_turns(workflow, turns, thread_id="broken")
+
+    assert last_action(state) == "Could not render the PPT: disk full"
+    assert get_deck_cache().get(deck_key(state, "native")) is None
+
+
+def test_unknown_themes_are_reported(workflow, scripted_llm):
+    state = run_turns(
+        workflow, ["Make a deck about water", "build the slides", "download the ppt"], pptx_theme="no-such-theme"
+    )
+
+    assert last_action(state).startswith("Could not render the PPT: Unknown theme 'no-such-theme'")
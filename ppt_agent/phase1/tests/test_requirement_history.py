@@ -0,0 +1,45 @@
+import json
+
+from phase1.nodes import _foldable_requirements
+from phase1.tests.conftest import routed, run_turns
+
+QUESTION = "Make a presentation about water scarcity"
+TURNS = [QUESTION, "build the slides", "shorten the title of slide 2", "download the ppt"]
+
+
+def test_only_requirements_outside_the_window_are_foldable():
+    requirements = ["a", "b", "c", "d", "e"]
+
+    assert _foldable_requirements({}, requirements, 2) == ["a", "b", "c"]
+    assert _foldable_requirements({"summarized_requirements": 2}, requirements, 2) == ["c"]
+    assert _foldable_requirements({"summarized_requirements": 3}, requirements, 2) == []
+    assert _foldable_requirements({}, requirements[:2], 4) == []
+
+
+def test_each_requirement_is_summarized_once(workflow, scripted_llm):
+    folded, routed_requirements = [], []
+
+    def summarize(messages):
+        folded.extend(json.loads(messages[-1].content)["new_requirements"])
+        return "Summary so far"
+
+    def route(messages):
+        request = json.loads(messages[-1].content)
+        routed_requirements.append((request["earlier_requirements_summary"], request["user_requirment"]))
+        return routed(messages)
+
+    scripted_llm.answers["requirement_summarizer"] = summarize
+    scripted_llm.answers["user_task_manager"] = route
+    # every turn goes through the LLM router
+    state = run_turns(workflow, TURNS, requirement_history_window=1, fast_route_threshold=2.0)
+
+    assert folded == TURNS[:-1]
+    assert state["summarized_requirements"] == 3
+    assert routed_requirements[-1] == ("Summary so far", ["download the ppt"])
+
+
+def test_fast_routed_turns_skip_the_summary(workflow, scripted_llm):
+    run_turns(workflow, TURNS, requirement_history_window=1)
+
+    assert scripted_llm.count("requirement_summarizer") == 0
+    assert scripted_llm.count("user_task_manager") == 0
@@ -0,0 +1,51 @@
+import pytest
+
+from phase1.metrics import metrics
+from phase1.router import classify_intent
+from phase1.tests.conftest import run_turns
+
+QUESTION = "Make a presentation about water scarcity"
+
+
+@pytest.mark.parametrize("requirement, agent", [
+    ("download the ppt", "pptx_coder"),
+    ("give me the file", "pptx_coder"),
+    ("build the slides", "slide_builder"),
+    ("generate all the slides", "slide_builder"),
+    ("shorten the title of slide 2", "ppt_refiner"),
+    ("slide 3: fix the typo", "ppt_refiner"),
+])
+def test_unambiguous_requests_are_confident(requirement, agent):
+    assert classify_intent(requirement, has_slides=True) == (agent, 0.95)
+
+
+@pytest.mark.parametrize("requirement", [
+    "build the slides and download the ppt",  # two intents
+    "add a slide about costs and change slide 2",  # planning words
+    "please edit slide 2 so that it talks a bit more about how the rivers are drying up",  # long
+])
+def test_ambiguous_requests_are_left_to_the_llm(requirement):
+    decision = classify_intent(requirement, has_slides=True)
+
+    assert decision.agent is not None
+    assert decision.confidence < 0.9
+
+
+def test_nothing_to_build_before_planning():
+    assert classify_intent("build the slides", has_slides=False).confidence < 0.9
+    assert classify_intent("tell me a joke", has_slides=True) == (None, 0.0)
+
+
+def test_confident_turns_skip_the_llm_router(workflow, scripted_llm):
+    run_turns(workflow, [QUESTION, "build the slides", "download the ppt"])
+
+    assert scripted_llm.count("user_task_manager") == 0
+    assert metrics.snapshot()["counters"]["router.fast_path"] == 2
+
+
+def test_the_threshold_sends_every_turn_to_the_llm_router(workflow, scripted_llm):
+    state = run_turns(workflow, [QUESTION, "build the slides", "download the ppt"], fast_route_threshold=1.0)
+
+    assert scripted_llm.count("user_task_manager") == 2
+    assert "router.fast_path" not in metrics.snapshot()["counters"]
+    assert all("slide_content" in slide for slide in state["slides"])
@@ -0,0 +1,67 @@
+import pytest
+from pptx import Presentation
+
+from phase1.metrics import metrics
+from phase1.sandbox import PptxWorkerPool
+
+SCRIPT = """
+def main():
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "From the sandbox"
+    prs.save(OUTPUT)
+    print("saved")
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # workers are slow to spawn, the tests share one
+    pool = PptxWorkerPool(workers=1, timeout_seconds=1.0, memory_limit_mb=None, max_jobs_per_worker=100)
+    yield pool
+    pool.close()
+
+
+def test_scripts_run_as_main_with_python_pptx_preloaded(pool, tmp_path):
+    output = str(tmp_path / "deck.pptx")
+
+    result = pool.run(f"OUTPUT = {output!r}\n" + SCRIPT, output)
+
+    assert result.ok, result.error
+    assert result.output_file == output
+    assert result.stdout == "saved\n"
+    assert Presentation(output).slides[0].shapes.title.text == "From the sandbox"
+
+
+def test_errors_are_reported_and_the_worker_is_kept(pool):
+    result = pool.run("leaked = 1\nraise ValueError('bad layout')")
+
+    assert not result.ok
+    assert "ValueError: bad layout" in result.error
+    assert result.output_file is None
+    assert pool.stats() == {"workers": 1, "idle": 1}
+    # every job gets a fresh namespace
+    assert "NameError" in pool.run("print(leaked)").error
+
+
+def test_scripts_past_the_time_limit_are_killed(pool):
+    result = pool.run("while True:\n    pass")
+
+    assert not result.ok
+    assert result.error.startswith("Timed out")
+    assert metrics.snapshot()["counters"]["pptx_sandbox.recycles.timeout"] == 1
+    assert pool.run("print('alive')").stdout == "alive\n"
+
+
+def test_workers_are_recycled_after_max_jobs():
+    pool = PptxWorkerPool(workers=1, memory_limit_mb=None, max_jobs_per_worker=2)
+    try:
+        pids = [pool.run("import os\nprint(os.getpid())").stdout for _ in range(3)]
+    finally:
+        pool.close()
+
+    assert pids[0] == pids[1] != pids[2]
+    assert metrics.snapshot()["counters"]["pptx_sandbox.recycles.max_jobs"] == 1
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from phase1.nodes import _stale_slides
+from phase1.projection import slide_input_hash
+from phase1.tests.conftest import built_slide, plan, run_turns
+
+QUESTION = "Make a presentation about water scarcity"
+
+
+def test_every_slide_is_built(workflow, scripted_llm):
+    state = run_turns(workflow, [QUESTION, "build the slides"])
+
+    assert scripted_llm.count("slide_builder") == 3
+    assert [slide["slide_content"]["title"] for slide in state["slides"]] == ["Slide 1", "Slide 2", "Slide 3"]
+    assert state["slides_rebuilt"] == 3
+
+
+def test_slides_are_built_concurrently(workflow, scripted_llm):
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def slow_build(messages):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return built_slide(messages)
+
+    scripted_llm.answers["slide_builder"] = slow_build
+    run_turns(workflow, [QUESTION, "build the slides"], slide_builder_concurrency=2)
+
+    assert peak[0] == 2
+
+
+def test_a_failing_slide_does_not_fail_the_deck(workflow, scripted_llm):
+    def build(messages):
+        if "Slide 2" in messages[-1].content:
+            raise RuntimeError("provider error")
+        return built_slide(messages)
+
+    scripted_llm.answers["slide_builder"] = build
+    state = run_turns(workflow, [QUESTION, "build the slides"])
+
+    first, second, third = state["slides"]
+    assert "slide_content" in first and "slide_content" in third
+    assert "slide_content" not in second
+    assert second["slide_build_error"] == "RuntimeError: provider error"
+
+
+def test_only_edited_slides_are_rebuilt(workflow, scripted_llm):
+    state = run_turns(
+        workflow, [QUESTION, "build the slides", "shorten the title of slide 2", "build the slides"]
+    )
+
+    assert scripted_llm.count("slide_builder") == 4
+    assert state["slides_rebuilt"] == 1
+    assert [slide["slide_content"]["title"] for slide in state["slides"]] == ["Slide 1", "Short", "Slide 3"]
+
+
+def test_stale_slides_are_the_unbuilt_and_edited_ones():
+    slides = plan(3)["slides"]
+    for slide in slides[:2]:
+        slide["slide_content"] = {"title": slide["title"]}
+        slide["slide_content_hash"] = slide_input_hash(slide)
+    slides[0]["title"] = "Edited"
+
+    input_hashes, stale = _stale_slides(slides)
+
+    assert stale == [0, 2]
+    assert input_hashes == [slide_input_hash(slide) for slide in slides]
@@ -0,0 +1,73 @@
+import pytest
+
+from phase1.state import apply_slide_patch, validate_slide_patch
+from phase1.tests.conftest import plan, run_turns
+
+
+@pytest.fixture
+def slides():
+    return plan(3)["slides"]
+
+
+def titles(slides):
+    return [slide["title"] for slide in slides]
+
+
+def test_replace_copies_only_the_touched_slide(slides):
+    patched = apply_slide_patch(slides, [{"op": "replace", "slide": 2, "field": "title", "value": "Short"}])
+
+    assert titles(patched) == ["Slide 1", "Short", "Slide 3"]
+    assert patched[0] is slides[0] and patched[2] is slides[2]
+    assert slides[1]["title"] == "Slide 2"
+
+
+def test_insert_delete_and_move_use_one_based_numbers(slides):
+    patched = apply_slide_patch(slides, [
+        {"op": "insert", "after": 0, "value": {"title": "Agenda", "content": "Topics"}},
+        {"op": "delete", "slide": 3},
+        {"op": "move", "slide": 3, "to": 1},
+    ])
+
+    assert titles(patched) == ["Slide 3", "Agenda", "Slide 1"]
+
+
+def test_operations_are_validated_against_the_deck_left_by_the_previous_ones(slides):
+    # after two deletes only one slide is left
+    validate_slide_patch([{"op": "delete", "slide": 3}, {"op": "delete", "slide": 2}], 3)
+    with pytest.raises(ValueError):
+        validate_slide_patch([{"op": "delete", "slide": 3}, {"op": "delete", "slide": 3}], 3)
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "replace", "slide": 4, "field": "title", "value": "x"},
+    {"op": "replace", "slide": 1, "field": "slide_content", "value": {}},
+    {"op": "replace", "slide": 1, "field": "title"},
+    {"op": "replace", "slide": True, "field": "title", "value": "x"},
+    {"op": "insert", "after": 1, "value": "not a slide"},
+    {"op": "move", "slide": 1, "to": 0},
+    {"op": "rename", "slide": 1},
+    "delete slide 1",
+])
+def test_invalid_operations_are_rejected(slides, operation):
+    with pytest.raises(ValueError):
+        apply_slide_patch(slides, [operation])
+
+
+def test_a_patch_is_applied_entirely_or_not_at_all(slides):
+    operations = [
+        {"op": "replace", "slide": 1, "field": "title", "value": "Changed"},
+        {"op": "delete", "slide": 9},
+    ]
+
+    with pytest.raises(ValueError):
+        apply_slide_patch(slides, operations)
+    assert titles(slides) == ["Slide 1", "Slide 2", "Slide 3"]
+
+
+def test_refiner_keeps_the_slides_when_its_patch_is_invalid(workflow, scripted_llm):
+    scripted_llm.answers["ppt_refiner"] = '{"operations": [{"op": "delete", "slide": 9}]}'
+
+    state = run_turns(workflow, ["Make a deck about water", "shorten the title of slide 2"])
+
+    assert titles(state["slides"]) == ["Slide 1", "Slide 2", "Slide 3"]
+    assert state["messages"][-1].content.startswith("Could not apply the requested edits")
@@ -0,0 +1,37 @@
+import json
+
+from langgraph.types import Command
+
+QUESTION = "Make a presentation about water scarcity"
+
+
+def stream_turns(workflow, turns, thread_id="test"):
+    """Run a session with ``workflow.stream`` and return every (mode, payload) it emitted."""
+    config = {"configurable": {"thread_id": thread_id}}
+    events = list(workflow.stream({"input": "start"}, config=config, stream_mode=["messages", "custom"]))
+    for turn in turns:
+        events.extend(workflow.stream(Command(resume=turn), config=config, stream_mode=["messages", "custom"]))
+    return events
+
+
+def test_planner_tokens_are_streamed(workflow, scripted_llm):
+    events = stream_turns(workflow, [QUESTION])
+
+    planner_chunks = [
+        payload[0].content
+        for mode, payload in events
+        if mode == "messages" and payload[1]["langgraph_node"] == "ppt_planner_node"
+    ]
+    assert len(planner_chunks) > 1
+    assert json.loads("".join(planner_chunks)) == json.loads(scripted_llm.answers["ppt_planner"])
+
+
+def test_each_built_slide_is_announced(workflow, scripted_llm):
+    events = stream_turns(workflow, [QUESTION, "build the slides"])
+
+    built = sorted(
+        (payload["slide_number"], payload["slide_content"]["title"], payload["error"])
+        for mode, payload in events
+        if mode == "custom" and payload.get("event") == "slide_built"
+    )
+    assert built == [(1, "Slide 1", None), (2, "Slide 2", None), (3, "Slide 3", None)]
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from phase1 import nodes
+from phase1.llm_cache import CachedChatModel, LLMResponseCache
+from phase1.nodes import _invoke_structured
+from phase1.structured import StructuredOutputError, validate_output
+from phase1.tests.conftest import CountingModel, plan, run_turns
+
+MESSAGES = [SystemMessage(content="You are a planner."), HumanMessage(content="Plan a deck")]
+PATCH = json.dumps({"operations": [{"op": "replace", "slide": 2, "field": "title", "value": "Short"}]})
+
+
+def test_fenced_replies_are_parsed_and_validated():
+    reply = "```json\n" + json.dumps(plan(2)) + "\n```"
+
+    assert validate_output("ppt_planner", reply)["slides"][1]["title"] == "Slide 2"
+
+
+@pytest.mark.parametrize("reply", [
+    '{"slides": [',
+    json.dumps({**plan(2), "slides": "two slides"}),
+    json.dumps({"file_name": "deck.pptx"}),
+])
+def test_invalid_replies_are_rejected(reply):
+    agent = "ppt_initiator" if "file_name" in reply else "ppt_planner"
+
+    with pytest.raises(StructuredOutputError):
+        validate_output(agent, reply)
+
+
+def test_an_invalid_reply_is_repaired_without_the_original_prompt(workflow, scripted_llm):
+    repair_requests = []
+
+    def repair(messages):
+        repair_requests.append(messages[-1].content)
+        return PATCH
+
+    scripted_llm.answers["ppt_refiner"] = "I shortened the title of slide 2."
+    scripted_llm.answers["json_repair"] = repair
+
+    state = run_turns(workflow, ["Make a deck about water", "build the slides", "shorten the title of slide 2"])
+
+    assert state["slides"][1]["title"] == "Short"
+    assert len(repair_requests) == 1
+    assert "I shortened the title of slide 2." in repair_requests[0]
+    assert "Slide 3" not in repair_requests[0]
+
+
+@pytest.fixture
+def repair_model(monkeypatch):
+    model = CachedChatModel(CountingModel(json.dumps(plan(2))), LLMResponseCache(), "repair")
+    monkeypatch.setattr(nodes, "get_llm_by_type", lambda llm_type, agent_name=None: model)
+    return model
+
+
+def test_invalid_replies_are_not_served_from_the_cache(repair_model):
+    planner = CachedChatModel(CountingModel("not json"), LLMResponseCache(), "planner")
+
+    for _ in range(2):
+        assert _invoke_structured("ppt_planner", planner, MESSAGES)["ppt_title"] == "Test deck"
+
+    assert planner.llm.calls == 2
+    assert repair_model.llm.calls == 1  # the valid repair is cached
+    assert planner.cache.stats()["invalidations"] == 2
+
+
+def test_failed_repairs_are_not_served_from_the_cache(repair_model):
+    repair_model.llm.reply = "still not json"
+    planner = CachedChatModel(CountingModel("not json"), LLMResponseCache(), "planner")
+
+    for _ in range(2):
+        with pytest.raises(StructuredOutputError):
+            _invoke_structured("ppt_planner", planner, MESSAGES)
+
+    assert planner.llm.calls == 2
+    assert repair_model.llm.calls == 2
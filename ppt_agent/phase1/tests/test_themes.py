@@ -0,0 +1,110 @@
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.util import Inches
+from pptx_clone import PRESENTATION_CONTENT_TYPE, TEMPLATE_CONTENT_TYPE
+
+from phase1.metrics import metrics
+from phase1.renderer import MARGIN
+from phase1.themes import ThemeRegistry
+from phase1.tests.conftest import run_turns
+
+
+def save_master(path, width=Inches(13.333)):
+    prs = Presentation()
+    prs.slide_width = width
+    prs.slides.add_slide(prs.slide_layouts[0]).shapes.title.text = "Example slide"
+    prs.save(path)
+    return path
+
+
+@pytest.fixture
+def master(tmp_path):
+    return save_master(str(tmp_path / "master.pptx"))
+
+
+def counters():
+    return metrics.snapshot()["counters"]
+
+
+def test_a_master_is_parsed_once(master):
+    registry = ThemeRegistry({"corporate": master})
+
+    theme = registry.get("corporate")
+
+    assert registry.get("corporate") is theme
+    assert registry.get(master) is theme
+    assert counters()["themes.parses"] == 1
+    assert theme.layout_index("Title Only") == 5
+    assert [placeholder.idx for placeholder in theme.placeholders["Title Slide"]][:2] == [0, 1]
+
+
+def test_a_changed_master_is_parsed_again(master):
+    registry = ThemeRegistry({"corporate": master})
+    before = registry.get("corporate")
+
+    save_master(master, width=Inches(10))
+    os.utime(master, ns=(before.version[0] + 10**9, before.version[0] + 10**9))
+
+    after = registry.get("corporate")
+    assert after is not before and after.fingerprint != before.fingerprint
+    assert after.presentation.slide_width == Inches(10)
+    assert counters()["themes.reloads"] == 1
+
+
+def test_clones_are_independent_empty_copies_of_the_master(master):
+    registry = ThemeRegistry({"corporate": master})
+
+    first, second = registry.new_presentation("corporate"), registry.new_presentation("corporate")
+    first.slides.add_slide(first.slide_layouts[5]).shapes.title.text = "Only in the first deck"
+
+    assert len(second.slides) == 0
+    assert len(registry.get("corporate").presentation.slides) == 0
+    assert second.slide_width == Inches(13.333)
+    assert counters()["themes.parses"] == 1 and counters()["themes.clones"] == 2
+
+
+def test_potx_templates_are_opened(master, tmp_path):
+    template = str(tmp_path / "master.potx")
+    with zipfile.ZipFile(master) as source, zipfile.ZipFile(template, "w") as target:
+        for item in source.infolist():
+            payload = source.read(item.filename)
+            if item.filename == "[Content_Types].xml":
+                payload = payload.replace(PRESENTATION_CONTENT_TYPE.encode(), TEMPLATE_CONTENT_TYPE.encode())
+            target.writestr(item, payload)
+
+    prs = ThemeRegistry().new_presentation(template)
+
+    assert prs.slide_width == Inches(13.333)
+
+
+def test_unknown_themes_are_rejected():
+    with pytest.raises(ValueError):
+        ThemeRegistry().get("no-such-theme")
+    assert ThemeRegistry().get(None).path is None
+
+
+def test_decks_are_rendered_on_the_theme(workflow, scripted_llm, master):
+    state = run_turns(
+        workflow, ["Make a deck about water", "build the slides", "download the ppt"], pptx_theme=master
+    )
+
+    deck = Presentation(state["file_name"])
+    assert deck.slide_width == Inches(13.333)
+    assert [slide.shapes.title.text for slide in deck.slides] == ["Slide 1", "Slide 2", "Slide 3"]
+    # the content blocks are laid out for the wide slides of the theme
+    boxes = [shape for slide in deck.slides for shape in slide.shapes if shape.shape_type == MSO_SHAPE_TYPE.TEXT_BOX]
+    assert boxes and max(shape.left + shape.width for shape in boxes) == deck.slide_width - MARGIN
+
+
+def test_the_clone_module_does_not_depend_on_phase1():
+    # ppt_agent_adk imports it without phase1 (its configuration, metrics, ...)
+    code = "import sys, pptx_clone; sys.exit(any(name.startswith('phase1') for name in sys.modules))"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
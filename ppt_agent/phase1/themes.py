@@ -0,0 +1,180 @@
+"""
+Registry of parsed slide masters (themes) that new decks are cloned from.
+
+A corporate .potx/.pptx master is a zip of many XML parts and often large
+media; opening it with ``Presentation(path)`` for every deck pays for the
+unzip and the XML parsing each time. ``ThemeRegistry`` opens each master once
+(re-opening it only when the file changes on disk), drops its example slides,
+indexes its layouts and their placeholders, and hands out in-memory clones
+of the parsed package (``pptx_clone``), a fraction of the cost of a re-read.
+
+Themes are named in the THEMES section of conf.yaml; a theme can also be
+given as a path. ``None`` is the python-pptx default template. Parse and
+clone times are recorded in ``phase1.metrics`` under ``themes.*``.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+from pptx import Presentation
+from pptx_clone import clone_presentation, drop_slides, open_master
+
+from phase1.config import load_yaml_config
+from phase1.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# shared registry, built from the THEMES section of conf.yaml
+_registry = None
+_registry_lock = threading.Lock()
+
+
+@dataclass
+class PlaceholderInfo:
+    idx: int
+    type: str
+    name: str
+
+
+@dataclass
+class Theme:
+    """A parsed master and the index of its layouts. ``presentation`` is never modified."""
+
+    name: Optional[str]
+    path: Optional[str]
+    version: tuple
+    presentation: Presentation
+    layouts: Dict[str, int] = field(default_factory=dict)
+    placeholders: Dict[str, List[PlaceholderInfo]] = field(default_factory=dict)
+    parse_seconds: float = 0.0
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the master file and its version, for cache keys."""
+        return f"{self.path or 'default'}:{':'.join(str(part) for part in self.version)}"
+
+    def layout_index(self, name: str, default: Optional[int] = None) -> Optional[int]:
+        return self.layouts.get(name, default)
+
+
+def _file_version(path: Optional[str]) -> tuple:
+    if path is None:
+        return ()
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _parse_theme(name: Optional[str], path: Optional[str]) -> Theme:
+    start = time.perf_counter()
+    version = _file_version(path)
+    prs = open_master(path)
+    drop_slides(prs)
+    layouts: Dict[str, int] = {}
+    placeholders: Dict[str, List[PlaceholderInfo]] = {}
+    for index, layout in enumerate(prs.slide_layouts):
+        # the first layout wins when a master repeats a name
+        layouts.setdefault(layout.name, index)
+        placeholders.setdefault(layout.name, [
+            PlaceholderInfo(
+                idx=shape.placeholder_format.idx,
+                type=str(shape.placeholder_format.type),
+                name=shape.name,
+            )
+            for shape in layout.placeholders
+        ])
+    parse_seconds = time.perf_counter() - start
+    metrics.incr("themes.parses")
+    metrics.observe("themes.parse_seconds", parse_seconds)
+    logger.info("Parsed theme %s (%s) in %.3fs", name or "default", path or "python-pptx", parse_seconds)
+    return Theme(
+        name=name,
+        path=path,
+        version=version,
+        presentation=prs,
+        layouts=layouts,
+        placeholders=placeholders,
+        parse_seconds=parse_seconds,
+    )
+
+
+class ThemeRegistry:
+    """Parsed masters by theme name or path; new decks are clones of them."""
+
+    def __init__(self, themes: Optional[Mapping[str, str]] = None, base_path: Optional[str] = None):
+        self.base_path = base_path
+        self._paths = {name: self._absolute(path) for name, path in (themes or {}).items()}
+        self._themes: Dict[Optional[str], Theme] = {}
+        self._locks: Dict[Optional[str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _absolute(self, path: str) -> str:
+        if self.base_path is not None and not Path(path).is_absolute():
+            path = str(Path(self.base_path) / path)
+        return os.path.abspath(path)
+
+    def register(self, name: str, path: str) -> None:
+        with self._lock:
+            self._paths[name] = self._absolute(path)
+            self._themes.pop(self._paths[name], None)
+
+    def resolve(self, theme: Optional[str]) -> Optional[str]:
+        """Path of the master for a theme name or path, None for the default template."""
+        if not theme:
+            return None
+        if theme in self._paths:
+            return self._paths[theme]
+        path = self._absolute(theme)
+        if not os.path.isfile(path):
+            raise ValueError(f"Unknown theme {theme!r}: not in THEMES and not a file")
+        return path
+
+    def get(self, theme: Optional[str] = None) -> Theme:
+        """Return the parsed master, parsing it on first use or after the file changed."""
+        path = self.resolve(theme)
+        with self._lock:
+            lock = self._locks.setdefault(path, threading.Lock())
+        # one parse per master; other masters are not blocked meanwhile
+        with lock:
+            cached = self._themes.get(path)
+            if cached is not None and cached.version == _file_version(path):
+                return cached
+            if cached is not None:
+                metrics.incr("themes.reloads")
+            parsed = _parse_theme(theme, path)
+            self._themes[path] = parsed
+            return parsed
+
+    def new_presentation(self, theme: Optional[str] = None) -> Presentation:
+        """A new, independent presentation with the theme's masters and layouts and no slides."""
+        parsed = self.get(theme)
+        start = time.perf_counter()
+        prs = clone_presentation(parsed.presentation)
+        metrics.incr("themes.clones")
+        metrics.observe("themes.clone_seconds", time.perf_counter() - start)
+        return prs
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"registered": len(self._paths), "parsed": len(self._themes)}
+
+
+def get_theme_registry() -> ThemeRegistry:
+    """Return the shared registry of the themes named in conf.yaml."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                themes = load_yaml_config(str(Path(__file__).parent / "conf.yaml")).get("THEMES") or {}
+                # relative paths in conf.yaml resolve against the phase1 package
+                _registry = ThemeRegistry(themes, base_path=str(Path(__file__).parent))
+    return _registry
+
+
+def new_presentation(theme: Optional[str] = None) -> Presentation:
+    """Clone of the parsed ``theme`` master from the shared registry."""
+    return get_theme_registry().new_presentation(theme)
@@ -1,6 +1,5 @@
 from google.adk.agents import Agent
 from ppt_state import PPTState, state_to_dict
-import json
 
 
 def generate_pptx_code(state: PPTState) -> dict:
@@ -17,20 +16,20 @@ def generate_pptx_code(state: PPTState) -> dict:
     
     # Generate Python code using python-pptx
     code = f'''
-from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
+from theme_registry import new_presentation
 
 def create_presentation():
-    # Create presentation
-    prs = Presentation()
+    # Create presentation from the theme master, parsed once per process
+    prs = new_presentation({state.theme!r})
     
     # Add slides
-    slides_data = {json.dumps(state_dict["slides"], indent=4)}
+    slides_data = {state_dict["slides"]!r}
     
     for slide_data in slides_data:
         # Add slide
-        slide_layout = prs.slide_layouts[1]  # Title and Content
+        slide_layout = prs.slide_layouts.get_by_name("Title and Content") or prs.slide_layouts[1]
         slide = prs.slides.add_slide(slide_layout)
         
         # Set title
@@ -74,7 +73,8 @@ def execute_pptx_creation(state: PPTState) -> dict:
         
         if code_result["status"] == "success":
             # Execute the code
-            exec(code_result["code"])
+            # run as a script so its __main__ block creates the file
+            exec(code_result["code"], {"__name__": "__main__"})
             
             return {
                 "status": "success",
@@ -24,6 +24,7 @@ class Slide:
 class PPTState:
     """ADK compatible PPT state - User's simplified design"""
     file_name: str = ""
+    theme: str = ""  # .potx/.pptx master the deck is created from, "" for the python-pptx default
     user_requirement: str = ""
     requirement_cleaned: str = ""
     ppt_title: str = ""
@@ -78,6 +79,7 @@ def state_to_dict(state: PPTState) -> Dict[str, Any]:
     """Convert PPTState to dictionary for JSON serialization"""
     return {
         "file_name": state.file_name,
+        "theme": state.theme,
         "user_requirement": state.user_requirement,
         "requirement_cleaned": state.requirement_cleaned,
         "ppt_title": state.ppt_title,
@@ -108,6 +110,7 @@ def dict_to_state(data: Dict[str, Any]) -> PPTState:
     """Convert dictionary back to PPTState"""
     state = PPTState()
     state.file_name = data.get("file_name", "")
+    state.theme = data.get("theme", "")
     state.user_requirement = data.get("user_requirement", "")
     state.requirement_cleaned = data.get("requirement_cleaned", "")
     state.ppt_title = data.get("ppt_title", "")
@@ -0,0 +1,67 @@
+"""Parsed PowerPoint masters (themes) that new presentations are cloned from.
+
+Each .potx/.pptx master is opened once per process (again only when the file
+changes); new presentations are in-memory clones of the parsed package
+instead of a fresh unzip and XML parse of the master.
+"""
+
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from pptx import Presentation
+
+# pptx_clone.py is shared with phase1 and lives next to both apps
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pptx_clone import clone_presentation, drop_slides, open_master  # noqa: E402
+
+
+@dataclass
+class Theme:
+    """A parsed master with its layouts indexed by name"""
+    path: str
+    version: tuple
+    presentation: Presentation
+    layouts: Dict[str, int] = field(default_factory=dict)
+    placeholders: Dict[str, List[int]] = field(default_factory=dict)
+
+
+class ThemeRegistry:
+    """Masters by path, each parsed once"""
+
+    def __init__(self):
+        self._themes: Dict[str, Theme] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str = "") -> Theme:
+        """Return the parsed master at `path` ("" for the python-pptx default)"""
+        path = os.path.abspath(path) if path else ""
+        stat = os.stat(path) if path else None
+        version = (stat.st_mtime_ns, stat.st_size) if stat else ()
+        with self._lock:
+            theme = self._themes.get(path)
+            if theme is None or theme.version != version:
+                prs = open_master(path)
+                drop_slides(prs)
+                theme = Theme(path=path, version=version, presentation=prs)
+                for index, layout in enumerate(prs.slide_layouts):
+                    theme.layouts.setdefault(layout.name, index)
+                    theme.placeholders.setdefault(
+                        layout.name, [shape.placeholder_format.idx for shape in layout.placeholders]
+                    )
+                self._themes[path] = theme
+            return theme
+
+    def new_presentation(self, path: str = "") -> Presentation:
+        """Return a new presentation with the master's layouts and no slides"""
+        return clone_presentation(self.get(path).presentation)
+
+
+themes = ThemeRegistry()
+
+
+def new_presentation(path: str = "") -> Presentation:
+    """Clone of the master at `path` from the shared registry"""
+    return themes.new_presentation(path)
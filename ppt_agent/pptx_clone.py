@@ -0,0 +1,74 @@
+"""
+Opening slide masters and cloning parsed presentations in memory.
+
+Shared by ``phase1.themes`` and ``ppt_agent_adk/theme_registry.py``, so it
+depends on python-pptx only. A clone copies every XML part's tree (lxml, no
+parsing), shares the bytes of binary parts such as media and rebuilds the
+relationships between the copies: it costs a fraction of re-reading the
+master from disk.
+"""
+
+import copy
+import io
+import zipfile
+from typing import Optional
+
+from pptx import Presentation
+from pptx.opc.package import XmlPart
+from pptx.opc.packuri import PACKAGE_URI
+from pptx.oxml import parse_xml
+
+TEMPLATE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.template.main+xml"
+PRESENTATION_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"
+
+
+def open_master(path: Optional[str]) -> Presentation:
+    """Open a .pptx or .potx master; a falsy ``path`` is the python-pptx default template."""
+    if not path:
+        return Presentation()
+    with open(path, "rb") as f:
+        data = f.read()
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        content_types = package.read("[Content_Types].xml")
+        if TEMPLATE_CONTENT_TYPE.encode() not in content_types:
+            return Presentation(io.BytesIO(data))
+        # python-pptx only opens presentations: a .potx is the same package
+        # with a different content type for its main part
+        patched = io.BytesIO()
+        with zipfile.ZipFile(patched, "w", zipfile.ZIP_DEFLATED) as out:
+            for item in package.infolist():
+                payload = package.read(item.filename)
+                if item.filename == "[Content_Types].xml":
+                    payload = content_types.replace(TEMPLATE_CONTENT_TYPE.encode(), PRESENTATION_CONTENT_TYPE.encode())
+                out.writestr(item, payload)
+    patched.seek(0)
+    return Presentation(patched)
+
+
+def drop_slides(prs: Presentation) -> None:
+    """Remove every slide of ``prs``, keeping its masters and layouts."""
+    slide_ids = prs.slides._sldIdLst
+    for slide_id in list(slide_ids):
+        slide_ids.remove(slide_id)
+        prs.part.drop_rel(slide_id.rId)
+
+
+def clone_presentation(prs: Presentation) -> Presentation:
+    """An independent copy of ``prs``, made in memory."""
+    # a plain deepcopy of the python-pptx objects is not enough: proxies
+    # cached on them (e.g. ``prs.slides``) would be copied detached from the
+    # copied XML trees
+    source = prs.part.package
+    package = type(source)(None)
+    clones = {}
+    for part in source.iter_parts():
+        if isinstance(part, XmlPart):
+            clone = type(part)(part.partname, part.content_type, package, copy.deepcopy(part._element))
+        else:
+            clone = type(part).load(part.partname, part.content_type, package, part.blob)
+        clones[part.partname] = (part, clone)
+    parts = {partname: clone for partname, (_, clone) in clones.items()}
+    for part, clone in clones.values():
+        clone.load_rels_from_xml(parse_xml(part.rels.xml), parts)
+    package._rels.load_from_xml(PACKAGE_URI, parse_xml(source._rels.xml), parts)
+    return package.main_document_part.presentation